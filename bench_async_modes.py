@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Execution Mode Benchmark
+========================
+
+Starts the server once per ASYNC_MODE (threading, eventlet, ...) and drives it
+with an increasing number of two-player rooms from asyncio Socket.IO clients.
+For each step it reports how many connections and running rooms the single
+worker sustained, the snapshot rate clients actually received compared to the
+rooms' snapshot_rate, and the server's CPU and memory use.
+
+Usage: python bench_async_modes.py [--modes threading eventlet] [--rooms 25 50 100]
+
+Requires python-socketio's asyncio client (pip install aiohttp) plus the
+packages for each mode being tested (e.g. eventlet).
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+import requests
+import socketio
+
+SERVER_SCRIPT = (
+    "import os, server; "
+    "server.socketio.run(server.app, host='127.0.0.1', port=int(os.environ['PORT']), "
+    "allow_unsafe_werkzeug=True, log_output=False)"
+)
+
+MODE_PACKAGES = {'threading': None, 'eventlet': 'eventlet', 'gevent': 'gevent'}
+
+
+def start_server(mode, port):
+    env = dict(os.environ, ASYNC_MODE=mode, PORT=str(port))
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server in {mode} mode did not start")
+
+
+def process_usage(pid):
+    """Return (cpu_seconds, rss_mb) for a process from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        rss = int(fields[21]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+        return cpu, rss
+    except (OSError, IndexError, ValueError):
+        return 0.0, 0.0
+
+
+class BenchClient:
+    def __init__(self, url):
+        self.url = url
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.snapshots = 0
+        self.room_id = None
+        self.joined = asyncio.Event()
+
+        @self.sio.on('game_state')
+        async def on_state(data):
+            self.snapshots += 1
+
+        @self.sio.on('game_delta')
+        async def on_delta(data):
+            self.snapshots += 1
+
+        @self.sio.on('room_created')
+        async def on_created(data):
+            self.room_id = data.get('room_id')
+            self.joined.set()
+
+        @self.sio.on('room_joined')
+        async def on_joined(data):
+            self.room_id = data.get('room_id')
+            self.joined.set()
+
+    async def connect(self):
+        await self.sio.connect(self.url, transports=['websocket'])
+
+    async def play(self, stop_at):
+        down = False
+        while time.time() < stop_at and self.sio.connected:
+            down = not down
+            await self.sio.emit('player_input', {'input': {'up': not down, 'down': down}})
+            await asyncio.sleep(0.05)
+
+
+async def run_step(url, room_count, duration):
+    """Open room_count rooms (two clients each) and play for `duration` seconds."""
+    clients = []
+    for index in range(room_count):
+        creator, joiner = BenchClient(url), BenchClient(url)
+        try:
+            await creator.connect()
+            await creator.sio.emit('create_room', {'room_name': f"bench_{room_count}_{index}"})
+            await asyncio.wait_for(creator.joined.wait(), 5)
+            await joiner.connect()
+            await joiner.sio.emit('join_room', {'room_id': creator.room_id})
+            await asyncio.wait_for(joiner.joined.wait(), 5)
+        except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+            break
+        clients += [creator, joiner]
+
+    start = time.time()
+    for client in clients:
+        client.snapshots = 0
+    await asyncio.gather(*(client.play(start + duration) for client in clients))
+    elapsed = time.time() - start
+    received = sum(client.snapshots for client in clients)
+    stats = (await asyncio.to_thread(requests.get, f"{url}/stats", timeout=5)).json()
+
+    await asyncio.gather(*(client.sio.disconnect() for client in clients), return_exceptions=True)
+    rate = received / elapsed / len(clients) if clients else 0.0
+    return len(clients), stats.get('active_games', 0), rate
+
+
+def benchmark_mode(mode, room_counts, duration, port):
+    process = start_server(mode, port)
+    url = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        for room_count in room_counts:
+            cpu_before, _ = process_usage(process.pid)
+            wall_before = time.time()
+            connections, running, rate = asyncio.run(run_step(url, room_count, duration))
+            cpu_after, rss = process_usage(process.pid)
+            cpu_percent = 100 * (cpu_after - cpu_before) / (time.time() - wall_before)
+            results.append((room_count, connections, running, rate, cpu_percent, rss))
+            time.sleep(1)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rooms per worker across async modes")
+    parser.add_argument('--modes', nargs='+', default=['threading', 'eventlet'])
+    parser.add_argument('--rooms', nargs='+', type=int, default=[25, 50, 100])
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds of play per step")
+    parser.add_argument('--port', type=int, default=5100)
+    args = parser.parse_args()
+
+    print("🏓 Pong Royale Execution Mode Benchmark 🏓")
+    print(f"{'mode':<10} {'rooms':>6} {'conns':>6} {'running':>8} {'snap/s':>8} {'cpu %':>7} {'rss MB':>7}")
+    for mode in args.modes:
+        package = MODE_PACKAGES.get(mode)
+        if package and importlib.util.find_spec(package) is None:
+            print(f"{mode:<10} skipped ({package} not installed)")
+            continue
+        for room_count, connections, running, rate, cpu, rss in benchmark_mode(
+                mode, args.rooms, args.duration, args.port):
+            print(f"{mode:<10} {room_count:>6} {connections:>6} {running:>8} {rate:>8.1f} {cpu:>7.1f} {rss:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Headless Room Benchmark
+=======================
+
+Measures how many rooms one core can tick, without sockets. Creates N
+GameRooms with two scripted bots each (tracking the ball, with some
+reaction lag), replaying the inputs of a recorded match, or with server-side
+bots (bots.py), and runs them through TickScheduler.run_frame on a simulated
+clock at SCHEDULER_RATE, with socket emits stubbed out. By default payloads
+are still JSON-encoded in the stub, so snapshot serialization is included.
+
+Reports per room count:
+- frame p50/p99: wall time to run one scheduler frame over all rooms
+- ticks/s: room simulation steps per second of wall time
+- realtime rooms: rooms one core could keep at full rate (from the mean frame time)
+- memory per room (tracemalloc, measured in a separate untimed pass)
+
+Usage:
+  python bench_rooms.py [--rooms 100 500 1000] [--seconds 5] [--backend numpy]
+  python bench_rooms.py --replay replays/abcd1234_1700000000000.replay
+  python bench_rooms.py --bots hard --rooms 1000 5000
+  python bench_rooms.py --save baseline.json
+  python bench_rooms.py --compare baseline.json [--tolerance 10]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import server
+from bots import Bot
+from memory_report import build_rooms
+from numpy_physics import VectorPhysics
+from replay import Replay, mask_inputs
+
+UP = {'up': True, 'down': False}
+DOWN = {'up': False, 'down': True}
+STOP = {'up': False, 'down': False}
+
+
+def stub_emits(serialize):
+    """Replace socket emits with a no-op (or a JSON encode of the payload)."""
+    def emit(event, data=None, *args, **kwargs):
+        if serialize and not isinstance(data, bytes):
+            json.dumps(data)
+    server.socketio.emit = emit
+
+
+def bot_input(room, paddle, frame):
+    """Follow the ball, re-aiming only every few frames like a human would."""
+    if frame % 6:
+        return None
+    center = paddle.y + paddle.height / 2
+    if room.ball.y < center - 15:
+        return UP
+    if room.ball.y > center + 15:
+        return DOWN
+    return STOP
+
+
+class ReplayDriver:
+    """Feeds every room the recorded inputs of one match, each from a different offset."""
+
+    def __init__(self, path):
+        recording = Replay(path)
+        ticks = range(recording.first_tick + 1, recording.last_tick + 1)
+        self.masks = [recording.mask_at(tick) for tick in ticks] or [0]
+        recording.close()
+
+    def __call__(self, rooms, frame):
+        masks = self.masks
+        for index, room in enumerate(rooms):
+            # Rooms advance about one tick per frame: send input when the recording changes
+            position = room.current_tick + index * 997
+            mask = masks[position % len(masks)]
+            if frame == 0 or mask != masks[(position - 1) % len(masks)]:
+                inputs = mask_inputs(mask)
+                for player in room.players.values():
+                    room.update_player_input(player.id, inputs[player.paddle_id - 1])
+
+
+class BotDriver:
+    """Turns both players of every room into server-side bots, which run_frame
+    then steers by itself. Bot-only rooms send no player snapshots."""
+
+    def __init__(self, difficulty):
+        self.difficulty = float(difficulty) if difficulty.replace('.', '', 1).isdigit() else difficulty
+        Bot.create(self.difficulty, server.SCHEDULER_RATE)  # Fail early on a bad difficulty
+
+    def __call__(self, rooms, frame):
+        if frame:
+            return
+        for room in rooms:
+            for player in room.players.values():
+                player.bot = Bot.create(self.difficulty, room.tick_rate)
+            room._update_player_lists()
+
+
+def drive_bots(rooms, frame):
+    for room in rooms:
+        for player in room.players.values():
+            paddle = room.paddle1 if player.paddle_id == 1 else room.paddle2
+            input_data = bot_input(room, paddle, frame)
+            if input_data is not None:
+                room.update_player_input(player.id, input_data)
+
+
+def memory_per_room(room_count, frames, drive=drive_bots):
+    """Bytes per running room after `frames` frames, measured with tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rooms = build_rooms(room_count)
+    now = 0.0
+    for frame in range(frames):
+        now += 1.0 / server.SCHEDULER_RATE
+        drive(rooms, frame)
+        server.TickScheduler.run_frame(rooms, now)
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / room_count
+    tracemalloc.stop()
+    return per_room
+
+
+def run_benchmark(room_count, seconds, backend, drive=drive_bots):
+    """Tick room_count rooms for `seconds` of simulated time and time every frame."""
+    rooms = build_rooms(room_count)
+    engine = VectorPhysics() if backend == 'numpy' else None
+    frame_dt = 1.0 / server.SCHEDULER_RATE
+    frames = int(seconds * server.SCHEDULER_RATE)
+    steps_before = sum(room.current_tick for room in rooms)
+
+    durations = []
+    now = 0.0
+    for frame in range(frames):
+        now += frame_dt
+        start = time.perf_counter()
+        drive(rooms, frame)
+        server.TickScheduler.run_frame(rooms, now, engine)
+        durations.append(time.perf_counter() - start)
+
+    total = sum(durations)
+    steps = sum(room.current_tick for room in rooms) - steps_before
+    durations.sort()
+    return {
+        'rooms': room_count,
+        'frames': frames,
+        'frame_p50_ms': durations[len(durations) // 2] * 1000,
+        'frame_p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))] * 1000,
+        'ticks_per_sec': steps / total,
+        'realtime_rooms': int(room_count * frame_dt / (total / frames)),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a saved baseline; return False on a regression."""
+    previous = {entry['rooms']: entry for entry in baseline['results']}
+    ok = True
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0f}%)")
+    for entry in results:
+        old = previous.get(entry['rooms'])
+        if old is None:
+            print(f"{entry['rooms']:>6} rooms: not in baseline")
+            continue
+        throughput = 100 * (entry['ticks_per_sec'] / old['ticks_per_sec'] - 1)
+        latency = 100 * (entry['frame_p99_ms'] / old['frame_p99_ms'] - 1)
+        regressed = throughput < -tolerance or latency > tolerance
+        ok = ok and not regressed
+        print(f"{entry['rooms']:>6} rooms: ticks/s {throughput:+6.1f}%  frame p99 {latency:+6.1f}%"
+              f"  {'REGRESSION' if regressed else 'ok'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless GameRoom tick benchmark")
+    parser.add_argument('--rooms', nargs='+', type=int, default=[100, 500, 1000])
+    parser.add_argument('--seconds', type=float, default=5.0, help="Simulated seconds per room count")
+    parser.add_argument('--backend', choices=['python', 'numpy'], default='python')
+    parser.add_argument('--replay', metavar='FILE', help="Drive rooms with a recorded match's inputs instead of bots")
+    parser.add_argument('--bots', metavar='DIFFICULTY',
+                        help="Play every room with server-side bots (easy, medium, hard or a skill from 0 to 1)")
+    parser.add_argument('--no-serialize', action='store_true', help="Don't JSON-encode stubbed emits")
+    parser.add_argument('--save', metavar='FILE', help="Save results as a baseline")
+    parser.add_argument('--compare', metavar='FILE', help="Compare results with a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    if args.backend == 'numpy' and not VectorPhysics.available:
+        print("ERROR: --backend numpy requires NumPy (pip install numpy)")
+        sys.exit(1)
+    stub_emits(serialize=not args.no_serialize)
+    if args.replay and args.bots:
+        parser.error("--replay and --bots can't be combined")
+    try:
+        drive = ReplayDriver(args.replay) if args.replay else BotDriver(args.bots) if args.bots else drive_bots
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("🏓 Pong Royale Headless Room Benchmark 🏓")
+    print(f"Backend: {args.backend}, scheduler {server.SCHEDULER_RATE} Hz, "
+          f"{args.seconds:g} simulated seconds per step"
+          f"{f', inputs from {args.replay}' if args.replay else ''}"
+          f"{f', {args.bots} server bots' if args.bots else ''}")
+    print(f"{'rooms':>6} {'p50 ms':>8} {'p99 ms':>8} {'ticks/s':>10} {'realtime':>9} {'B/room':>8}")
+    results = []
+    for room_count in args.rooms:
+        entry = run_benchmark(room_count, args.seconds, args.backend, drive)
+        entry['bytes_per_room'] = memory_per_room(room_count, server.SCHEDULER_RATE, drive)
+        results.append(entry)
+        print(f"{room_count:>6} {entry['frame_p50_ms']:>8.2f} {entry['frame_p99_ms']:>8.2f} "
+              f"{entry['ticks_per_sec']:>10.0f} {entry['realtime_rooms']:>9} {entry['bytes_per_room']:>8.0f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'backend': args.backend,
+                'replay': args.replay,
+                'seconds': args.seconds,
+                'results': results
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('backend') != args.backend:
+            print(f"WARNING: baseline was recorded with the {baseline.get('backend')} backend")
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
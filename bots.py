@@ -0,0 +1,177 @@
+"""
+Server-side bot players
+=======================
+
+A bot is a regular Player whose input comes from the server instead of a
+socket: it aims its paddle at where the ball will cross its side and moves
+there through the room's input inbox, like a client that never lags.
+
+Bots re-plan only when their reaction time has elapsed, and BotPlanner
+makes the plans of every due bot in a scheduler frame together (one
+vectorized pass over all bot-controlled rooms when NumPy is installed): the
+ball's intercept, the direction to move and how many ticks to hold it.
+Between plans a bot costs one tick comparison per frame.
+
+Difficulty is a preset name or a skill from 0.0 (easiest) to 1.0
+(hardest), interpolating reaction time, aiming error and dead zone.
+"""
+
+import itertools
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+DIFFICULTIES = {'easy': 0.0, 'medium': 0.5, 'hard': 1.0}
+
+# Settings at skill 0.0 and 1.0
+EASIEST = {'reaction': 0.5, 'error': 60.0, 'deadzone': 20.0}  # seconds, px (std dev), px
+HARDEST = {'reaction': 0.05, 'error': 4.0, 'deadzone': 5.0}
+
+INPUTS = {
+    'up': {'up': True, 'down': False},
+    'down': {'up': False, 'down': True},
+    None: {'up': False, 'down': False},
+}
+MOVES = {-1: 'up', 0: None, 1: 'down'}
+PLAN_COLUMNS = 15  # Values gathered per bot by BotPlanner.plan()
+
+
+def bot_settings(difficulty: Union[str, float]) -> Dict[str, float]:
+    """Reaction time, aiming error and dead zone for a difficulty. Raises ValueError."""
+    if isinstance(difficulty, str):
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown bot difficulty: {difficulty}")
+        skill = DIFFICULTIES[difficulty]
+    elif isinstance(difficulty, (int, float)) and not isinstance(difficulty, bool) and 0 <= difficulty <= 1:
+        skill = float(difficulty)
+    else:
+        raise ValueError(f"Bot difficulty must be one of {', '.join(DIFFICULTIES)} or a skill from 0 to 1")
+    return {key: EASIEST[key] + (HARDEST[key] - EASIEST[key]) * skill for key in EASIEST}
+
+
+@dataclass(slots=True)
+class Bot:
+    difficulty: Union[str, float]
+    reaction_ticks: int  # Simulation ticks between predictions
+    error: float  # Standard deviation of the aim, in pixels
+    deadzone: float  # Paddle stops this close to its target
+    next_plan_tick: int = 0
+    stop_tick: int = 0  # Release the input at this tick
+    target_y: Optional[float] = None
+    direction: Optional[str] = None  # Input last sent: 'up', 'down' or None
+
+    @classmethod
+    def create(cls, difficulty: Union[str, float], tick_rate: int) -> 'Bot':
+        settings = bot_settings(difficulty)
+        return cls(difficulty, max(1, round(settings['reaction'] * tick_rate)),
+                   settings['error'], settings['deadzone'])
+
+
+def intercept_y(bx: float, by: float, bdx: float, bdy: float, face_x: float,
+                radius: float, height: float) -> Optional[float]:
+    """Ball y where it will cross x = face_x, with wall bounces folded in;
+    None if the ball is moving away from that line."""
+    if bdx == 0 or (face_x - bx) / bdx < 0:
+        return None
+    span = height - 2 * radius
+    offset = (by + bdy * (face_x - bx) / bdx - radius) % (2 * span)
+    return radius + (2 * span - offset if offset > span else offset)
+
+
+class BotPlanner:
+    """Plans and steers the bots of a batch of rooms (one scheduler frame).
+
+    When a bot's reaction time is up it gets a plan: the point to aim at,
+    the direction to move and for how many ticks. Plans for every due bot
+    are made in one batch; in between, a bot only has to release its input
+    when the hold runs out.
+    """
+
+    def __init__(self, vectorized: Optional[bool] = None):
+        self.vectorized = np is not None if vectorized is None else vectorized and np is not None
+        self.rng = np.random.default_rng() if self.vectorized else random.Random()
+
+    def update(self, rooms: Sequence) -> int:
+        """Plan for bots whose reaction time is up and release finished moves.
+        Returns the number of plans made."""
+        due = []  # (room, player, paddle)
+        for room in rooms:
+            if not room.bots or not room.game_running:
+                continue
+            tick = room.current_tick
+            for player in room.bots:
+                bot = player.bot
+                if tick >= bot.next_plan_tick:
+                    due.append((room, player, room.paddle1 if player.paddle_id == 1 else room.paddle2))
+                elif tick >= bot.stop_tick and bot.direction is not None:
+                    bot.direction = None
+                    room.update_player_input(player.id, INPUTS[None], count=False)
+        if not due:
+            return 0
+
+        plans = self.plan(due) if self.vectorized else self.plan_scalar(due)
+        for (room, player, _), (target, move, hold) in zip(due, plans):
+            bot = player.bot
+            bot.target_y = target
+            bot.next_plan_tick = room.current_tick + bot.reaction_ticks
+            bot.stop_tick = room.current_tick + hold
+            direction = MOVES[move]
+            if direction != bot.direction:
+                bot.direction = direction
+                room.update_player_input(player.id, INPUTS[direction], count=False)
+        return len(due)
+
+    def plan(self, due: List[tuple]) -> List[tuple]:
+        """(target y, move, hold ticks) for a batch of (room, player, paddle) in one
+        vectorized pass; move is -1 (up), 0 or 1 (down)."""
+        columns = np.fromiter(itertools.chain.from_iterable(
+            (room.ball.x, room.ball.y, room.ball.dx, room.ball.dy, room.ball.radius,
+             room.width, room.height, room.step_dt,
+             paddle.x, paddle.y, paddle.width, paddle.height, paddle.speed,
+             player.bot.error, player.bot.deadzone)
+            for room, player, paddle in due
+        ), dtype=np.float64, count=len(due) * PLAN_COLUMNS).reshape(len(due), PLAN_COLUMNS).T
+        bx, by, bdx, bdy, radius, width, height, dt, px, py, pw, ph, speed, error, deadzone = columns
+
+        # The line the ball's center crosses when it reaches the paddle's face
+        face = np.where(px < width / 2, px + pw + radius, px - radius)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time_to_face = (face - bx) / bdx
+        approaching = (bdx != 0) & (time_to_face >= 0)
+        span = height - 2 * radius
+        offset = np.mod(by + bdy * np.where(approaching, time_to_face, 0) - radius, 2 * span)
+        crossing = radius + np.where(offset > span, 2 * span - offset, offset)
+        aim = crossing + self.rng.standard_normal(len(due)) * error
+        # Waiting for the return: drift back to the middle
+        target = np.where(approaching, aim, height / 2)
+
+        distance = target - (py + ph / 2)
+        move = np.where(distance > deadzone, 1, np.where(distance < -deadzone, -1, 0))
+        hold = np.ceil(np.abs(distance) / (speed * dt))
+        return list(zip(target.tolist(), move.tolist(), hold.astype(np.int64).tolist()))
+
+    def plan_scalar(self, due: List[tuple]) -> List[tuple]:
+        """plan() without NumPy, one bot at a time."""
+        plans = []
+        for room, player, paddle in due:
+            ball, bot = room.ball, player.bot
+            if paddle.x < room.width / 2:
+                face = paddle.x + paddle.width + ball.radius
+            else:
+                face = paddle.x - ball.radius
+            crossing = intercept_y(ball.x, ball.y, ball.dx, ball.dy, face, ball.radius, room.height)
+            if crossing is None:
+                target = room.height / 2
+            else:
+                target = crossing + self.rng.gauss(0.0, bot.error)
+
+            distance = target - (paddle.y + paddle.height / 2)
+            move = 1 if distance > bot.deadzone else -1 if distance < -bot.deadzone else 0
+            plans.append((target, move, math.ceil(abs(distance) / (paddle.speed * room.step_dt))))
+        return plans
@@ -0,0 +1,126 @@
+"""
+Room Hibernation Store
+======================
+
+Rooms that sit without a match (fewer than two players) are serialized to
+disk and dropped from memory; they are loaded back when someone joins or
+asks for their state. A hibernated room costs a small compressed file plus
+its ID in memory, so tens of thousands of half-abandoned rooms don't keep
+their GameRoom, lock, buffers and metrics resident.
+
+Saves are queued in memory and written by flush(), which does its disk I/O
+outside the server lock; a room hibernated and woken again before the flush
+never touches the disk. Reads are split the same way: prefetch() reads a
+room's file without the lock and load() uses those bytes unless the room
+was saved again in between.
+
+Not thread-safe: callers hold GameServer.lock (flush() takes it itself,
+prefetch() needs no lock).
+"""
+
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+FILE_SUFFIX = '.room'
+
+
+class RoomStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # Rooms from a previous run belonged to connections that no longer exist
+        for name in os.listdir(directory):
+            if name.endswith(FILE_SUFFIX):
+                os.remove(os.path.join(directory, name))
+        self.generations: Dict[str, int] = {}  # Hibernated room ID -> save number
+        self.pending: Dict[str, bytes] = {}  # Saved but not yet written
+        self.hibernations = 0
+        self.rehydrations = 0
+        self.bytes_written = 0
+
+    def __len__(self) -> int:
+        return len(self.generations)
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self.generations
+
+    def path(self, room_id: str) -> str:
+        return os.path.join(self.directory, room_id + FILE_SUFFIX)
+
+    def save(self, room_id: str, state: Dict[str, Any]):
+        self.pending[room_id] = zlib.compress(json.dumps(state, separators=(',', ':')).encode())
+        self.hibernations += 1
+        self.generations[room_id] = self.hibernations
+
+    def flush(self, lock):
+        """Write queued rooms to disk, holding `lock` (the server lock) only
+        to pick them up and to settle rooms woken or discarded meanwhile."""
+        with lock:
+            writes = list(self.pending.items())
+        for room_id, data in writes:
+            path = self.path(room_id)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+            self.bytes_written += len(data)
+        with lock:
+            for room_id, data in writes:
+                if self.pending.get(room_id) is data:
+                    del self.pending[room_id]
+                elif room_id not in self.generations:
+                    os.remove(self.path(room_id))
+
+    def prefetch(self, room_id: str) -> Optional[Tuple[int, bytes]]:
+        """(save number, saved bytes) of a hibernated room, for load(); None if
+        it isn't hibernated. Safe without the server lock."""
+        generation = self.generations.get(room_id)
+        if generation is None:
+            return None
+        data = self.pending.get(room_id)
+        if data is None:
+            try:
+                with open(self.path(room_id), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None  # Woken or discarded meanwhile
+        return generation, data
+
+    def peek(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """A hibernated room's saved state, leaving it hibernated."""
+        fetched = self.prefetch(room_id)
+        return None if fetched is None else json.loads(zlib.decompress(fetched[1]))
+
+    def load(self, room_id: str, prefetched: Optional[Tuple[int, bytes]] = None) -> Optional[Dict[str, Any]]:
+        """Take a room out of the store; None if it isn't hibernated.
+
+        `prefetched` is what prefetch() returned; it is used unless the room
+        was woken and saved again since, in which case the file is re-read.
+        """
+        generation = self.generations.get(room_id)
+        if generation is None:
+            return None
+        if prefetched is None or prefetched[0] != generation:
+            prefetched = self.prefetch(room_id)
+        state = json.loads(zlib.decompress(prefetched[1]))
+        self.discard(room_id)
+        self.rehydrations += 1
+        return state
+
+    def discard(self, room_id: str):
+        if self.generations.pop(room_id, None) is None:
+            return
+        if self.pending.pop(room_id, None) is None:
+            try:
+                os.remove(self.path(room_id))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hibernated_rooms': len(self.generations),
+            'hibernations': self.hibernations,
+            'rehydrations': self.rehydrations,
+            'bytes_written': self.bytes_written
+        }
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Socket.IO Load Generator
+========================
+
+Runs thousands of simulated players against a server: asyncio Socket.IO
+clients (the async counterpart of TestClient in test_rooms.py), spread over
+several processes. Players pair up through find_match (or create/join
+rooms), stream sequenced inputs at a realistic rate and track every state
+update they receive.
+
+Reports, merged across processes:
+- state-delivery latency: client receive time minus the snapshot's server
+  timestamp (meaningful when the server runs on the same host/clock)
+- jitter: how far snapshot inter-arrival times stray from 1/snapshot_rate
+- dropped frames: snapshot slots (1/snapshot_rate) in which no fresh state
+  arrived, plus deltas whose base_tick didn't match (keyframe re-requested)
+- server CPU and memory (when the server is started with --spawn, or its
+  PID is given with --server-pid; Linux only)
+
+Usage:
+  python load_test.py --spawn --players 2000 --processes 4 --duration 30
+  python load_test.py --url http://127.0.0.1:5000 --server-pid 1234 --players 500
+
+Requires python-socketio's asyncio client (pip install aiohttp).
+"""
+
+import argparse
+import asyncio
+import math
+import multiprocessing
+import random
+import time
+
+import socketio
+
+from bench_async_modes import process_usage, start_server
+from test_rooms import apply_delta
+from wire_format import decode_state
+
+# Histogram buckets: geometric from 0.1 ms to ~10 s, 10% apart
+BUCKET_BOUNDS_MS = [0.1 * 1.1 ** i for i in range(122)]
+
+
+class Histogram:
+    """Fixed-bucket histogram of millisecond values that merges across processes."""
+
+    def __init__(self, counts=None):
+        self.counts = counts or [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def record(self, value_ms):
+        if value_ms <= BUCKET_BOUNDS_MS[0]:
+            index = 0
+        else:
+            index = min(len(BUCKET_BOUNDS_MS), 1 + int(math.log(value_ms / 0.1, 1.1)))
+        self.counts[index] += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def total(self):
+        return sum(self.counts)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        target = fraction * self.total()
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return BUCKET_BOUNDS_MS[min(index, len(BUCKET_BOUNDS_MS) - 1)]
+        return 0.0
+
+
+class LoadClient:
+    """One simulated player."""
+
+    def __init__(self, url, wire_format, input_rate, stats):
+        self.url = url
+        self.wire_format = wire_format
+        self.input_interval = 1.0 / input_rate
+        self.stats = stats
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.matched = asyncio.Event()
+        self.room_id = None
+        self.state = None
+        self.last_tick = None
+        self.last_arrival = None
+        self.input_seq = 0
+        self.setup_events()
+
+    def setup_events(self):
+        @self.sio.on('match_found')
+        async def match_found(data):
+            self.room_id = data.get('room_id')
+            self.matched.set()
+
+        @self.sio.on('room_created')
+        async def room_created(data):
+            self.room_id = data.get('room_id')
+            self.matched.set()
+
+        @self.sio.on('room_joined')
+        async def room_joined(data):
+            self.room_id = data.get('room_id')
+            self.matched.set()
+
+        @self.sio.on('game_state')
+        async def game_state(data):
+            self.state = data
+            self.record(data['tick'], data['timestamp'])
+
+        @self.sio.on('game_delta')
+        async def game_delta(data):
+            if self.state is None or data.get('base_tick') != self.state.get('tick'):
+                self.stats['desynced'] += 1
+                await self.sio.emit('request_keyframe')
+                return
+            apply_delta(self.state, data)
+            self.record(self.state['tick'], self.state['timestamp'])
+
+        @self.sio.on('game_state_bin')
+        async def game_state_bin(data):
+            decoded = decode_state(data)
+            self.record(decoded['tick'], decoded['timestamp'])
+
+    def record(self, tick, timestamp):
+        now = time.time()
+        stats = self.stats
+        stats['snapshots'] += 1
+        stats['latency'].record(max(0.0, now - timestamp) * 1000)
+
+        # Snapshot cadence comes from the keyframe sent on join
+        if self.state is None:
+            return
+        snapshot_interval = 1.0 / self.state['snapshot_rate']
+        if self.last_tick is not None and tick > self.last_tick:
+            gap = now - self.last_arrival
+            stats['jitter'].record(abs(gap - snapshot_interval) * 1000)
+            # A frame is dropped when no fresh state arrived in its snapshot slot
+            missed = round(gap / snapshot_interval) - 1
+            if missed > 0:
+                stats['dropped'] += missed
+        self.last_tick, self.last_arrival = tick, now
+
+    async def connect(self):
+        await self.sio.connect(self.url, transports=['websocket'], auth={'wire_format': self.wire_format})
+        self.stats['connected'] += 1
+
+    async def play(self, stop_at):
+        """Stream sequenced inputs, flipping direction every second or so like a player."""
+        direction = {'up': True, 'down': False}
+        next_send = time.time()
+        while time.time() < stop_at and self.sio.connected:
+            if random.random() < self.input_interval:
+                direction = {'up': not direction['up'], 'down': direction['up']}
+            self.input_seq += 1
+            await self.sio.emit('player_input', {'input': direction, 'seq': self.input_seq})
+            self.stats['inputs'] += 1
+            next_send += self.input_interval
+            await asyncio.sleep(max(0.0, next_send - time.time()))
+
+
+async def run_players(url, count, options, process_index):
+    """Connect `count` players, pair them up and play until the deadline."""
+    stats = {
+        'connected': 0, 'matched': 0, 'errors': 0, 'snapshots': 0, 'dropped': 0,
+        'desynced': 0, 'inputs': 0, 'latency': Histogram(), 'jitter': Histogram()
+    }
+    clients = [LoadClient(url, options['wire_format'], options['input_rate'], stats) for _ in range(count)]
+
+    async def start(index, client):
+        await asyncio.sleep(options['ramp'] * index / max(1, count))
+        try:
+            await client.connect()
+            if options['pairing'] == 'matchmaking':
+                await client.sio.emit('find_match', {})
+            elif index % 2 == 0:
+                await client.sio.emit('create_room', {'room_name': f"load_{process_index}_{index}"})
+            else:
+                await asyncio.sleep(0.5)
+                await client.sio.emit('join_room', {'room_id': f"load_{process_index}_{index - 1}"})
+            await asyncio.wait_for(client.matched.wait(), options['ramp'] + 30)
+            stats['matched'] += 1
+        except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+            stats['errors'] += 1
+
+    await asyncio.gather(*(start(index, client) for index, client in enumerate(clients)))
+
+    # Measure steady state only: drop whatever arrived while ramping up
+    stats['snapshots'] = stats['dropped'] = stats['desynced'] = stats['inputs'] = 0
+    stats['latency'], stats['jitter'] = Histogram(), Histogram()
+    stop_at = time.time() + options['duration']
+    await asyncio.gather(*(client.play(stop_at) for client in clients if client.matched.is_set()))
+    await asyncio.gather(*(client.sio.disconnect() for client in clients), return_exceptions=True)
+
+    stats['latency'] = stats['latency'].counts
+    stats['jitter'] = stats['jitter'].counts
+    return stats
+
+
+def worker(args):
+    url, count, options, process_index = args
+    return asyncio.run(run_players(url, count, options, process_index))
+
+
+def merge_results(results):
+    merged = {key: 0 for key in results[0] if key not in ('latency', 'jitter')}
+    latency, jitter = Histogram(), Histogram()
+    for result in results:
+        for key in merged:
+            merged[key] += result[key]
+        latency.merge(Histogram(result['latency']))
+        jitter.merge(Histogram(result['jitter']))
+    return merged, latency, jitter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a Pong Royale server with simulated players")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--spawn', action='store_true', help="Start a local server for the test")
+    parser.add_argument('--async-mode', default='threading', help="ASYNC_MODE of a spawned server")
+    parser.add_argument('--server-pid', type=int, help="PID of an already running server, for CPU usage")
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=max(1, multiprocessing.cpu_count() // 2))
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds of steady-state play")
+    parser.add_argument('--ramp', type=float, default=10.0, help="Seconds over which players connect")
+    parser.add_argument('--input-rate', type=float, default=20.0, help="Inputs per second per player")
+    parser.add_argument('--wire-format', choices=['json', 'binary'], default='json')
+    parser.add_argument('--pairing', choices=['matchmaking', 'rooms'], default='matchmaking')
+    args = parser.parse_args()
+
+    server_process = None
+    server_pid = args.server_pid
+    if args.spawn:
+        port = int(args.url.rsplit(':', 1)[1])
+        server_process = start_server(args.async_mode, port)
+        server_pid = server_process.pid
+
+    processes = max(1, min(args.processes, args.players // 2))
+    per_process = [args.players // processes + (1 if i < args.players % processes else 0) for i in range(processes)]
+    options = {
+        'duration': args.duration, 'ramp': args.ramp, 'input_rate': args.input_rate,
+        'wire_format': args.wire_format, 'pairing': args.pairing
+    }
+
+    print("🏓 Pong Royale Load Test 🏓")
+    print(f"{args.players} players over {processes} processes against {args.url} "
+          f"({args.pairing}, {args.wire_format}, {args.input_rate:g} inputs/s)")
+    try:
+        cpu_before, _ = process_usage(server_pid) if server_pid else (0.0, 0.0)
+        started = time.time()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(worker, [(args.url, count, options, i) for i, count in enumerate(per_process)])
+        elapsed = time.time() - started
+        cpu_after, rss = process_usage(server_pid) if server_pid else (0.0, 0.0)
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait(timeout=10)
+
+    merged, latency, jitter = merge_results(results)
+    expected = merged['snapshots'] + merged['dropped']
+    print(f"Connected:        {merged['connected']}/{args.players} ({merged['errors']} errors), "
+          f"matched {merged['matched']}")
+    print(f"Inputs sent:      {merged['inputs']} ({merged['inputs'] / args.duration:.0f}/s)")
+    print(f"Snapshots:        {merged['snapshots']} ({merged['snapshots'] / args.duration:.0f}/s)")
+    print(f"Dropped frames:   {merged['dropped']} ({100 * merged['dropped'] / max(1, expected):.2f}%), "
+          f"{merged['desynced']} deltas without a matching base")
+    for name, histogram in (('Latency', latency), ('Jitter', jitter)):
+        print(f"{name + ' (ms):':<17} p50 {histogram.percentile(0.5):7.1f}  p90 {histogram.percentile(0.9):7.1f}  "
+              f"p99 {histogram.percentile(0.99):7.1f}  max {histogram.percentile(1.0):7.1f}")
+    if server_pid:
+        print(f"Server CPU:       {100 * (cpu_after - cpu_before) / elapsed:.1f}% of one core, RSS {rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Memory Report
+=============
+
+Measures what a running room costs in memory and what a steady-state tick
+allocates, using tracemalloc. Rooms are built and stepped directly (no
+server, socket emits stubbed out) and include two players, their input
+buffers and the retained snapshot state.
+
+Reports:
+- bytes per room (entities, players, buffers, snapshot state)
+- bytes still allocated after a tick (should be 0 in steady state)
+- peak transient bytes allocated during a tick (simulation + snapshot); the
+  max includes serves, which seed a fresh RNG
+
+Save a run with --save, then re-run with --compare on another checkout to
+see what a change costs per room and per tick against that baseline.
+
+Usage:
+  python memory_report.py [--rooms 1000] [--ticks 600]
+  python memory_report.py --save baseline.json
+  python memory_report.py --compare baseline.json
+"""
+
+import argparse
+from array import array
+import gc
+import json
+import time
+import tracemalloc
+
+import server
+
+# Ticks run before measuring, so every room has sent a keyframe and deltas
+KEYFRAME_WARMUP = 120
+
+INPUTS = {True: {'up': True, 'down': False}, False: {'up': False, 'down': True}}
+
+# (key, label, format) of every reported figure
+FIGURES = (
+    ('bytes_per_room', 'Bytes per room', '{:,.0f}'),
+    ('retained_per_tick', 'Retained bytes per tick', '{:,.1f}'),
+    ('transient_p50', 'Transient bytes per tick p50', '{:,}'),
+    ('transient_max', 'Transient bytes per tick max', '{:,}'),
+)
+
+
+def build_rooms(count):
+    """Running rooms with two players each, not registered with the scheduler."""
+    rooms = []
+    for index in range(count):
+        room = server.GameRoom(f"memory_{index}", seed=index)
+        room.players = {
+            f"p{index}_1": server.Player(id=f"p{index}_1", paddle_id=1),
+            f"p{index}_2": server.Player(id=f"p{index}_2", paddle_id=2),
+        }
+        room.game_active = room.game_running = True
+        rooms.append(room)
+    return rooms
+
+
+def tick_room(room, frame):
+    """One simulation step and snapshot, with alternating input."""
+    for player in room.players.values():
+        room.update_player_input(player.id, INPUTS[frame % 40 < 20])
+    room.step()
+    room.broadcast_state()
+
+
+def compare(results, baseline):
+    """Print every figure next to the baseline's, with the change."""
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} ({baseline['rooms']} rooms)")
+    print(f"{'':<30}{'baseline':>12}{'now':>12}{'change':>12}")
+    for key, label, number in FIGURES:
+        old, new = baseline['results'][key], results[key]
+        change = f"{100 * (new / old - 1):+.1f}%" if old else f"{new - old:+,.1f}"
+        print(f"{label + ':':<30}{number.format(old):>12}{number.format(new):>12}{change:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report memory per room and allocations per tick")
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--save', metavar='FILE', help="Save the figures as a baseline")
+    parser.add_argument('--compare', metavar='FILE', help="Compare the figures with a saved baseline")
+    args = parser.parse_args()
+
+    # Stub out the network: only the room's own state and snapshots are measured
+    server.socketio.emit = lambda *args, **kwargs: None
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rooms = build_rooms(args.rooms)
+    for frame in range(KEYFRAME_WARMUP):
+        for room in rooms:
+            tick_room(room, frame)
+    gc.collect()
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / args.rooms
+
+    # Net growth over whole ticks, and the peak allocated while ticking each room
+    # (preallocated so that recording the results doesn't allocate)
+    retained = 0
+    peaks = array('q', bytes(8 * args.ticks * args.rooms))
+    sample = 0
+    for frame in range(args.ticks):
+        start = tracemalloc.get_traced_memory()[0]
+        for room in rooms:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            tick_room(room, frame)
+            peaks[sample] = tracemalloc.get_traced_memory()[1] - current
+            sample += 1
+        retained += tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    peaks = sorted(peaks)
+    results = {
+        'bytes_per_room': per_room,
+        'retained_per_tick': retained / args.ticks / args.rooms,
+        'transient_p50': peaks[len(peaks) // 2],
+        'transient_max': peaks[-1],
+    }
+    print("🏓 Pong Royale Memory Report 🏓")
+    print(f"{'Rooms:':<30}{args.rooms}")
+    for key, label, number in FIGURES:
+        print(f"{label + ':':<30}{number.format(results[key])}{'' if key == 'bytes_per_room' else ' per room'}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'rooms': args.rooms,
+                       'ticks': args.ticks, 'results': results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Prometheus-style metrics for Pong Royale
+========================================
+
+Counters and histograms recorded on the hot paths (room ticks, snapshot
+broadcasts, input handlers, the tick scheduler and room locks) and rendered
+in the Prometheus text exposition format by the server's ``/metrics`` route.
+
+Recording is a few arithmetic operations with no locking: with several tick
+workers an increment can very occasionally be lost, which is acceptable for
+monitoring. Per-room figures live on each room's RoomMetrics and are only
+walked when /metrics is scraped.
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Default buckets (seconds) for durations from ~10 us to 1 s
+DURATION_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+# One JSON snapshot in this many is encoded to measure its size; emitted
+# bytes are extrapolated from the samples
+EMIT_SIZE_SAMPLE_EVERY = 16
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for one labelled series; series sharing a name are rendered together."""
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: Optional[Dict[str, str]] = None,
+                 registry: Optional['Registry'] = None):
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        self.value = 0
+        super().__init__(*args, **kwargs)
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def samples(self) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labels)} {_format_value(self.value)}']
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Optional[Dict[str, str]] = None,
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS, registry: Optional['Registry'] = None):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        super().__init__(name, help_text, labels, registry)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{self.name}_bucket{_format_labels(self.labels, ("le", le))} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(self.labels)} {_format_value(self.sum)}')
+        lines.append(f'{self.name}_count{_format_labels(self.labels)} {self.count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, List[Metric]] = {}
+
+    def register(self, metric: Metric):
+        self.metrics.setdefault(metric.name, []).append(metric)
+
+    def render(self) -> str:
+        lines = []
+        # Copied: series can be registered by other threads while rendering
+        for name, series in list(self.metrics.items()):
+            lines.append(f'# HELP {name} {series[0].help}')
+            lines.append(f'# TYPE {name} {series[0].kind}')
+            for metric in list(series):
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Aggregated over every room on this process
+TICK_PHASE_SECONDS = {
+    phase: Histogram('pong_tick_phase_seconds',
+                     'Time per room tick spent simulating (update), building snapshots (serialize) and emitting them (emit)',
+                     {'phase': phase})
+    for phase in ('update', 'serialize', 'emit')
+}
+SCHEDULER_LATENESS_SECONDS = Histogram(
+    'pong_scheduler_lateness_seconds', 'How late each scheduler frame started relative to its deadline')
+SCHEDULER_FRAME_SECONDS = Histogram(
+    'pong_scheduler_frame_seconds', 'Wall time to run one scheduler frame over all of a worker\'s rooms')
+SCHEDULER_OVERRUNS = Counter(
+    'pong_scheduler_overruns_total', 'Scheduler frames that took longer than the frame budget')
+SCHEDULER_ROOM_FAILURES = Counter(
+    'pong_scheduler_room_failures_total', 'Rooms stopped because their tick raised an exception')
+SCHEDULER_FRAME_BUDGET = Gauge(
+    'pong_scheduler_frame_budget_seconds', 'Frame budget (1 / SCHEDULER_RATE)')
+BOT_PLAN_SECONDS = Histogram(
+    'pong_bot_plan_seconds', 'Time per scheduler frame to predict and steer its bots, batched across rooms')
+BOT_PREDICTIONS = Counter('pong_bot_predictions_total', 'Ball intercept predictions made for bots')
+EMIT_BYTES = {
+    wire: Counter('pong_emit_bytes_total', 'Snapshot bytes emitted to clients (JSON sizes sampled)', {'format': wire})
+    for wire in ('json', 'binary')
+}
+SNAPSHOTS = Counter('pong_snapshots_total', 'Snapshots broadcast to rooms')
+INPUT_EVENTS = Counter('pong_input_events_total', 'player_input events received')
+LOCK_WAIT_SECONDS = Histogram(
+    'pong_lock_wait_seconds', 'Time spent waiting for contended room/server locks')
+OVERLOAD_LEVEL = Gauge('pong_overload_level', 'Overload level: 0 normal, 1 degraded, 2 shedding')
+OVERLOAD_REFUSED_ROOMS = Counter(
+    'pong_overload_refused_rooms_total', 'create_room/find_match requests refused while shedding load')
+ROOMS_EVICTED = {
+    reason: Counter('pong_rooms_evicted_total', 'Rooms closed by the reaper, by expired TTL', {'reason': reason})
+    for reason in ('waiting', 'idle', 'finished')
+}
+ROOM_HIBERNATIONS = Counter('pong_room_hibernations_total', 'Rooms written to the hibernation store')
+ROOM_REHYDRATIONS = Counter('pong_room_rehydrations_total', 'Hibernated rooms loaded back into memory')
+
+# Socket.IO payload serialization, per event (series created on first use).
+# Only the server's own events get a series: anything else dumped as an event
+# packet (acks, handler return values) is counted under 'other', so arbitrary
+# strings can't create series without bound
+ENCODE_EVENTS = frozenset((
+    'bot_added', 'cached', 'connected', 'error', 'game_delta', 'game_state',
+    'match_cancelled', 'match_found', 'match_queued', 'player_assigned',
+    'player_joined', 'player_left', 'room_closed', 'room_created', 'room_joined',
+    'room_left', 'room_list', 'room_page', 'room_state', 'spectate_ended', 'spectating',
+))
+ENCODE_SECONDS: Dict[str, Counter] = {}
+ENCODE_BYTES: Dict[str, Counter] = {}
+ENCODE_REUSED_BYTES = Counter(
+    'pong_encode_reused_bytes_total', 'Pre-encoded payload bytes sent without serializing them again')
+PACKET_CACHE_HITS = Counter('pong_packet_cache_hits_total', 'Encoded payloads reused from the packet cache')
+PACKET_CACHE_MISSES = Counter('pong_packet_cache_misses_total', 'Payloads built and encoded for the packet cache')
+_encode_series_lock = threading.Lock()
+
+
+def record_encode(event: str, seconds: float, size: int):
+    """Count one JSON serialization of an event's payload."""
+    if event not in ENCODE_EVENTS:
+        event = 'other'
+    if event not in ENCODE_SECONDS:
+        with _encode_series_lock:
+            if event not in ENCODE_SECONDS:
+                ENCODE_BYTES[event] = Counter('pong_encode_bytes_total', 'JSON bytes serialized per event',
+                                              {'event': event})
+                ENCODE_SECONDS[event] = Counter('pong_encode_seconds_total', 'CPU time spent serializing JSON per event',
+                                                {'event': event})
+    ENCODE_SECONDS[event].inc(seconds)
+    ENCODE_BYTES[event].inc(size)
+
+# Current room and player counts, set when /metrics is scraped
+ROOMS = Gauge('pong_rooms', 'Rooms owned by this process')
+RUNNING_ROOMS = Gauge('pong_running_rooms', 'Rooms with a game in progress')
+PLAYERS = Gauge('pong_players', 'Players in rooms on this process')
+HIBERNATED_ROOMS = Gauge('pong_hibernated_rooms', 'Rooms serialized to the hibernation store')
+
+
+class RoomMetrics:
+    """Per-room running totals, rendered with a room label at scrape time."""
+    __slots__ = ('ticks', 'snapshots', 'update_seconds', 'serialize_seconds',
+                 'emit_seconds', 'emit_bytes', 'inputs')
+
+    def __init__(self):
+        self.ticks = 0
+        self.snapshots = 0
+        self.update_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.emit_seconds = 0.0
+        self.emit_bytes = 0
+        self.inputs = 0
+
+    def record_update(self, steps: int, seconds: float):
+        self.ticks += steps
+        self.update_seconds += seconds
+        TICK_PHASE_SECONDS['update'].observe(seconds)
+
+    def record_snapshot(self, serialize_seconds: float, emit_seconds: float, emitted: int, wire: str):
+        self.snapshots += 1
+        self.serialize_seconds += serialize_seconds
+        self.emit_seconds += emit_seconds
+        self.emit_bytes += emitted
+        TICK_PHASE_SECONDS['serialize'].observe(serialize_seconds)
+        TICK_PHASE_SECONDS['emit'].observe(emit_seconds)
+        EMIT_BYTES[wire].inc(emitted)
+        SNAPSHOTS.inc()
+
+
+# (metric name, help, RoomMetrics attribute or callable(room))
+ROOM_SERIES = (
+    ('pong_room_ticks_total', 'Simulation steps run by the room', 'ticks'),
+    ('pong_room_snapshots_total', 'Snapshots broadcast by the room', 'snapshots'),
+    ('pong_room_update_seconds_total', 'Time the room spent simulating', 'update_seconds'),
+    ('pong_room_serialize_seconds_total', 'Time the room spent building snapshots', 'serialize_seconds'),
+    ('pong_room_emit_seconds_total', 'Time the room spent emitting snapshots', 'emit_seconds'),
+    ('pong_room_emit_bytes_total', 'Snapshot bytes emitted by the room (JSON sizes sampled)', 'emit_bytes'),
+    ('pong_room_input_events_total', 'player_input events received by the room', 'inputs'),
+    ('pong_room_lock_wait_seconds_total', 'Time spent waiting for the room lock', lambda room: room.lock.wait_time),
+    ('pong_room_lock_contended_total', 'Contended acquisitions of the room lock', lambda room: room.lock.contended),
+)
+
+
+def render_rooms(rooms: Iterable) -> str:
+    """Per-room series for GameRooms (anything with room_id, metrics and lock)."""
+    rooms = list(rooms)
+    lines = []
+    for name, help_text, source in ROOM_SERIES:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for room in rooms:
+            value = source(room) if callable(source) else getattr(room.metrics, source)
+            lines.append(f'{name}{{room="{_escape(room.room_id)}"}} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def render(rooms: Iterable = ()) -> str:
+    """The full /metrics payload: aggregated metrics followed by per-room series."""
+    return REGISTRY.render() + render_rooms(rooms)
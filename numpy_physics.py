@@ -0,0 +1,260 @@
+"""
+Vectorized physics backend for Pong Royale
+==========================================
+
+Steps the ball and paddles of many GameRooms in one batch. Room state is
+gathered into struct-of-arrays NumPy buffers, advanced with the same
+arithmetic as GameRoom.update_game_state (in the same operation order, so
+results match the scalar path exactly), and written back.
+
+NumPy is optional: if it is not installed, VectorPhysics.available is False
+and the server keeps using the scalar per-room path.
+"""
+
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Per-room float fields held in the batch buffers
+FLOAT_FIELDS = (
+    'dt', 'width', 'height', 'speed_increase', 'serve_delay',
+    'bx', 'by', 'bdx', 'bdy', 'br',
+    'p1x', 'p1y', 'p1w', 'p1h', 'p1s',
+    'p2x', 'p2y', 'p2w', 'p2h', 'p2s',
+)
+
+# Per-room boolean fields held in the batch buffers
+BOOL_FIELDS = ('active', 'up1', 'down1', 'up2', 'down2')
+
+
+class VectorPhysics:
+    """Struct-of-arrays physics engine that advances a batch of rooms at once."""
+
+    available = np is not None
+
+    def __init__(self, capacity: int = 256):
+        if np is None:
+            raise RuntimeError("NumPy is required for the vectorized physics backend")
+        self.capacity = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate the batch buffers with room for `capacity` rooms."""
+        self.capacity = capacity
+        for name in FLOAT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in BOOL_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=bool))
+
+    def _ensure_capacity(self, count: int):
+        if count > self.capacity:
+            capacity = self.capacity or 1
+            while capacity < count:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def gather(self, rooms: Sequence, dts: Sequence[float]):
+        """Copy room state into the batch buffers."""
+        n = len(rooms)
+        self._ensure_capacity(n)
+
+        self.dt[:n] = dts
+        self.width[:n] = [room.width for room in rooms]
+        self.height[:n] = [room.height for room in rooms]
+        self.speed_increase[:n] = [room.ball_speed_increase for room in rooms]
+        self.active[:n] = [room.game_active and not room.game_paused for room in rooms]
+        self.serve_delay[:n] = [room.serve_delay for room in rooms]
+
+        balls = [room.ball for room in rooms]
+        self.bx[:n] = [ball.x for ball in balls]
+        self.by[:n] = [ball.y for ball in balls]
+        self.bdx[:n] = [ball.dx for ball in balls]
+        self.bdy[:n] = [ball.dy for ball in balls]
+        self.br[:n] = [ball.radius for ball in balls]
+
+        for prefix, attr in (('p1', 'paddle1'), ('p2', 'paddle2')):
+            paddles = [getattr(room, attr) for room in rooms]
+            getattr(self, prefix + 'x')[:n] = [paddle.x for paddle in paddles]
+            getattr(self, prefix + 'y')[:n] = [paddle.y for paddle in paddles]
+            getattr(self, prefix + 'w')[:n] = [paddle.width for paddle in paddles]
+            getattr(self, prefix + 'h')[:n] = [paddle.height for paddle in paddles]
+            getattr(self, prefix + 's')[:n] = [paddle.speed for paddle in paddles]
+
+        self.up1[:n] = False
+        self.down1[:n] = False
+        self.up2[:n] = False
+        self.down2[:n] = False
+        for i, room in enumerate(rooms):
+            for player in room.players.values():
+                input_state = player.input_state
+                if player.paddle_id == 1:
+                    self.up1[i] = input_state.get('up', False)
+                    self.down1[i] = input_state.get('down', False)
+                else:
+                    self.up2[i] = input_state.get('up', False)
+                    self.down2[i] = input_state.get('down', False)
+
+    def advance(self, n: int):
+        """Advance the first `n` rooms in the buffers by their dt.
+
+        Returns (p1_scored, p2_scored) boolean arrays.
+        """
+        dt = self.dt[:n]
+        height = self.height[:n]
+        active = self.active[:n]
+
+        # Paddle movement ("up" wins over "down", as in the scalar path)
+        for prefix in ('p1', 'p2'):
+            number = prefix[1]
+            y = getattr(self, prefix + 'y')[:n]
+            speed = getattr(self, prefix + 's')[:n]
+            paddle_height = getattr(self, prefix + 'h')[:n]
+            up = active & getattr(self, 'up' + number)[:n]
+            down = active & ~up & getattr(self, 'down' + number)[:n]
+            np.copyto(y, np.maximum(0, y - speed * dt), where=up)
+            np.copyto(y, np.minimum(height - paddle_height, y + speed * dt), where=down)
+
+        # Serve pause: count it down instead of moving the ball
+        serve_delay = self.serve_delay[:n]
+        held = active & (serve_delay > 0)
+        np.copyto(serve_delay, np.maximum(0.0, serve_delay - dt), where=held)
+
+        moving = active & ~held
+        bx, by = self.bx[:n], self.by[:n]
+        bdx, bdy = self.bdx[:n], self.bdy[:n]
+        radius = self.br[:n]
+
+        # Ball position
+        start_x, start_y, start_dy = bx.copy(), by.copy(), bdy.copy()
+        np.copyto(bx, bx + bdx * dt, where=moving)
+        np.copyto(by, by + bdy * dt, where=moving)
+
+        # Top/bottom walls
+        self._bounce_off_walls(n, moving)
+
+        # Paddles, in the same order as the scalar path: swept, then overlap
+        swept = self._sweep('p1', n, moving, start_x, start_y, start_dy)
+        self._sweep('p2', n, moving & ~swept, start_x, start_y, start_dy)
+        for prefix in ('p1', 'p2'):
+            self._collide(prefix, n, moving)
+
+        # Scoring
+        p2_scored = moving & (bx < -radius)
+        p1_scored = moving & ~p2_scored & (bx > self.width[:n] + radius)
+        return p1_scored, p2_scored
+
+    def _bounce_off_walls(self, n: int, mask):
+        """Vectorized equivalent of GameRoom._bounce_off_walls."""
+        by, bdy = self.by[:n], self.bdy[:n]
+        radius, height = self.br[:n], self.height[:n]
+        top = mask & (by <= radius)
+        bottom = mask & ~top & (by >= height - radius)
+        np.copyto(by, radius, where=top)
+        np.copyto(bdy, np.abs(bdy), where=top)
+        np.copyto(by, height - radius, where=bottom)
+        np.copyto(bdy, -np.abs(bdy), where=bottom)
+
+    def _sweep(self, prefix: str, n: int, candidates, start_x, start_y, start_dy):
+        """Vectorized equivalent of GameRoom._sweep_paddle_collision.
+
+        Returns the mask of rooms whose ball hit this paddle.
+        """
+        px = getattr(self, prefix + 'x')[:n]
+        py = getattr(self, prefix + 'y')[:n]
+        pw = getattr(self, prefix + 'w')[:n]
+        ph = getattr(self, prefix + 'h')[:n]
+        bx, by = self.bx[:n], self.by[:n]
+        bdx, bdy = self.bdx[:n], self.bdy[:n]
+        radius, height = self.br[:n], self.height[:n]
+        increase = self.speed_increase[:n]
+
+        left = px < self.width[:n] / 2
+        face = np.where(left, px + pw + radius, px - radius)
+        crossed = candidates & np.where(
+            left,
+            (bdx < 0) & (start_x >= face) & (bx <= face),
+            (bdx > 0) & (start_x <= face) & (bx >= face))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            impact = (face - start_x) / bdx
+            hit_y = np.minimum(np.maximum(start_y + start_dy * impact, radius), height - radius)
+        hit = crossed & ~((hit_y + radius < py) | (hit_y - radius > py + ph))
+
+        spin_factor = ((hit_y - py) / ph - 0.5) * 2
+        np.copyto(bdx, np.where(left, np.abs(bdx) * increase, -np.abs(bdx) * increase), where=hit)
+        np.copyto(bdy, bdy + spin_factor * 100, where=hit)
+        remaining = self.dt[:n] - impact
+        np.copyto(bx, face + bdx * remaining, where=hit)
+        np.copyto(by, hit_y + bdy * remaining, where=hit)
+        self._bounce_off_walls(n, hit)
+        return hit
+
+    def _collide(self, prefix: str, n: int, moving):
+        """Vectorized equivalent of GameRoom._check_paddle_collision."""
+        px = getattr(self, prefix + 'x')[:n]
+        py = getattr(self, prefix + 'y')[:n]
+        pw = getattr(self, prefix + 'w')[:n]
+        ph = getattr(self, prefix + 'h')[:n]
+        bx, by = self.bx[:n], self.by[:n]
+        bdx, bdy = self.bdx[:n], self.bdy[:n]
+        radius = self.br[:n]
+        half_width = self.width[:n] / 2
+        increase = self.speed_increase[:n]
+
+        within = moving & (by + radius >= py) & (by - radius <= py + ph)
+        left = within & (px < half_width) & (bx - radius <= px + pw) & (bx > px) & (bdx < 0)
+        right = (within & ~left & (px > half_width) & (bx + radius >= px)
+                 & (bx < px + pw) & (bdx > 0))
+        hit = left | right
+
+        # Spin uses the ball position before it is pushed out of the paddle
+        spin_factor = ((by - py) / ph - 0.5) * 2
+        np.copyto(bx, px + pw + radius, where=left)
+        np.copyto(bx, px - radius, where=right)
+        np.copyto(bdx, np.abs(bdx) * increase, where=left)
+        np.copyto(bdx, -np.abs(bdx) * increase, where=right)
+        np.copyto(bdy, bdy + spin_factor * 100, where=hit)
+
+    def simulate(self, rooms: Sequence, dts: Sequence[float]) -> List[tuple]:
+        """Advance `rooms` by their own dt in one vectorized pass.
+
+        Only the batch buffers change: returns one (room, *state) tuple per
+        room, to be written back with `scatter`.
+        """
+        n = len(rooms)
+        self.gather(rooms, dts)
+        p1_scored, p2_scored = self.advance(n)
+        columns = (
+            self.bx[:n].tolist(), self.by[:n].tolist(),
+            self.bdx[:n].tolist(), self.bdy[:n].tolist(),
+            self.p1y[:n].tolist(), self.p2y[:n].tolist(),
+            self.serve_delay[:n].tolist(),
+            p1_scored.tolist(), p2_scored.tolist(),
+        )
+        return list(zip(rooms, *columns))
+
+    @staticmethod
+    def scatter(room, bx, by, bdx, bdy, p1y, p2y, serve_delay, p1_scored, p2_scored):
+        """Copy one room's simulated state back into the room object."""
+        with room.lock:
+            ball = room.ball
+            ball.x, ball.y, ball.dx, ball.dy = bx, by, bdx, bdy
+            room.paddle1.y = p1y
+            room.paddle2.y = p2y
+            room.serve_delay = serve_delay
+            # Scoring is rare, so it goes through the scalar path
+            if p1_scored or p2_scored:
+                if p1_scored:
+                    room.paddle1.score += 1
+                else:
+                    room.paddle2.score += 1
+                room._handle_score()
+
+    def step(self, rooms: List, dts: Sequence[float]):
+        """Advance every room in `rooms` by its own dt in one vectorized pass."""
+        if not rooms:
+            return
+        for state in self.simulate(rooms, dts):
+            self.scatter(*state)
@@ -0,0 +1,94 @@
+"""
+Encode-once Socket.IO payloads
+==============================
+
+Payloads that go to many clients (the lobby room_list, keyframes handed to
+joining players and spectators) are JSON-encoded once into an
+EncodedPayload and emitted as-is: SocketJSON, installed as the Socket.IO
+server's json module, splices the pre-encoded text into the packet instead
+of serializing the payload again for every emit.
+
+PacketCache keeps the last EncodedPayload per key together with the
+content version it was built from, so repeated emits of unchanged content
+(e.g. a room_list storm while nothing in the lobby changed) skip both
+building and encoding.
+
+SocketJSON also times every encode it performs, so serialization CPU per
+event shows up in /metrics (pong_encode_seconds_total and friends).
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from engineio import json as engineio_json
+
+import metrics
+
+
+class EncodedPayload:
+    """A payload already serialized to compact JSON."""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+def encode(payload: Any, event: str = 'cached') -> EncodedPayload:
+    """Serialize a payload once, counting the time and bytes under `event`."""
+    started = time.perf_counter()
+    text = json.dumps(payload, separators=(',', ':'))
+    metrics.record_encode(event, time.perf_counter() - started, len(text))
+    return EncodedPayload(text)
+
+
+class PacketCache:
+    """Last encoded payload per key, reused while its content version is unchanged.
+
+    With max_age, an entry is also rebuilt once it is that many seconds old,
+    for content that can change without its version changing.
+    """
+
+    def __init__(self):
+        self.entries: Dict[Hashable, Tuple[Hashable, float, EncodedPayload]] = {}
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], Any],
+            max_age: Optional[float] = None, event: str = 'cached') -> EncodedPayload:
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version and (max_age is None or now - entry[1] < max_age):
+            metrics.PACKET_CACHE_HITS.inc()
+            return entry[2]
+        metrics.PACKET_CACHE_MISSES.inc()
+        payload = encode(build(), event)
+        self.entries[key] = (version, now, payload)
+        return payload
+
+    def discard(self, key: Hashable):
+        self.entries.pop(key, None)
+
+
+class SocketJSON:
+    """json module for the Socket.IO server: splices EncodedPayloads and times encoding.
+
+    Socket.IO event packets are encoded as dumps([event, *args]).
+    """
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        if isinstance(obj, list) and obj and isinstance(obj[0], str):
+            if len(obj) == 2 and isinstance(obj[1], EncodedPayload):
+                metrics.ENCODE_REUSED_BYTES.inc(len(obj[1].text))
+                return '[' + json.dumps(obj[0]) + ',' + obj[1].text + ']'
+            started = time.perf_counter()
+            text = json.dumps(obj, *args, **kwargs)
+            metrics.record_encode(obj[0], time.perf_counter() - started, len(text))
+            return text
+        return json.dumps(obj, *args, **kwargs)
+
+    @staticmethod
+    def loads(*args, **kwargs):
+        return engineio_json.loads(*args, **kwargs)
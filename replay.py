@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Match Replays
+=============
+
+Compact append-only recordings of matches, and a tool to play them back.
+
+The simulation is deterministic given the room's seed and the paddle inputs
+applied at each tick, so a replay stores only:
+
+- a header: magic, version and the room's settings as JSON
+- an INPUT record (6 bytes) whenever the paddle inputs change, tagged with
+  the tick they were first applied to
+- a KEYFRAME record (70 bytes) with the full simulated state (including
+  serve_count, which seeds the next serve) every REPLAY_KEYFRAME_TICKS
+  ticks, so playback can seek without re-simulating from the start
+- an END record when the match stops
+
+Recording is enabled on the server with REPLAY_DIR. Records are built in a
+small per-room buffer on the tick worker and handed to a background writer
+thread in chunks, so the game loop never touches the disk.
+
+Usage:
+  python replay.py MATCH.replay                 # summary
+  python replay.py MATCH.replay --seek 1200     # state at tick 1200
+  python replay.py MATCH.replay --verify        # re-simulate and check every keyframe
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+MAGIC = b'PRPL'
+VERSION = 1
+
+# Full state is recorded every this many ticks (5 s at 120 Hz)
+REPLAY_KEYFRAME_TICKS = int(os.environ.get('REPLAY_KEYFRAME_TICKS', 600))
+# A room's records are handed to the writer thread in chunks of about this size
+REPLAY_FLUSH_BYTES = 4096
+
+RECORD_INPUT = 1
+RECORD_KEYFRAME = 2
+RECORD_END = 3
+
+HEADER_STRUCT = struct.Struct('<4sBI')  # magic, version, JSON metadata length
+INPUT_STRUCT = struct.Struct('<BIB')  # type, tick, input mask
+# type, tick, serve_count, input mask, ball x/y/dx/dy, paddle1 y, paddle2 y,
+# serve_delay, score1, score2
+KEYFRAME_STRUCT = struct.Struct('<BIIB7dHH')
+END_STRUCT = struct.Struct('<BI')  # type, last tick
+RECORD_STRUCTS = {RECORD_INPUT: INPUT_STRUCT, RECORD_KEYFRAME: KEYFRAME_STRUCT, RECORD_END: END_STRUCT}
+
+# Input mask bits
+UP1, DOWN1, UP2, DOWN2 = 1, 2, 4, 8
+
+
+def input_mask(players) -> int:
+    """Pack the current up/down input of both paddles into one byte."""
+    mask = 0
+    for player in players:
+        state = player.input_state
+        shift = 0 if player.paddle_id == 1 else 2
+        if state.get('up'):
+            mask |= UP1 << shift
+        if state.get('down'):
+            mask |= DOWN1 << shift
+    return mask
+
+
+def mask_inputs(mask: int) -> Tuple[Dict[str, bool], Dict[str, bool]]:
+    """Unpack an input mask into the input dicts of paddle 1 and paddle 2."""
+    return ({'up': bool(mask & UP1), 'down': bool(mask & DOWN1)},
+            {'up': bool(mask & UP2), 'down': bool(mask & DOWN2)})
+
+
+class ReplayWriter:
+    """Background thread that appends recorded chunks to their replay files."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, path: str, data: bytes):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='replay-writer', daemon=True)
+                    self.thread.start()
+        self.queue.put((path, data))
+
+    def flush(self):
+        """Block until every submitted chunk has been written."""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            path, data = self.queue.get()
+            try:
+                with open(path, 'ab') as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"Failed to write replay {path}: {e}")
+            finally:
+                self.queue.task_done()
+
+
+class ReplayRecorder:
+    """Records one match of a GameRoom. Called by the tick, with the room lock held."""
+    __slots__ = ('path', 'writer', 'buffer', 'last_mask', 'last_keyframe')
+
+    def __init__(self, path: str, room, writer: ReplayWriter):
+        self.path = path
+        self.writer = writer
+        metadata = json.dumps({
+            'room_id': room.room_id,
+            'room_type': room.room_type,
+            'seed': room.seed,
+            'tick_rate': room.tick_rate,
+            'width': room.width,
+            'height': room.height,
+            'max_score': room.max_score,
+            'ball_speed_increase': room.ball_speed_increase,
+            'started_at': time.time(),
+        }).encode()
+        self.buffer = bytearray(HEADER_STRUCT.pack(MAGIC, VERSION, len(metadata)) + metadata)
+        self.last_mask = input_mask(room.players.values())
+        self.last_keyframe = room.current_tick
+        self.keyframe(room)
+
+    @classmethod
+    def start(cls, room, directory: str, writer: ReplayWriter) -> 'ReplayRecorder':
+        """Begin recording a room's match into a new file in `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{room.room_id}_{int(time.time() * 1000)}.replay")
+        return cls(path, room, writer)
+
+    def keyframe(self, room):
+        ball = room.ball
+        self.buffer += KEYFRAME_STRUCT.pack(
+            RECORD_KEYFRAME, room.current_tick, room.serve_count, self.last_mask,
+            ball.x, ball.y, ball.dx, ball.dy, room.paddle1.y, room.paddle2.y, room.serve_delay,
+            room.paddle1.score, room.paddle2.score)
+        self.last_keyframe = room.current_tick
+
+    def record_tick(self, room):
+        """Record the inputs used by the step that just ran (if they changed)."""
+        mask = input_mask(room.players.values())
+        if mask != self.last_mask:
+            self.buffer += INPUT_STRUCT.pack(RECORD_INPUT, room.current_tick, mask)
+            self.last_mask = mask
+        if room.current_tick - self.last_keyframe >= REPLAY_KEYFRAME_TICKS:
+            self.keyframe(room)
+        if len(self.buffer) >= REPLAY_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.writer.submit(self.path, bytes(self.buffer))
+            self.buffer.clear()
+
+    def close(self, room):
+        """Write a final keyframe and the END record."""
+        if room.current_tick != self.last_keyframe:
+            self.keyframe(room)
+        self.buffer += END_STRUCT.pack(RECORD_END, room.current_tick)
+        self.flush()
+
+
+class Replay:
+    """A memory-mapped replay file, indexed for seeking."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = HEADER_STRUCT.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        start = HEADER_STRUCT.size
+        self.metadata = json.loads(self.data[start:start + length])
+
+        # Index: keyframe ticks and offsets, and every input change
+        self.keyframe_ticks: List[int] = []
+        self.keyframe_offsets: List[int] = []
+        self.input_ticks: List[int] = []
+        self.input_masks: List[int] = []
+        self.end_tick: Optional[int] = None
+        offset = start + length
+        size = len(self.data)
+        while offset < size:
+            kind = self.data[offset]
+            record = RECORD_STRUCTS.get(kind)
+            if record is None:
+                raise ValueError(f"Corrupt replay record at offset {offset}")
+            if offset + record.size > size:
+                break  # Truncated tail of a recording that is still being written
+            fields = record.unpack_from(self.data, offset)
+            if kind == RECORD_INPUT:
+                self.input_ticks.append(fields[1])
+                self.input_masks.append(fields[2])
+            elif kind == RECORD_KEYFRAME:
+                self.keyframe_ticks.append(fields[1])
+                self.keyframe_offsets.append(offset)
+            else:
+                self.end_tick = fields[1]
+            offset += record.size
+        if not self.keyframe_ticks:
+            raise ValueError(f"{path} has no keyframes")
+
+    @property
+    def first_tick(self) -> int:
+        return self.keyframe_ticks[0]
+
+    @property
+    def last_tick(self) -> int:
+        return self.end_tick if self.end_tick is not None else self.keyframe_ticks[-1]
+
+    def keyframe(self, index: int) -> Dict[str, Any]:
+        (_, tick, serve_count, mask, bx, by, bdx, bdy, p1y, p2y, serve_delay,
+         score1, score2) = KEYFRAME_STRUCT.unpack_from(self.data, self.keyframe_offsets[index])
+        return {
+            'tick': tick, 'serve_count': serve_count, 'mask': mask,
+            'ball': (bx, by, bdx, bdy), 'paddle_y': (p1y, p2y),
+            'serve_delay': serve_delay, 'score': (score1, score2)
+        }
+
+    @staticmethod
+    def capture(room) -> Dict[str, Any]:
+        """A room's simulated state in the same form as keyframe()."""
+        ball = room.ball
+        return {
+            'tick': room.current_tick, 'serve_count': room.serve_count,
+            'mask': input_mask(room.players.values()),
+            'ball': (ball.x, ball.y, ball.dx, ball.dy), 'paddle_y': (room.paddle1.y, room.paddle2.y),
+            'serve_delay': room.serve_delay, 'score': (room.paddle1.score, room.paddle2.score)
+        }
+
+    def mask_at(self, tick: int) -> int:
+        """The inputs applied by the step that produced `tick`."""
+        index = bisect.bisect_right(self.input_ticks, tick) - 1
+        if index >= 0:
+            return self.input_masks[index]
+        return self.keyframe(0)['mask']
+
+    def new_room(self):
+        """A detached GameRoom with the recorded settings and two players."""
+        import server  # Deferred: the server imports this module for recording
+
+        meta = self.metadata
+        room = server.GameRoom(meta['room_id'], width=meta['width'], height=meta['height'],
+                               room_type=meta['room_type'], tick_rate=meta['tick_rate'],
+                               seed=meta['seed'])
+        room.max_score = meta['max_score']
+        room.ball_speed_increase = meta['ball_speed_increase']
+        room.players = {
+            'p1': server.Player(id='p1', paddle_id=1),
+            'p2': server.Player(id='p2', paddle_id=2),
+        }
+        room.game_running = True
+        return room
+
+    def restore(self, room, index: int):
+        """Load keyframe `index` into a room created by new_room()."""
+        frame = self.keyframe(index)
+        room.current_tick = frame['tick']
+        room.serve_count = frame['serve_count']
+        room.ball.x, room.ball.y, room.ball.dx, room.ball.dy = frame['ball']
+        room.paddle1.y, room.paddle2.y = frame['paddle_y']
+        room.paddle1.score, room.paddle2.score = frame['score']
+        room.serve_delay = frame['serve_delay']
+        room.game_active = max(frame['score']) < room.max_score
+        room.game_paused = False
+        self.set_inputs(room, frame['mask'])
+
+    @staticmethod
+    def set_inputs(room, mask: int):
+        inputs = mask_inputs(mask)
+        for player in room.players.values():
+            player.input_state.update(inputs[player.paddle_id - 1])
+
+    def advance(self, room, tick: int):
+        """Re-simulate a room forward to `tick` using the recorded inputs."""
+        index = bisect.bisect_right(self.input_ticks, room.current_tick)
+        while room.current_tick < tick:
+            if index < len(self.input_ticks) and self.input_ticks[index] == room.current_tick + 1:
+                self.set_inputs(room, self.input_masks[index])
+                index += 1
+            room.step()
+
+    def seek(self, tick: int):
+        """A room holding the simulated state at `tick`, from the nearest keyframe."""
+        tick = max(self.first_tick, min(tick, self.last_tick))
+        room = self.new_room()
+        self.restore(room, bisect.bisect_right(self.keyframe_ticks, tick) - 1)
+        self.advance(room, tick)
+        return room
+
+    def verify(self) -> List[int]:
+        """Re-simulate from the first keyframe; return ticks whose keyframe didn't match."""
+        room = self.new_room()
+        self.restore(room, 0)
+        mismatches = []
+        for index in range(1, len(self.keyframe_ticks)):
+            self.advance(room, self.keyframe_ticks[index])
+            if self.capture(room) != self.keyframe(index):
+                mismatches.append(self.keyframe_ticks[index])
+                self.restore(room, index)
+        return mismatches
+
+    def close(self):
+        self.data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, seek and verify a match replay")
+    parser.add_argument('path')
+    parser.add_argument('--seek', type=int, metavar='TICK', help="Print the game state at TICK")
+    parser.add_argument('--verify', action='store_true', help="Check that re-simulation reproduces every keyframe")
+    args = parser.parse_args()
+
+    replay = Replay(args.path)
+    meta = replay.metadata
+    print("🏓 Pong Royale Replay 🏓")
+    print(f"Room {meta['room_id']} ({meta['room_type']}, {meta['tick_rate']} Hz, seed {meta['seed']}), "
+          f"recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta['started_at']))}")
+    print(f"Ticks {replay.first_tick}-{replay.last_tick} "
+          f"({(replay.last_tick - replay.first_tick) / meta['tick_rate']:.1f} s), "
+          f"{len(replay.keyframe_ticks)} keyframes, {len(replay.input_ticks)} input changes, "
+          f"{len(replay.data):,} bytes{'' if replay.end_tick is not None else ' (incomplete)'}")
+    final = replay.keyframe(len(replay.keyframe_ticks) - 1)
+    print(f"Score {final['score'][0]}-{final['score'][1]} at tick {final['tick']}")
+
+    if args.seek is not None:
+        import server  # noqa: F401 - loaded up front so the timing covers only the seek
+        started = time.perf_counter()
+        room = replay.seek(args.seek)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\nState at tick {room.current_tick} (seek took {elapsed:.1f} ms):")
+        print(json.dumps(room.get_state(), indent=2))
+
+    if args.verify:
+        mismatches = replay.verify()
+        if mismatches:
+            print(f"\nFAILED: re-simulation diverged at ticks {mismatches}")
+            raise SystemExit(1)
+        print(f"\nVerified: re-simulation reproduces all {len(replay.keyframe_ticks)} keyframes")
+    replay.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+import os
+
+# Execution mode: 'threading' (default), or cooperative green threads with
+# 'eventlet' / 'gevent'. Green modes have to monkey patch before anything else
+# is imported so that locks, sleeps and sockets become cooperative.
+ASYNC_MODE = os.environ.get('ASYNC_MODE', 'threading').lower()
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 from flask import Flask, request
 from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from flask_cors import CORS
@@ -5,10 +18,23 @@ import time
 import threading
 import uuid
 import json
-import os
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+import copy
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
+from collections import deque
 import math
+import random
+import bisect
+import traceback
+from numpy_physics import VectorPhysics
+import wire_format
+import metrics
+import packet_cache
+import replay
+from bots import Bot, BotPlanner, bot_settings
+from hibernation import RoomStore
+from timer_wheel import TimerWheel
+from sharding import BrokerManager, ShardDirectory, connect_broker, shard_for
 
 app = Flask(__name__)
 
@@ -19,18 +45,56 @@ app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
 # Enable CORS for all domains
 CORS(app, origins="*")
 
+# Room sharding: this process owns the rooms whose ID hashes to SHARD_INDEX.
+# With more than one shard, MESSAGE_QUEUE (local://host:port or redis://...)
+# carries cross-worker emits and lobby summaries; see sharding.py.
+SHARD_INDEX = int(os.environ.get('SHARD_INDEX', 0))
+SHARD_COUNT = int(os.environ.get('SHARD_COUNT', 1))
+MESSAGE_QUEUE = os.environ.get('MESSAGE_QUEUE')
+LOBBY_PUBLISH_INTERVAL = 1.0  # Seconds between lobby summary publishes
+
+# Lobby pagination: default and maximum rooms per page
+LOBBY_PAGE_SIZE = 50
+MAX_LOBBY_PAGE_SIZE = 200
+
+# Matchmaking: skill ratings within the same band (and region) are paired
+MATCH_SKILL_BAND = 200
+MATCH_SKILL_MAX = 10000  # Ratings are clamped to 0..MATCH_SKILL_MAX before banding
+MATCH_WAIT_SAMPLES = 1000  # Recent wait times kept for /stats percentiles
+
+# Room reaper: rooms are closed after this many seconds waiting for a second
+# player, with a match in progress but no input from anyone, or after the
+# match finished. Checked every REAPER_INTERVAL seconds.
+ROOM_WAITING_TTL = float(os.environ.get('ROOM_WAITING_TTL', 600))
+ROOM_IDLE_TTL = float(os.environ.get('ROOM_IDLE_TTL', 120))
+ROOM_FINISHED_TTL = float(os.environ.get('ROOM_FINISHED_TTL', 60))
+REAPER_INTERVAL = 1.0
+
+# Hibernation: with HIBERNATE_DIR set, rooms waiting for a second player for
+# HIBERNATE_AFTER seconds are written there and dropped from memory until the
+# next join_room or get_room_state (see hibernation.py). They still close at
+# the end of ROOM_WAITING_TTL.
+HIBERNATE_DIR = os.environ.get('HIBERNATE_DIR')
+HIBERNATE_AFTER = float(os.environ.get('HIBERNATE_AFTER', 30))
+
+socketio_options = {}
+if MESSAGE_QUEUE:
+    socketio_options['client_manager'] = BrokerManager(MESSAGE_QUEUE)
+
 # Configure SocketIO for production
 socketio = SocketIO(
     app, 
     cors_allowed_origins="*",
     logger=False,  # Disable debug logging in production
     engineio_logger=False,
-    async_mode='threading',  # Use threading for better compatibility
+    async_mode=ASYNC_MODE,  # 'threading' unless a green-thread mode is configured
+    json=packet_cache.SocketJSON,  # Splices pre-encoded payloads, times every encode
     ping_timeout=60,
-    ping_interval=25
+    ping_interval=25,
+    **socketio_options
 )
 
-@dataclass
+@dataclass(slots=True)
 class Ball:
     x: float
     y: float
@@ -39,7 +103,7 @@ class Ball:
     radius: float = 10
     speed: float = 300
 
-@dataclass
+@dataclass(slots=True)
 class Paddle:
     x: float
     y: float
@@ -48,25 +112,450 @@ class Paddle:
     speed: float = 400
     score: int = 0
 
-@dataclass
+# Sequenced inputs a player may have queued ahead of the simulation
+INPUT_BUFFER_SIZE = 64
+# Raw inputs received between two ticks; under spam the oldest are dropped
+INPUT_INBOX_SIZE = 256
+# The only keys a player_input event may carry
+INPUT_KEYS = ('up', 'down')
+# How far (in ticks) a client's intended tick may be from the room's: 2 s at 120 Hz
+INPUT_TICK_WINDOW = 240
+
+class InstrumentedLock:
+    """threading.Lock that records how often it is contended, and wait/hold times.
+    
+    Counters are only updated by the thread holding the lock, so they need no
+    extra synchronization.
+    """
+    __slots__ = ('_lock', '_acquired_at', 'acquisitions', 'contended',
+                 'wait_time', 'max_wait', 'hold_time', 'max_hold')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.hold_time = 0.0
+        self.max_hold = 0.0
+    
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        waited = 0.0
+        if not self._lock.acquire(False):
+            if not blocking:
+                return False
+            start = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = time.perf_counter() - start
+            self.contended += 1
+            metrics.LOCK_WAIT_SECONDS.observe(waited)
+        self.acquisitions += 1
+        self.wait_time += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._acquired_at = time.perf_counter()
+        return True
+    
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self.hold_time += held
+        self.max_hold = max(self.max_hold, held)
+        self._lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.release()
+    
+    @staticmethod
+    def summarize(locks) -> Dict[str, Any]:
+        """Combined counters for a group of locks, times in milliseconds."""
+        locks = list(locks)
+        acquisitions = sum(lock.acquisitions for lock in locks)
+        contended = sum(lock.contended for lock in locks)
+        return {
+            'acquisitions': acquisitions,
+            'contended': contended,
+            'contention_ratio': round(contended / acquisitions, 4) if acquisitions else 0.0,
+            'wait_ms_total': round(sum(lock.wait_time for lock in locks) * 1000, 3),
+            'wait_ms_max': round(max((lock.max_wait for lock in locks), default=0.0) * 1000, 3),
+            'hold_ms_avg': round(sum(lock.hold_time for lock in locks) * 1000 / acquisitions, 4) if acquisitions else 0.0,
+            'hold_ms_max': round(max((lock.max_hold for lock in locks), default=0.0) * 1000, 3)
+        }
+
+@dataclass(slots=True)
 class Player:
     id: str
     paddle_id: int  # 1 or 2
     input_state: Dict[str, bool] = None
     connected: bool = True
+    wire_format: str = 'json'  # 'json' or 'binary', negotiated at connect
+    # Raw (seq, tick, input) as received; appended by socket handlers without
+    # the room lock (deque append/popleft are atomic) and drained by the tick
+    input_inbox: deque = field(default_factory=lambda: deque(maxlen=INPUT_INBOX_SIZE))
+    # Up to INPUT_BUFFER_SIZE (seq, tick, input) waiting for their tick, in seq order
+    input_buffer: list = field(default_factory=list)
+    last_processed_seq: int = 0  # Acked back to the client in every snapshot
+    bot: Optional[Bot] = None  # Set for server-side bot players (see bots.py)
     
     def __post_init__(self):
         if self.input_state is None:
             self.input_state = {'up': False, 'down': False}
 
+# Full game_state keyframes are sent every this many snapshots; game_delta in between
+KEYFRAME_INTERVAL = int(os.environ.get('KEYFRAME_INTERVAL', 60))
+
+# Spectators watch from a sub-room of the match, at this snapshot rate (capped
+# at the room's own); under overload it is divided like non-critical rooms'
+SPECTATOR_SNAPSHOT_RATE = int(os.environ.get('SPECTATOR_SNAPSHOT_RATE', 20))
+
+# Difficulty of bots added without one: easy, medium, hard or a skill from 0 to 1
+BOT_DIFFICULTY = os.environ.get('BOT_DIFFICULTY', 'medium')
+
+# How often the tick scheduler wakes up; per-room rates are capped at this
+SCHEDULER_RATE = int(os.environ.get('SCHEDULER_RATE', 120))
+
+# Simulation (tick_rate) and network snapshot (snapshot_rate) rates per room type, in Hz
+ROOM_TYPES = {
+    'competitive': {'tick_rate': 120, 'snapshot_rate': 60},
+    'standard': {'tick_rate': 120, 'snapshot_rate': 60},
+    'casual': {'tick_rate': 60, 'snapshot_rate': 30},
+    'low_bandwidth': {'tick_rate': 60, 'snapshot_rate': 20},
+}
+DEFAULT_ROOM_TYPE = os.environ.get('DEFAULT_ROOM_TYPE', 'standard')
+
+# After a long stall a room simulates at most this many fixed steps per tick and
+# drops the rest of the backlog, instead of spiralling further behind
+MAX_CATCHUP_STEPS = int(os.environ.get('MAX_CATCHUP_STEPS', 30))
+
+# Pause (in simulated seconds) before the ball is served after a point
+SERVE_DELAY = 0.5
+
+# Round states reported in snapshots. 'serving' is the timed pause after a
+# point: ticks keep running while the countdown (serve_delay) runs out.
+ROUND_WAITING = 'waiting'    # Fewer than two players, room not ticked
+ROUND_SERVING = 'serving'    # Ball held at center until the countdown ends
+ROUND_PLAYING = 'playing'
+ROUND_FINISHED = 'finished'  # A paddle reached max_score
+
+# Overload control: when scheduler frames finish this far past their deadline
+# (smoothed), non-critical snapshots are thinned (degraded) and new rooms are
+# refused (shedding). Levels step back down once lateness falls below half
+# the threshold and the level has been held for OVERLOAD_HOLD seconds.
+OVERLOAD_DEGRADE_MS = float(os.environ.get('OVERLOAD_DEGRADE_MS', 4))
+OVERLOAD_SHED_MS = float(os.environ.get('OVERLOAD_SHED_MS', 12))
+OVERLOAD_HOLD = 2.0
+OVERLOAD_SMOOTHING = 0.02  # EWMA weight of each frame's lateness
+OVERLOAD_RETRY_AFTER = 5  # Seconds refused clients are told to wait before retrying
+OVERLOAD_LEVELS = ('normal', 'degraded', 'shedding')
+OVERLOAD_SNAPSHOT_DIVISORS = (1, 2, 4)  # Non-critical rooms send every Nth snapshot
+
+# Match recording: with REPLAY_DIR set, every match is written to a replay
+# file there (see replay.py); files are appended by a background thread
+REPLAY_DIR = os.environ.get('REPLAY_DIR')
+replay_writer = replay.ReplayWriter() if REPLAY_DIR else None
+
+def next_deadline(deadline: float, interval: float, now: float) -> float:
+    """Advance a periodic deadline by one interval without bursting to catch up."""
+    deadline += interval
+    return deadline if deadline > now else now + interval
+
+def diff_state(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the fields of `current` that differ from `previous`.
+    
+    Nested dicts are diffed recursively; keys that disappeared are sent as None.
+    """
+    delta = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = diff_state(old, value)
+            if nested:
+                delta[key] = nested
+        elif key not in previous or value != old:
+            delta[key] = value
+    for key in previous:
+        if key not in current:
+            delta[key] = None
+    return delta
+
+class OverloadController:
+    """Tracks aggregate tick lateness and degrades service in steps when saturated.
+    
+    Every scheduler frame reports how late it finished. Above the degrade
+    threshold, rooms whose round isn't in play (serve countdown, finished
+    match) only send every snapshot_divisor-th snapshot; above the shed
+    threshold, creating rooms is refused with a retryable error. Matches in
+    play keep their full snapshot rate at every level.
+    
+    Updated from the tick workers without locking: a lost update only nudges
+    the moving average.
+    """
+    def __init__(self, degrade_after: float = OVERLOAD_DEGRADE_MS / 1000,
+                 shed_after: float = OVERLOAD_SHED_MS / 1000, hold: float = OVERLOAD_HOLD):
+        self.thresholds = (0.0, degrade_after, shed_after)
+        self.hold = hold
+        self.level = 0
+        self.lateness = 0.0  # Smoothed seconds past the frame deadline
+        self.changed_at = time.time()
+        self.transitions = 0
+        self.thinned_snapshots = 0
+        self.refused_rooms = 0
+    
+    @property
+    def snapshot_divisor(self) -> int:
+        return OVERLOAD_SNAPSHOT_DIVISORS[self.level]
+    
+    @property
+    def accepting_rooms(self) -> bool:
+        return self.level < 2
+    
+    def observe(self, lateness: float, now: float):
+        """Record how late one scheduler frame finished and update the level."""
+        self.lateness += (lateness - self.lateness) * OVERLOAD_SMOOTHING
+        level = self.level
+        if level < 2 and self.lateness >= self.thresholds[level + 1]:
+            self._set_level(level + 1, now)
+        elif level > 0 and self.lateness < self.thresholds[level] / 2 and now - self.changed_at >= self.hold:
+            self._set_level(level - 1, now)
+    
+    def _set_level(self, level: int, now: float):
+        print(f"Overload level {OVERLOAD_LEVELS[self.level]} -> {OVERLOAD_LEVELS[level]} "
+              f"(frame lateness {self.lateness * 1000:.1f} ms)")
+        self.level = level
+        self.changed_at = now
+        self.transitions += 1
+        metrics.OVERLOAD_LEVEL.set(level)
+    
+    def refuse_room(self) -> Dict[str, Any]:
+        """Count a refused room and return the retryable error sent to the client."""
+        self.refused_rooms += 1
+        metrics.OVERLOAD_REFUSED_ROOMS.inc()
+        return {'success': False, 'error': 'Server is overloaded, try again shortly',
+                'retryable': True, 'retry_after': OVERLOAD_RETRY_AFTER}
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'level': OVERLOAD_LEVELS[self.level],
+            'lateness_ms': round(self.lateness * 1000, 3),
+            'degrade_ms': round(self.thresholds[1] * 1000, 3),
+            'shed_ms': round(self.thresholds[2] * 1000, 3),
+            'snapshot_divisor': self.snapshot_divisor,
+            'accepting_rooms': self.accepting_rooms,
+            'level_seconds': round(time.time() - self.changed_at, 1),
+            'transitions': self.transitions,
+            'thinned_snapshots': self.thinned_snapshots,
+            'refused_rooms': self.refused_rooms
+        }
+
+overload_controller = OverloadController()
+
+class TickScheduler:
+    """Steps every active GameRoom from a small fixed pool of tick workers.
+    
+    Rooms are spread across the workers' run queues when they register, so the
+    number of workers stays constant no matter how many matches are live.
+    Workers are Socket.IO background tasks: OS threads in threading mode,
+    cooperative green threads under eventlet/gevent.
+    """
+    def __init__(self, tick_rate: int = 60, workers: int = 1, physics_backend: str = 'python'):
+        self.tick_rate = tick_rate
+        self.frame_time = 1.0 / tick_rate
+        metrics.SCHEDULER_FRAME_BUDGET.set(self.frame_time)
+        self.workers = max(1, workers)
+        self.run_queues = [dict() for _ in range(self.workers)]  # room_id -> GameRoom
+        self.threads = []
+        self.running = False
+        self.lock = threading.Lock()
+        
+        # Optional batched NumPy physics; falls back to the scalar path
+        self.vectorized = physics_backend == 'numpy' and VectorPhysics.available
+        if physics_backend == 'numpy' and not self.vectorized:
+            print("WARNING: PHYSICS_BACKEND=numpy but NumPy is not installed, using scalar physics")
+    
+    def register(self, room: 'GameRoom'):
+        """Add a room to the least loaded run queue."""
+        with self.lock:
+            queue = min(self.run_queues, key=len)
+            queue[room.room_id] = room
+            if not self.running:
+                self._start()
+    
+    def deregister(self, room: 'GameRoom'):
+        """Remove a room from whichever run queue holds it."""
+        with self.lock:
+            for queue in self.run_queues:
+                if queue.pop(room.room_id, None) is not None:
+                    break
+    
+    def room_count(self) -> int:
+        return sum(len(queue) for queue in self.run_queues)
+    
+    def _start(self):
+        self.running = True
+        self.threads = [
+            socketio.start_background_task(self._worker_loop, index)
+            for index in range(self.workers)
+        ]
+        backend = 'numpy' if self.vectorized else 'python'
+        print(f"Tick scheduler started with {self.workers} {ASYNC_MODE} worker(s) at {self.tick_rate} Hz ({backend} physics)")
+    
+    def stop(self):
+        self.running = False
+    
+    @staticmethod
+    def fail_room(room: 'GameRoom'):
+        """Log the exception being handled and take the room out of the scheduler,
+        so one broken room can't stop the others on its worker."""
+        metrics.SCHEDULER_ROOM_FAILURES.inc()
+        print(f"ERROR: room {room.room_id} failed its tick and was stopped\n{traceback.format_exc()}")
+        tick_scheduler.deregister(room)
+        try:
+            room.stop_game_loop()
+        except Exception:
+            room.game_running = False
+            traceback.print_exc()
+    
+    @staticmethod
+    def isolate(room: 'GameRoom', action, *args) -> bool:
+        """Run action(*args) on behalf of one room; if it raises, fail the room
+        and return False."""
+        try:
+            action(*args)
+        except Exception:
+            TickScheduler.fail_room(room)
+            return False
+        return True
+    
+    @staticmethod
+    def run_frame(rooms: List['GameRoom'], now: float, engine: Optional[VectorPhysics] = None):
+        """Simulate and broadcast every room that is due at `now` (one scheduler frame).
+        
+        With a VectorPhysics engine the rooms are stepped in batches, otherwise
+        each room is ticked on its own. Bots in any of the rooms are planned
+        for first, in one batch across all of them. A room whose work raises
+        is stopped (see fail_room) and the frame goes on without it.
+        """
+        started = time.perf_counter()
+        try:
+            predictions = bot_planner.update(rooms)
+        except Exception:
+            # Plan room by room to find the one at fault
+            predictions = 0
+            for room in rooms:
+                if room.bots:
+                    try:
+                        predictions += bot_planner.update([room])
+                    except Exception:
+                        TickScheduler.fail_room(room)
+        if predictions:
+            metrics.BOT_PREDICTIONS.inc(predictions)
+            metrics.BOT_PLAN_SECONDS.observe(time.perf_counter() - started)
+            
+        if engine is None:
+            for room in rooms:
+                TickScheduler.isolate(room, room.tick, now)
+            return
+            
+        rooms = [room for room in rooms if room.game_running]
+        # Rooms may owe different numbers of fixed steps; batch step
+        # by step over the rooms that still owe one
+        due = [(room, room.due_steps(now)) for room in rooms]
+        step = 0
+        while True:
+            batch = [room for room, steps in due if steps > step and room.game_running]
+            if not batch:
+                break
+            started = time.perf_counter()
+            batch = [room for room in batch if TickScheduler.isolate(room, room.apply_buffered_inputs)]
+            try:
+                states = engine.simulate(batch, [room.step_dt for room in batch])
+            except Exception:
+                # No room has been written to yet: step them one at a time
+                # to find the one at fault
+                batch = [room for room in batch
+                         if TickScheduler.isolate(room, engine.step, [room], [room.step_dt])]
+            else:
+                batch = [state[0] for state in states
+                         if TickScheduler.isolate(state[0], engine.scatter, *state)]
+            batch = [room for room in batch if TickScheduler.isolate(room, room.finish_step)]
+            # The batch's time is shared evenly between its rooms
+            share = (time.perf_counter() - started) / max(1, len(batch))
+            for room in batch:
+                room.metrics.record_update(1, share)
+            step += 1
+        for room in rooms:
+            if room.game_running:
+                TickScheduler.isolate(room, room.send_snapshots, now)
+    
+    def _worker_loop(self, index: int):
+        """Tick every room in this worker's run queue once per frame."""
+        queue = self.run_queues[index]
+        engine = VectorPhysics() if self.vectorized else None
+        next_tick = time.time()
+        
+        while self.running:
+            frame_start = time.time()
+            metrics.SCHEDULER_LATENESS_SECONDS.observe(max(0.0, frame_start - next_tick))
+            try:
+                self.run_frame(list(queue.values()), frame_start, engine)
+            except Exception:
+                # Rooms are isolated in run_frame; this keeps the worker alive regardless
+                print(f"ERROR: tick worker {index} frame failed\n{traceback.format_exc()}")
+            frame_duration = time.time() - frame_start
+            metrics.SCHEDULER_FRAME_SECONDS.observe(frame_duration)
+            if frame_duration > self.frame_time:
+                metrics.SCHEDULER_OVERRUNS.inc()
+            
+            # Sleep until the next frame boundary; if we fell behind, start
+            # over from now instead of trying to catch up with a burst. The
+            # sleep is always taken (even for 0s) so green threads can yield.
+            next_tick += self.frame_time
+            now = time.time()
+            sleep_time = next_tick - now
+            overload_controller.observe(max(0.0, -sleep_time), now)
+            if sleep_time <= 0:
+                next_tick = now
+            socketio.sleep(max(0, sleep_time))
+
+tick_scheduler = TickScheduler(
+    tick_rate=SCHEDULER_RATE,
+    workers=int(os.environ.get('TICK_WORKERS', 1)),
+    physics_backend=os.environ.get('PHYSICS_BACKEND', 'python').lower()
+)
+bot_planner = BotPlanner()
+
 class GameRoom:
-    def __init__(self, room_id: str, width: int = 800, height: int = 600):
+    def __init__(self, room_id: str, width: int = 800, height: int = 600,
+                 room_type: str = DEFAULT_ROOM_TYPE, tick_rate: Optional[int] = None,
+                 snapshot_rate: Optional[int] = None, seed: Optional[int] = None):
         self.room_id = room_id
         self.width = width
         self.height = height
         self.max_players = 2
         self.created_at = time.time()
         
+        # Simulation and snapshot rates, independent of each other
+        self.room_type = room_type if room_type in ROOM_TYPES else 'standard'
+        rates = ROOM_TYPES[self.room_type]
+        self.tick_rate = max(10, min(SCHEDULER_RATE, int(tick_rate or rates['tick_rate'])))
+        self.snapshot_rate = max(1, min(self.tick_rate, int(snapshot_rate or rates['snapshot_rate'])))
+        self.next_snapshot_at = 0.0
+        self.snapshot_slot = 0  # Counts slots while snapshots are thinned under overload
+        
+        # Fixed-timestep simulation: wall-clock time is accumulated and consumed
+        # in steps of exactly step_dt, so results don't depend on scheduling
+        self.step_dt = 1.0 / self.tick_rate
+        self.accumulator = 0.0
+        
+        # Serves are drawn from an RNG derived from (seed, serve_count), so a
+        # room replays identically given the same seed and inputs
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.serve_count = 0
+        
         # Game objects
         self.ball = Ball(
             x=width / 2,
@@ -87,20 +576,44 @@ class GameRoom:
         
         # Players
         self.players: Dict[str, Player] = {}
+        self.binary_sids: List[str] = []  # Players on the binary wire format
+        self.bots: List[Player] = []  # Players controlled by the server
         self.game_active = False
         self.game_paused = False
         self.last_update = time.time()
+        self.current_tick = 0
+        
+        # Delta compression: last state sent to the room and when the last keyframe went out
+        self.baseline_state: Optional[Dict[str, Any]] = None
+        self.state_buffers = None  # Reused snapshot dicts, allocated on the first JSON broadcast
+        self.metrics = metrics.RoomMetrics()
+        self.snapshot_count = 0
+        self.keyframe_snapshot = 0
+        
+        # Spectators: client_id -> wire format. They share one sub-room per
+        # format with their own snapshot rate and delta chain
+        self.spectators: Dict[str, str] = {}
+        self.spectator_rate = max(1, min(self.snapshot_rate, SPECTATOR_SNAPSHOT_RATE))
+        self.next_spectator_at = 0.0
+        self.spectator_baseline: Optional[Dict[str, Any]] = None
+        self.spectator_buffers = None
+        self.spectator_snapshot_count = 0
+        self.spectator_keyframe_snapshot = 0
+        # Clients waiting for a keyframe, sent by the next snapshot (see send_keyframe)
+        self.keyframe_waiters: List[str] = []
+        self.spectator_keyframe_waiters: List[str] = []
         
-        # Game loop management
-        self.game_thread = None
+        # Game loop management (ticked by the shared TickScheduler)
         self.game_running = False
-        self.lock = threading.Lock()
+        self.serve_delay = 0.0  # Serve countdown: simulated seconds the ball is held at center
+        self.recorder: Optional[replay.ReplayRecorder] = None  # Set while a match is recorded
+        self.lock = InstrumentedLock()
         
         # Game settings
         self.max_score = 10
         self.ball_speed_increase = 1.05  # Speed multiplier after each hit
         
-    def add_player(self, client_id: str) -> Optional[int]:
+    def add_player(self, client_id: str, wire_format: str = 'json', bot: Optional[Bot] = None) -> Optional[int]:
         """Add a player to the room. Returns paddle number (1 or 2) or None if room is full."""
         if len(self.players) >= self.max_players:
             return None
@@ -110,8 +623,11 @@ class GameRoom:
         
         self.players[client_id] = Player(
             id=client_id,
-            paddle_id=paddle_id
+            paddle_id=paddle_id,
+            wire_format=wire_format,
+            bot=bot
         )
+        self._update_player_lists()
         
         print(f"Player {client_id} added to room {self.room_id} as paddle {paddle_id}")
         
@@ -125,83 +641,379 @@ class GameRoom:
         """Remove a player from the room."""
         if client_id in self.players:
             del self.players[client_id]
+            self._update_player_lists()
             print(f"Player {client_id} removed from room {self.room_id}")
             
         # Stop game if we don't have enough players
         if len(self.players) < 2:
             self.stop_game_loop()
     
+    def add_bot(self, difficulty=BOT_DIFFICULTY) -> Optional[int]:
+        """Add a server-side bot player. Returns its paddle number, or None if the
+        room is full; raises ValueError for an unknown difficulty."""
+        bot = Bot.create(difficulty, self.tick_rate)
+        return self.add_player(f"bot-{uuid.uuid4().hex[:8]}", bot=bot)
+    
+    def _update_player_lists(self):
+        # Replaced rather than mutated, so a broadcast in progress keeps a consistent list
+        self.binary_sids = [p.id for p in self.players.values() if p.wire_format == 'binary']
+        self.bots = [p for p in self.players.values() if p.bot is not None]
+    
     def start_game_loop(self):
-        """Start the game loop for this room in a background thread."""
+        """Start the game for this room and register it with the tick scheduler."""
         if not self.game_running and len(self.players) == 2:
             self.game_running = True
             self.game_active = True
             self.game_paused = False
             self.reset_ball()
+            self.last_update = time.time()
+            self.next_snapshot_at = self.last_update
+            self.accumulator = 0.0
+            if REPLAY_DIR:
+                self.recorder = replay.ReplayRecorder.start(self, REPLAY_DIR, replay_writer)
             
-            # Start the game thread
-            self.game_thread = threading.Thread(
-                target=self._room_game_loop, 
-                name=f"GameLoop-{self.room_id}",
-                daemon=True
-            )
-            self.game_thread.start()
+            tick_scheduler.register(self)
             print(f"Game loop started for room {self.room_id}")
     
     def stop_game_loop(self):
-        """Stop the game loop for this room."""
+        """Stop the game for this room and remove it from the tick scheduler."""
         if self.game_running:
             self.game_running = False
             self.game_active = False
             self.game_paused = True
+            tick_scheduler.deregister(self)
+            for spectator in (False, True):
+                self.send_waiting_keyframes(spectator, current=True)
+            if self.recorder is not None:
+                with self.lock:
+                    self.recorder.close(self)
+                    print(f"Recorded replay {self.recorder.path}")
+                    self.recorder = None
             print(f"Game loop stopped for room {self.room_id}")
     
-    def _room_game_loop(self):
-        """Main game loop for this specific room running at 60 FPS."""
-        target_fps = 60
-        frame_time = 1.0 / target_fps
-        last_time = time.time()
+    def tick(self, now: float):
+        """Called on every scheduler tick: simulate and/or broadcast when due."""
+        if not self.game_running:
+            return
+            
+        steps = self.due_steps(now)
+        if steps:
+            started = time.perf_counter()
+            for _ in range(steps):
+                self.step()
+            self.metrics.record_update(steps, time.perf_counter() - started)
         
-        print(f"Room {self.room_id} game loop thread started")
+        self.send_snapshots(now)
+    
+    def send_snapshots(self, now: float):
+        """Broadcast to the players and to the spectators if their snapshots are due."""
+        if self.snapshot_due(now):
+            self.broadcast_state()
+        if self.spectators and self.spectator_snapshot_due(now):
+            self.broadcast_spectators()
+    
+    def due_steps(self, now: float) -> int:
+        """Accumulate elapsed time and return how many fixed steps to run now."""
+        self.accumulator += now - self.last_update
+        self.last_update = now
         
-        while self.game_running and len(self.players) == 2:
-            current_time = time.time()
-            dt = current_time - last_time
-            last_time = current_time
-            
-            # Update game state with thread safety
+        steps = int(self.accumulator // self.step_dt)
+        if steps > MAX_CATCHUP_STEPS:
+            # Too far behind: run a bounded burst and drop the rest
+            self.accumulator = 0.0
+            return MAX_CATCHUP_STEPS
+        self.accumulator -= steps * self.step_dt
+        return steps
+    
+    def step(self):
+        """Run one fixed simulation step with thread safety."""
+        with self.lock:
+            self._apply_buffered_inputs()
+            self.update_game_state(self.step_dt)
+            self.current_tick += 1
+            if self.recorder is not None:
+                self.recorder.record_tick(self)
+    
+    def finish_step(self):
+        """Count (and record) the step just simulated by the batched physics."""
+        with self.lock:
+            self.current_tick += 1
+            if self.recorder is not None:  # Not closed meanwhile
+                self.recorder.record_tick(self)
+    
+    def apply_buffered_inputs(self):
+        """Apply received inputs whose intended tick is the one about to run."""
+        with self.lock:
+            self._apply_buffered_inputs()
+    
+    def drain_inputs(self):
+        """Move inputs received since the last tick into the per-player buffers."""
+        with self.lock:
+            self._drain_inputs()
+    
+    def _apply_buffered_inputs(self):
+        self._drain_inputs()
+        next_tick = self.current_tick + 1
+        for player in self.players.values():
+            buffer = player.input_buffer
+            due = 0
+            while due < len(buffer) and buffer[due][1] <= next_tick:
+                seq, _, input_data = buffer[due]
+                player.input_state.update(input_data)
+                player.last_processed_seq = seq
+                due += 1
+            if due:
+                del buffer[:due]
+    
+    def _drain_inputs(self):
+        """Caller holds the lock. Unsequenced input applies now; sequenced input is
+        buffered for its tick, dropping stale or duplicate sequence numbers."""
+        for player in self.players.values():
+            inbox = player.input_inbox
+            while inbox:
+                seq, tick, input_data = inbox.popleft()
+                if seq is None:
+                    player.input_state.update(input_data)
+                    continue
+                    
+                buffer = player.input_buffer
+                if seq <= player.last_processed_seq:
+                    continue
+                entry = (seq, tick if tick is not None else 0, input_data)
+                if not buffer or seq > buffer[-1][0]:
+                    buffer.append(entry)
+                else:
+                    # Arrived out of order: keep the buffer sorted by seq
+                    position = bisect.bisect_left(buffer, (seq,))
+                    if buffer[position][0] == seq:
+                        continue  # Duplicate
+                    buffer.insert(position, entry)
+                if len(buffer) > INPUT_BUFFER_SIZE:
+                    del buffer[0]
+    
+    def snapshot_due(self, now: float) -> bool:
+        """True (and schedules the next one) if a snapshot is due at snapshot_rate."""
+        if now < self.next_snapshot_at:
+            return False
+        self.next_snapshot_at = next_deadline(self.next_snapshot_at, 1.0 / self.snapshot_rate, now)
+        
+        # Under overload, rooms whose round isn't in play skip snapshot slots
+        divisor = overload_controller.snapshot_divisor
+        if divisor > 1 and self.round_state != ROUND_PLAYING:
+            self.snapshot_slot += 1
+            if self.snapshot_slot % divisor:
+                overload_controller.thinned_snapshots += 1
+                return False
+        return True
+    
+    def broadcast_state(self):
+        """Emit the current game state to all clients in this room.
+        
+        Per-tick emits never go through the message queue: a room's players
+        are always connected to the shard that owns it.
+        
+        A full `game_state` keyframe goes out every KEYFRAME_INTERVAL snapshots;
+        in between, `game_delta` carries only the fields that changed since
+        the previous broadcast, tagged with `tick` and `base_tick`. Clients
+        that negotiated the binary wire format get `game_state_bin` instead.
+        """
+        binary_sids = self.binary_sids
+        if len(self.bots) == len(self.players):
+            return  # Nobody to send to
+        if self.keyframe_waiters:
+            self.send_waiting_keyframes()
+        if binary_sids:
+            started = time.perf_counter()
             with self.lock:
-                self.update_game_state(dt)
-                game_state = self.get_state()
+                payload = wire_format.encode_room_state(self)
+            encoded = time.perf_counter()
+            for sid in binary_sids:
+                socketio.emit('game_state_bin', payload, to=sid, ignore_queue=True)
+            self.metrics.record_snapshot(encoded - started, time.perf_counter() - encoded,
+                                         len(payload) * len(binary_sids), 'binary')
+            if len(binary_sids) + len(self.bots) == len(self.players):
+                return
+        
+        # Alternate between two reused buffers: one holds the previous
+        # snapshot (the delta baseline) while the other is refilled
+        started = time.perf_counter()
+        if self.state_buffers is None:
+            self.state_buffers = (self.new_state(), self.new_state())
+        with self.lock:
+            game_state = self.fill_state(self.state_buffers[self.snapshot_count % 2])
             
-            # Emit game state to all clients in this room
-            socketio.emit('game_state', game_state, room=self.room_id)
+        self.snapshot_count += 1
+        baseline = self.baseline_state
+        if baseline is None or self.snapshot_count - self.keyframe_snapshot >= KEYFRAME_INTERVAL:
+            self.keyframe_snapshot = self.snapshot_count
+            event, payload = 'game_state', game_state
+        else:
+            payload = diff_state(baseline, game_state)
+            payload['base_tick'] = baseline['tick']
+            event = 'game_delta'
             
-            # Sleep to maintain 60 FPS
-            elapsed = time.time() - current_time
-            sleep_time = max(0, frame_time - elapsed)
-            time.sleep(sleep_time)
+        # Emitted JSON size is sampled: encoding every snapshot twice would double the cost
+        emitted = 0
+        if self.snapshot_count % metrics.EMIT_SIZE_SAMPLE_EVERY == 0:
+            recipients = len(self.players) - len(binary_sids) - len(self.bots)
+            emitted = len(json.dumps(payload, separators=(',', ':'))) * recipients * metrics.EMIT_SIZE_SAMPLE_EVERY
+        serialized = time.perf_counter()
+        socketio.emit(event, payload, room=self.room_id, skip_sid=binary_sids, ignore_queue=True)
+        self.metrics.record_snapshot(serialized - started, time.perf_counter() - serialized, emitted, 'json')
+        self.baseline_state = game_state
+    
+    def spectator_snapshot_due(self, now: float) -> bool:
+        """True (and schedules the next one) if a spectator snapshot is due."""
+        if now < self.next_spectator_at:
+            return False
+        interval = overload_controller.snapshot_divisor / self.spectator_rate
+        self.next_spectator_at = next_deadline(self.next_spectator_at, interval, now)
+        return True
+    
+    def spectator_channel(self, wire_format: str = 'json') -> str:
+        """Socket.IO room that the spectators using a wire format are joined to."""
+        return f"{self.room_id}/spectators" + ('/binary' if wire_format == 'binary' else '')
+    
+    def add_spectator(self, client_id: str, wire_format: str = 'json'):
+        self.spectators[client_id] = wire_format
+    
+    def remove_spectator(self, client_id: str) -> Optional[str]:
+        """Remove a spectator; returns the channel they were watching from."""
+        wire = self.spectators.pop(client_id, None)
+        return self.spectator_channel(wire) if wire is not None else None
+    
+    def broadcast_spectators(self):
+        """Emit one snapshot to all spectators, however many there are.
+        
+        Each format's payload is built and encoded once and sent to the
+        spectator sub-room with a single emit, so the serialization cost
+        doesn't grow with the number of watchers. JSON spectators get
+        keyframes and deltas against the previous spectator snapshot.
+        """
+        if self.spectator_keyframe_waiters:
+            self.send_waiting_keyframes(spectator=True)
+        formats = set(self.spectators.values())
+        if 'binary' in formats:
+            started = time.perf_counter()
+            with self.lock:
+                payload = wire_format.encode_room_state(self)
+            encoded = time.perf_counter()
+            socketio.emit('game_state_bin', payload, room=self.spectator_channel('binary'), ignore_queue=True)
+            self.metrics.record_snapshot(encoded - started, time.perf_counter() - encoded, len(payload), 'binary')
+        if 'json' not in formats:
+            return
+        
+        started = time.perf_counter()
+        if self.spectator_buffers is None:
+            self.spectator_buffers = (self.new_state(), self.new_state())
+        with self.lock:
+            game_state = self.fill_state(self.spectator_buffers[self.spectator_snapshot_count % 2])
         
-        print(f"Room {self.room_id} game loop thread ended")
+        self.spectator_snapshot_count += 1
+        baseline = self.spectator_baseline
+        if baseline is None or self.spectator_snapshot_count - self.spectator_keyframe_snapshot >= KEYFRAME_INTERVAL:
+            self.spectator_keyframe_snapshot = self.spectator_snapshot_count
+            event, payload = 'game_state', game_state
+        else:
+            payload = diff_state(baseline, game_state)
+            payload['base_tick'] = baseline['tick']
+            event = 'game_delta'
+        serialized = time.perf_counter()
+        socketio.emit(event, payload, room=self.spectator_channel('json'), ignore_queue=True)
+        self.metrics.record_snapshot(serialized - started, time.perf_counter() - serialized, 0, 'json')
+        self.spectator_baseline = game_state
+    
+    def get_keyframe(self, spectator: bool = False) -> Dict[str, Any]:
+        """Full state matching the last broadcast, for clients that (re)join mid-match.
+        
+        Spectators get the state their own delta chain is based on.
+        """
+        with self.lock:
+            # Copied under the lock: the tick refills the snapshot buffers in place
+            baseline = self.spectator_baseline if spectator else self.baseline_state
+            if baseline is not None:
+                return copy.deepcopy(baseline)
+            return self.get_state()
+    
+    def send_keyframe(self, client_id: str, spectator: bool = False):
+        """Send a client the full state to apply game_delta updates against.
+        
+        While the match runs, the client waits for the next snapshot: the tick
+        encodes the keyframe once for everyone who asked since the last one
+        (see send_waiting_keyframes). Otherwise the state is sent right away.
+        """
+        with self.lock:
+            if self.game_running:
+                (self.spectator_keyframe_waiters if spectator else self.keyframe_waiters).append(client_id)
+                return
+            baseline = self.spectator_baseline if spectator else self.baseline_state
+            packet = packet_cache.encode(baseline if baseline is not None else self.get_state(), 'game_state')
+        socketio.emit('game_state', packet, to=client_id)
     
-    def update_player_input(self, client_id: str, input_data: Dict[str, bool]):
-        """Update player input state with thread safety."""
+    def send_waiting_keyframes(self, spectator: bool = False, current: bool = False):
+        """Send the clients waiting in send_keyframe() one shared keyframe.
+        
+        Called by the tick just before it broadcasts a snapshot, with the
+        previous snapshot (the base of the delta about to go out). The
+        current state is sent instead when there is no previous snapshot yet
+        or, with `current`, when the match stops.
+        """
         with self.lock:
-            if client_id in self.players:
-                self.players[client_id].input_state.update(input_data)
+            waiters = self.spectator_keyframe_waiters if spectator else self.keyframe_waiters
+            if not waiters:
+                return
+            baseline = None
+            if not current:
+                baseline = self.spectator_baseline if spectator else self.baseline_state
+            packet = packet_cache.encode(baseline if baseline is not None else self.get_state(), 'game_state')
+            if spectator:
+                self.spectator_keyframe_waiters = []
+            else:
+                self.keyframe_waiters = []
+        socketio.emit('game_state', packet, to=waiters, ignore_queue=True)
+    
+    def update_player_input(self, client_id: str, input_data: Dict[str, bool],
+                            seq: Optional[int] = None, tick: Optional[int] = None,
+                            count: bool = True):
+        """Queue player input for the next tick without taking the room lock.
+        
+        Unsequenced input is applied at the next tick. Input with a client
+        sequence number is buffered and applied at its intended tick (or the
+        next one, if that has already run); stale or duplicate sequence numbers
+        are dropped when the tick drains the inbox. Bots pass count=False: only
+        input from a socket counts as activity for the metrics and the reaper.
+        """
+        player = self.players.get(client_id)
+        if player is not None:
+            player.input_inbox.append((seq, tick, input_data))
+            if count:
+                self.metrics.inputs += 1
     
     def reset_ball(self):
-        """Reset ball to center with random direction."""
+        """Reset ball to center with a random direction drawn from the room's seed."""
         self.ball.x = self.width / 2
         self.ball.y = self.height / 2
         
-        # Random direction
-        direction = 1 if time.time() % 2 < 1 else -1
-        angle = (time.time() % 0.5) - 0.25  # -0.25 to 0.25
+        # Random direction, reproducible from (seed, serve_count)
+        rng = random.Random((self.seed << 32) | self.serve_count)
+        self.serve_count += 1
+        direction = 1 if rng.random() < 0.5 else -1
+        angle = rng.uniform(-0.25, 0.25)
         
         self.ball.dx = direction * self.ball.speed
         self.ball.dy = angle * self.ball.speed
     
+    @property
+    def round_state(self) -> str:
+        """Current round state, derived from the simulated fields so both physics backends agree."""
+        if not self.game_running:
+            return ROUND_WAITING
+        if self.paddle1.score >= self.max_score or self.paddle2.score >= self.max_score:
+            return ROUND_FINISHED
+        if self.serve_delay > 0:
+            return ROUND_SERVING
+        return ROUND_PLAYING
+    
     def update_game_state(self, dt: float):
         """Update the game state for one frame."""
         if not self.game_active or self.game_paused:
@@ -217,19 +1029,24 @@ class GameRoom:
             elif input_state.get('down', False):
                 paddle.y = min(self.height - paddle.height, paddle.y + paddle.speed * dt)
         
+        # Hold the ball at center during the pause after a point
+        if self.serve_delay > 0:
+            self.serve_delay = max(0.0, self.serve_delay - dt)
+            return
+        
         # Update ball position
+        start_x, start_y, start_dy = self.ball.x, self.ball.y, self.ball.dy
         self.ball.x += self.ball.dx * dt
         self.ball.y += self.ball.dy * dt
         
         # Ball collision with top/bottom walls
-        if self.ball.y <= self.ball.radius:
-            self.ball.y = self.ball.radius
-            self.ball.dy = abs(self.ball.dy)
-        elif self.ball.y >= self.height - self.ball.radius:
-            self.ball.y = self.height - self.ball.radius
-            self.ball.dy = -abs(self.ball.dy)
+        self._bounce_off_walls()
         
-        # Ball collision with paddles
+        # Ball collision with paddles: first along the path travelled this step,
+        # so a fast ball can't tunnel through, then by overlap (e.g. a paddle
+        # moving into the ball)
+        if not self._sweep_paddle_collision(self.paddle1, start_x, start_y, start_dy, dt):
+            self._sweep_paddle_collision(self.paddle2, start_x, start_y, start_dy, dt)
         self._check_paddle_collision(self.paddle1)
         self._check_paddle_collision(self.paddle2)
         
@@ -243,6 +1060,47 @@ class GameRoom:
             self.paddle1.score += 1
             self._handle_score()
     
+    def _bounce_off_walls(self):
+        if self.ball.y <= self.ball.radius:
+            self.ball.y = self.ball.radius
+            self.ball.dy = abs(self.ball.dy)
+        elif self.ball.y >= self.height - self.ball.radius:
+            self.ball.y = self.height - self.ball.radius
+            self.ball.dy = -abs(self.ball.dy)
+    
+    def _sweep_paddle_collision(self, paddle: Paddle, start_x: float, start_y: float,
+                                start_dy: float, dt: float) -> bool:
+        """Swept check of the ball's path this step against a paddle's face.
+        
+        On a hit the ball bounces at the exact time of impact and travels the
+        rest of the step with its new velocity. Returns True on a hit.
+        """
+        ball = self.ball
+        left = paddle.x < self.width / 2
+        if left:
+            face = paddle.x + paddle.width + ball.radius
+            crossed = ball.dx < 0 and start_x >= face and ball.x <= face
+        else:
+            face = paddle.x - ball.radius
+            crossed = ball.dx > 0 and start_x <= face and ball.x >= face
+        if not crossed:
+            return False
+            
+        impact = (face - start_x) / ball.dx  # Time of impact within the step
+        hit_y = min(max(start_y + start_dy * impact, ball.radius), self.height - ball.radius)
+        if hit_y + ball.radius < paddle.y or hit_y - ball.radius > paddle.y + paddle.height:
+            return False
+            
+        # Same bounce and spin as _check_paddle_collision, at the impact point
+        spin_factor = ((hit_y - paddle.y) / paddle.height - 0.5) * 2
+        ball.dx = abs(ball.dx) * self.ball_speed_increase if left else -abs(ball.dx) * self.ball_speed_increase
+        ball.dy = ball.dy + spin_factor * 100
+        remaining = dt - impact
+        ball.x = face + ball.dx * remaining
+        ball.y = hit_y + ball.dy * remaining
+        self._bounce_off_walls()
+        return True
+    
     def _check_paddle_collision(self, paddle: Paddle):
         """Check and handle ball collision with a paddle."""
         # Check if ball is within paddle bounds
@@ -284,171 +1142,911 @@ class GameRoom:
             self.game_active = False
             # Could emit game_end event here
         else:
-            # Reset ball for next round
+            # Enter the serving state: the ball waits at center while the
+            # countdown runs down in simulated time on the following ticks
             self.reset_ball()
-            time.sleep(0.5)  # Brief pause
+            self.serve_delay = SERVE_DELAY
     
     def get_state(self) -> Dict[str, Any]:
-        """Get the current game state as a dictionary with thread safety."""
+        """Get the current game state as a new dictionary."""
+        return self.fill_state(self.new_state())
+    
+    def new_state(self) -> Dict[str, Any]:
+        """An empty state dictionary for fill_state to write into."""
         return {
             'room_id': self.room_id,
-            'ball': {
-                'x': self.ball.x,
-                'y': self.ball.y,
-                'dx': self.ball.dx,
-                'dy': self.ball.dy,
-                'radius': self.ball.radius
-            },
-            'paddle1': {
-                'x': self.paddle1.x,
-                'y': self.paddle1.y,
-                'width': self.paddle1.width,
-                'height': self.paddle1.height,
-                'score': self.paddle1.score
-            },
-            'paddle2': {
-                'x': self.paddle2.x,
-                'y': self.paddle2.y,
-                'width': self.paddle2.width,
-                'height': self.paddle2.height,
-                'score': self.paddle2.score
-            },
-            'players': {pid: {
-                'id': p.id,
-                'paddle_id': p.paddle_id,
-                'connected': p.connected
-            } for pid, p in self.players.items()},
-            'game_active': self.game_active,
-            'game_paused': self.game_paused,
-            'game_running': self.game_running,
-            'player_count': len(self.players),
-            'max_score': self.max_score,
-            'timestamp': time.time()
+            'ball': dict.fromkeys(('x', 'y', 'dx', 'dy', 'radius')),
+            'paddle1': dict.fromkeys(('x', 'y', 'width', 'height', 'score')),
+            'paddle2': dict.fromkeys(('x', 'y', 'width', 'height', 'score')),
+            'players': {},
+            'acks': {}
+        }
+    
+    def fill_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Write the current game state into `state` in place and return it.
+        
+        Once the player set is stable this only overwrites values, so snapshot
+        buffers can be reused every tick without allocating new containers.
+        """
+        ball = state['ball']
+        ball['x'] = self.ball.x
+        ball['y'] = self.ball.y
+        ball['dx'] = self.ball.dx
+        ball['dy'] = self.ball.dy
+        ball['radius'] = self.ball.radius
+        for key, paddle in (('paddle1', self.paddle1), ('paddle2', self.paddle2)):
+            fields = state[key]
+            fields['x'] = paddle.x
+            fields['y'] = paddle.y
+            fields['width'] = paddle.width
+            fields['height'] = paddle.height
+            fields['score'] = paddle.score
+            
+        players, acks = state['players'], state['acks']
+        if players.keys() != self.players.keys():
+            players.clear()
+            acks.clear()
+            for pid, p in self.players.items():
+                players[pid] = {'id': p.id, 'paddle_id': p.paddle_id, 'connected': p.connected}
+        for pid, p in self.players.items():
+            players[pid]['connected'] = p.connected
+            acks[pid] = p.last_processed_seq
+            
+        state['game_active'] = self.game_active
+        state['game_paused'] = self.game_paused
+        state['game_running'] = self.game_running
+        state['round_state'] = self.round_state
+        state['countdown'] = round(self.serve_delay, 3)
+        state['player_count'] = len(self.players)
+        state['max_score'] = self.max_score
+        state['room_type'] = self.room_type
+        state['tick_rate'] = self.tick_rate
+        state['snapshot_rate'] = self.snapshot_rate
+        state['tick'] = self.current_tick
+        state['timestamp'] = time.time()
+        return state
+    
+    def hibernate_state(self) -> Dict[str, Any]:
+        """Everything from_hibernate_state() needs to rebuild a room without a match running."""
+        return {
+            'room_id': self.room_id, 'width': self.width, 'height': self.height,
+            'room_type': self.room_type, 'tick_rate': self.tick_rate, 'snapshot_rate': self.snapshot_rate,
+            'seed': self.seed, 'serve_count': self.serve_count, 'created_at': self.created_at,
+            'tick': self.current_tick, 'max_score': self.max_score,
+            'ball_speed_increase': self.ball_speed_increase, 'game_paused': self.game_paused,
+            'ball': [self.ball.x, self.ball.y, self.ball.dx, self.ball.dy],
+            'paddle_y': [self.paddle1.y, self.paddle2.y],
+            'score': [self.paddle1.score, self.paddle2.score],
+            'players': [[p.id, p.paddle_id, p.wire_format, p.last_processed_seq,
+                         p.bot.difficulty if p.bot is not None else None] for p in self.players.values()]
         }
+    
+    @classmethod
+    def from_hibernate_state(cls, state: Dict[str, Any]) -> 'GameRoom':
+        room = cls(state['room_id'], width=state['width'], height=state['height'],
+                   room_type=state['room_type'], tick_rate=state['tick_rate'],
+                   snapshot_rate=state['snapshot_rate'], seed=state['seed'])
+        room.serve_count = state['serve_count']
+        room.created_at = state['created_at']
+        room.current_tick = state['tick']
+        room.max_score = state['max_score']
+        room.ball_speed_increase = state['ball_speed_increase']
+        room.game_paused = state['game_paused']
+        room.ball.x, room.ball.y, room.ball.dx, room.ball.dy = state['ball']
+        room.paddle1.y, room.paddle2.y = state['paddle_y']
+        room.paddle1.score, room.paddle2.score = state['score']
+        for client_id, paddle_id, wire, seq, difficulty in state['players']:
+            bot = Bot.create(difficulty, room.tick_rate) if difficulty is not None else None
+            room.players[client_id] = Player(id=client_id, paddle_id=paddle_id, wire_format=wire,
+                                             last_processed_seq=seq, bot=bot)
+        room._update_player_lists()
+        return room
 
-class GameServer:
+@dataclass(slots=True)
+class RoomSummary:
+    """What the lobby and the reaper need of a hibernated room, kept in memory."""
+    room_id: str
+    player_ids: tuple
+    max_players: int
+    room_type: str
+    created_at: float
+    paddle1_score: int
+    paddle2_score: int
+    
+    @classmethod
+    def of(cls, room: GameRoom) -> 'RoomSummary':
+        return cls(room.room_id, tuple(room.players), room.max_players, room.room_type,
+                   room.created_at, room.paddle1.score, room.paddle2.score)
+
+class RoomRegistry:
+    """Rooms plus secondary indexes kept up to date as rooms change.
+    
+    Every index is a list of (creation_seq, room_id) sorted by creation order,
+    so paginated lobby queries cost O(log n + page size) instead of a walk
+    over every room. Hibernated rooms stay indexed and counted through a
+    RoomSummary, so they keep their place in the lobby and in the stats.
+    Callers must hold GameServer.lock.
+    """
+    STATUSES = ('all', 'open', 'running')
+    
     def __init__(self):
         self.rooms: Dict[str, GameRoom] = {}
+        self.summaries: Dict[str, RoomSummary] = {}  # Hibernated rooms
+        self.seqs: Dict[str, int] = {}  # room_id -> creation seq
+        self.indexes: Dict[str, list] = {status: [] for status in self.STATUSES}
+        self.memberships: Dict[str, set] = {}  # room_id -> statuses it is indexed under
+        self.player_counts: Dict[str, int] = {}
+        self.total_players = 0
+        self.occupied_rooms = 0
+        self.next_seq = 0
+        self.version = 0  # Bumped on every change, for caching encoded room lists
+    
+    def add(self, room: GameRoom):
+        self.next_seq += 1
+        self.rooms[room.room_id] = room
+        self.seqs[room.room_id] = self.next_seq
+        self.memberships[room.room_id] = set()
+        self.player_counts[room.room_id] = 0
+        self.update(room)
+    
+    def remove(self, room_id: str):
+        room = self.rooms.pop(room_id, None) or self.summaries.pop(room_id, None)
+        if room is None:
+            return
+        self.version += 1
+        for status in self.memberships.pop(room_id):
+            self._unindex(status, room_id)
+        self._count_players(room_id, 0)
+        del self.player_counts[room_id]
+        del self.seqs[room_id]
+    
+    def update(self, room: GameRoom):
+        """Re-evaluate which indexes a room belongs to after it changed."""
+        room_id = room.room_id
+        if room_id not in self.rooms:
+            return
+        self.version += 1
+        wanted = {'all'}
+        if len(room.players) < room.max_players and not room.game_running:
+            wanted.add('open')
+        if room.game_running:
+            wanted.add('running')
+            
+        current = self.memberships[room_id]
+        for status in wanted - current:
+            bisect.insort(self.indexes[status], (self.seqs[room_id], room_id))
+        for status in current - wanted:
+            self._unindex(status, room_id)
+        self.memberships[room_id] = wanted
+        self._count_players(room_id, len(room.players))
+    
+    def hibernate(self, room: GameRoom):
+        """Swap a room for its summary, keeping its place in the indexes."""
+        del self.rooms[room.room_id]
+        self.summaries[room.room_id] = RoomSummary.of(room)
+    
+    def wake(self, room: GameRoom):
+        """Put a rehydrated room back in place of its summary."""
+        del self.summaries[room.room_id]
+        self.rooms[room.room_id] = room
+        self.update(room)
+    
+    def get(self, room_id: str):
+        """A room, or the summary of a hibernated one."""
+        return self.rooms.get(room_id) or self.summaries.get(room_id)
+    
+    def _unindex(self, status: str, room_id: str):
+        index = self.indexes[status]
+        position = bisect.bisect_left(index, (self.seqs[room_id], room_id))
+        if position < len(index) and index[position][1] == room_id:
+            del index[position]
+    
+    def _count_players(self, room_id: str, count: int):
+        previous = self.player_counts[room_id]
+        self.player_counts[room_id] = count
+        self.total_players += count - previous
+        self.occupied_rooms += (count > 0) - (previous > 0)
+    
+    def count(self, status: str = 'all') -> int:
+        return len(self.indexes[status])
+    
+    def oldest(self):
+        index = self.indexes['all']
+        return self.get(index[0][1]) if index else None
+    
+    def page(self, status: str = 'all', cursor: Optional[int] = None,
+             limit: int = LOBBY_PAGE_SIZE, newest_first: bool = False):
+        """Return (rooms, next_cursor) for one page of an index.
+        
+        `cursor` is the creation seq of the last room on the previous page.
+        Hibernated rooms are returned as their RoomSummary.
+        """
+        index = self.indexes[status]
+        if newest_first:
+            end = len(index) if cursor is None else bisect.bisect_left(index, (cursor,))
+            start = max(0, end - limit)
+            entries = index[start:end][::-1]
+            has_more = start > 0
+        else:
+            start = 0 if cursor is None else bisect.bisect_left(index, (cursor + 1,))
+            entries = index[start:start + limit]
+            has_more = start + limit < len(index)
+        next_cursor = entries[-1][0] if entries and has_more else None
+        return [self.get(room_id) for _, room_id in entries], next_cursor
+
+class Matchmaker:
+    """FIFO matchmaking queues, one per skill/region bucket.
+    
+    Enqueueing pairs with the longest-waiting client in the same bucket in O(1).
+    Cancelling removes the client's queue entry (and its bucket, once empty)
+    right away, so queues only ever hold clients that are still waiting.
+    Callers must hold GameServer.lock.
+    """
+    
+    def __init__(self):
+        self.queues: Dict[str, deque] = {}  # bucket -> deque of (client_id, ticket)
+        self.waiting: Dict[str, tuple] = {}  # client_id -> (bucket, ticket, enqueued_at)
+        self.wait_times: deque = deque(maxlen=MATCH_WAIT_SAMPLES)
+        self.matches_made = 0
+        self.next_ticket = 0
+    
+    @staticmethod
+    def bucket_for(skill: Optional[float] = None, region: Optional[str] = None) -> str:
+        if skill is None:
+            band = '*'
+        else:
+            band = str(int(min(max(skill, 0), MATCH_SKILL_MAX) // MATCH_SKILL_BAND))
+        return f"{region or '*'}/{band}"
+    
+    def enqueue(self, client_id: str, bucket: str) -> Optional[str]:
+        """Queue a client, or pair it with a waiting one and return that client's ID."""
+        self.cancel(client_id)
+        queue = self.queues.get(bucket)
+        now = time.time()
+        
+        if queue:
+            opponent_id, _ = queue.popleft()
+            entry = self.waiting.pop(opponent_id)
+            if not queue:
+                del self.queues[bucket]
+            self.wait_times.append(now - entry[2])
+            self.wait_times.append(0.0)
+            self.matches_made += 1
+            return opponent_id
+            
+        self.next_ticket += 1
+        self.queues.setdefault(bucket, deque()).append((client_id, self.next_ticket))
+        self.waiting[client_id] = (bucket, self.next_ticket, now)
+        return None
+    
+    def cancel(self, client_id: str) -> bool:
+        """Take a client out of the queue. Returns False if it wasn't queued."""
+        entry = self.waiting.pop(client_id, None)
+        if entry is None:
+            return False
+        bucket, ticket, _ = entry
+        queue = self.queues[bucket]
+        queue.remove((client_id, ticket))
+        if not queue:
+            del self.queues[bucket]
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.wait_times)
+        
+        def percentile(fraction: float) -> float:
+            return round(waits[min(len(waits) - 1, int(fraction * len(waits)))], 3) if waits else 0.0
+            
+        depths: Dict[str, int] = {}
+        for bucket, _, _ in self.waiting.values():
+            depths[bucket] = depths.get(bucket, 0) + 1
+        return {
+            'queue_depth': len(self.waiting),
+            'queue_buckets': depths,
+            'matches_made': self.matches_made,
+            'wait_p50': percentile(0.5),
+            'wait_p90': percentile(0.9),
+            'wait_p99': percentile(0.99)
+        }
+
+class RoomReaper:
+    """Expires rooms by TTL, with one timer per room on a hashed timer wheel.
+    
+    A room's timer is armed for the TTL of its phase (waiting, playing or
+    finished) and re-armed when the phase changes. When a playing room's
+    timer fires, the room is idle if no input arrived during the whole
+    ROOM_IDLE_TTL; otherwise it is re-armed. Phase changes made by the tick
+    (a match finishing) are noticed when the timer fires, so a finished
+    room is closed ROOM_FINISHED_TTL after that. With `hibernate_after`,
+    a waiting room is first reported for hibernation after that long and
+    closed at the end of ROOM_WAITING_TTL from the hibernation store.
+    Callers must hold GameServer.lock.
+    """
+    REASONS = ('waiting', 'idle', 'finished')
+    
+    def __init__(self, now: Optional[float] = None, hibernate_after: Optional[float] = None):
+        self.wheel = TimerWheel(time.time() if now is None else now, resolution=REAPER_INTERVAL)
+        self.watched: Dict[str, list] = {}  # room_id -> [phase, since, input count]
+        self.evicted = dict.fromkeys(self.REASONS, 0)
+        self.hibernate_after = hibernate_after
+        waiting_ttl = ROOM_WAITING_TTL if hibernate_after is None else min(hibernate_after, ROOM_WAITING_TTL)
+        self.ttls = {'waiting': waiting_ttl, 'playing': ROOM_IDLE_TTL, 'finished': ROOM_FINISHED_TTL}
+    
+    @staticmethod
+    def phase(room: 'GameRoom') -> str:
+        if not room.game_running:
+            return 'waiting'
+        if room.round_state == ROUND_FINISHED:
+            return 'finished'
+        return 'playing'
+    
+    def track(self, room: 'GameRoom', now: float):
+        """(Re)start a room's TTL for its current phase."""
+        phase = self.phase(room)
+        self.watched[room.room_id] = [phase, now, room.metrics.inputs]
+        self.wheel.schedule(room.room_id, now + self.ttls[phase])
+    
+    def forget(self, room_id: str):
+        self.watched.pop(room_id, None)
+        self.wheel.cancel(room_id)
+    
+    def defer(self, room: 'GameRoom', now: float):
+        """Check a waiting room again later without restarting its waiting TTL,
+        e.g. after it was woken just to be looked at."""
+        watched = self.watched.get(room.room_id)
+        since = watched[1] if watched is not None else now
+        self.watched[room.room_id] = [self.phase(room), since, room.metrics.inputs]
+        self.wheel.schedule(room.room_id, min(now + self.ttls['waiting'], since + ROOM_WAITING_TTL))
+    
+    def hibernated(self, room_id: str):
+        """A room moved to the hibernation store; it closes when its waiting TTL ends."""
+        watched = self.watched[room_id]
+        watched[0] = 'hibernated'
+        self.wheel.schedule(room_id, watched[1] + ROOM_WAITING_TTL)
+    
+    def expired(self, rooms: Dict[str, 'GameRoom'], now: float) -> List[tuple]:
+        """(room_id, reason) for every room whose TTL ran out by `now`.
+        
+        The reason 'hibernate' asks for a waiting room to be hibernated
+        rather than closed.
+        """
+        result = []
+        for room_id in self.wheel.advance(now):
+            room = rooms.get(room_id)
+            watched = self.watched.get(room_id)
+            if watched is not None and watched[0] == 'hibernated':
+                result.append((room_id, 'waiting'))
+                continue
+            if room is None or watched is None:
+                self.watched.pop(room_id, None)
+                continue
+            phase = self.phase(room)
+            if phase != watched[0]:
+                self.track(room, now)
+            elif phase == 'waiting' and now - watched[1] < ROOM_WAITING_TTL:
+                result.append((room_id, 'hibernate'))
+            elif phase != 'playing':
+                result.append((room_id, phase))
+            elif room.metrics.inputs == watched[2]:
+                result.append((room_id, 'idle'))
+            else:
+                watched[2] = room.metrics.inputs
+                self.wheel.schedule(room_id, now + self.ttls['playing'])
+        return result
+    
+    def record_eviction(self, reason: str):
+        self.evicted[reason] += 1
+        metrics.ROOMS_EVICTED[reason].inc()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'tracked_rooms': len(self.watched),
+            'evicted': dict(self.evicted),
+            'ttl_seconds': {
+                'waiting': ROOM_WAITING_TTL,
+                'idle': ROOM_IDLE_TTL,
+                'finished': ROOM_FINISHED_TTL,
+                'hibernate': self.hibernate_after
+            }
+        }
+
+class GameServer:
+    def __init__(self, shard_index: int = 0, shard_count: int = 1,
+                 directory: Optional[ShardDirectory] = None, hibernation: Optional[RoomStore] = None):
+        self.registry = RoomRegistry()
+        self.rooms: Dict[str, GameRoom] = self.registry.rooms
         self.client_rooms: Dict[str, str] = {}  # client_id -> room_id
-        self.lock = threading.Lock()  # For thread-safe room operations
+        self.client_formats: Dict[str, str] = {}  # client_id -> wire format
+        self.client_spectating: Dict[str, str] = {}  # client_id -> room_id being watched
+        self.lock = InstrumentedLock()  # For thread-safe room operations
+        self.matchmaker = Matchmaker()
+        self.packets = packet_cache.PacketCache()  # Encoded room_list, shared by every emit
+        self.hibernation = hibernation  # Waiting rooms serialized to disk, if enabled
+        self.reaper = RoomReaper(hibernate_after=HIBERNATE_AFTER if hibernation is not None else None)
+        self.reaper_running = False
+        
+        # Sharding: which rooms this process owns, and the other shards' lobbies
+        self.shard_index = shard_index
+        self.shard_count = max(1, shard_count)
+        self.directory = directory
+        
+        print(f"Game server initialized with a shared tick scheduler (shard {shard_index + 1}/{self.shard_count})")
+    
+    def room_shard(self, room_id: str) -> int:
+        """Index of the shard that owns (or would own) a room ID."""
+        return shard_for(room_id, self.shard_count)
+    
+    def owns_room(self, room_id: str) -> bool:
+        return self.room_shard(room_id) == self.shard_index
+    
+    def is_hibernated(self, room_id: str) -> bool:
+        return self.hibernation is not None and room_id in self.hibernation
+    
+    def wake_room(self, room_id: Optional[str]) -> Optional[GameRoom]:
+        """A room by ID, loaded back from the hibernation store if it's there.
         
-        print("Game server initialized with per-room game loops")
+        The room's file is read before taking the server lock, as flush()
+        does for writes. Call it ahead of a locked operation on a room that
+        may be hibernated; _room() then finds it awake.
+        """
+        if not self.is_hibernated(room_id):
+            return self.rooms.get(room_id)
+        prefetched = self.hibernation.prefetch(room_id)
+        with self.lock:
+            return self._room(room_id, prefetched)
+    
+    def _room(self, room_id: str, prefetched: Optional[tuple] = None) -> Optional[GameRoom]:
+        room = self.rooms.get(room_id)
+        if room is None and self.is_hibernated(room_id):
+            # Reads the file under the lock only if wake_room() didn't get to it
+            room = GameRoom.from_hibernate_state(self.hibernation.load(room_id, prefetched))
+            self.registry.wake(room)
+            self.reaper.defer(room, time.time())
+            metrics.ROOM_REHYDRATIONS.inc()
+            print(f"Rehydrated room {room_id}")
+        return room
     
-    def create_room(self, room_name: str = None) -> str:
-        """Create a new game room with thread safety."""
+    def _hibernate_room(self, room_id: str):
+        """Move a waiting room to the hibernation store, freeing it from memory."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        if room.spectators:
+            # Someone is still watching; wait another round
+            self.reaper.defer(room, time.time())
+            return
+        self.hibernation.save(room_id, room.hibernate_state())
+        self.registry.hibernate(room)
+        self.reaper.hibernated(room_id)
+        metrics.ROOM_HIBERNATIONS.inc()
+        print(f"Hibernated room {room_id}")
+    
+    def create_room(self, room_name: str = None, **room_options) -> str:
+        """Create a new game room with thread safety.
+        
+        room_options (room_type, tick_rate, snapshot_rate) are passed to GameRoom.
+        """
         with self.lock:
-            room_id = room_name or str(uuid.uuid4())[:8]
+            return self._create_room(room_name, **room_options)
+    
+    def _create_room(self, room_name: str = None, **room_options) -> str:
+        room_id = room_name or str(uuid.uuid4())[:8]
+        
+        # Ensure unique room ID that hashes to this shard
+        while room_id in self.rooms or self.is_hibernated(room_id) or not self.owns_room(room_id):
+            room_id = str(uuid.uuid4())[:8]
             
-            # Ensure unique room ID
-            while room_id in self.rooms:
-                room_id = str(uuid.uuid4())[:8]
-                
-            self.rooms[room_id] = GameRoom(room_id)
-            print(f"Created room: {room_id}")
-            return room_id
+        room = GameRoom(room_id, **room_options)
+        self.registry.add(room)
+        self.reaper.track(room, time.time())
+        if not self.reaper_running:
+            self.reaper_running = True
+            socketio.start_background_task(self.run_reaper)
+        print(f"Created room: {room_id} ({room.room_type}, {room.tick_rate} Hz sim, {room.snapshot_rate} Hz snapshots)")
+        return room_id
     
     def join_room(self, client_id: str, room_id: str) -> Optional[int]:
         """Join a client to a room. Returns paddle number or None if failed."""
+        self.wake_room(room_id)
+        self.wake_room(self.client_rooms.get(client_id))  # The room being left
         with self.lock:
-            if room_id not in self.rooms:
-                return None
-                
-            room = self.rooms[room_id]
-            paddle_id = room.add_player(client_id)
+            return self._join_room(client_id, room_id)
+    
+    def _join_room(self, client_id: str, room_id: str) -> Optional[int]:
+        room = self._room(room_id)
+        if room is None:
+            return None
             
-            if paddle_id is not None:
-                # Remove client from previous room if any
-                if client_id in self.client_rooms:
-                    old_room_id = self.client_rooms[client_id]
-                    if old_room_id in self.rooms and old_room_id != room_id:
-                        self.rooms[old_room_id].remove_player(client_id)
-                        
-                self.client_rooms[client_id] = room_id
-                print(f"Client {client_id} joined room {room_id} as player {paddle_id}")
+        paddle_id = room.add_player(client_id, self.client_formats.get(client_id, 'json'))
+        
+        if paddle_id is not None:
+            # Joining a room directly takes the client out of matchmaking
+            # and stops them watching another match
+            self.matchmaker.cancel(client_id)
+            self._stop_spectating(client_id)
+            
+            # Remove client from previous room if any
+            if client_id in self.client_rooms:
+                old_room_id = self.client_rooms[client_id]
+                old_room = self._room(old_room_id) if old_room_id != room_id else None
+                if old_room is not None:
+                    old_room.remove_player(client_id)
+                    self.registry.update(old_room)
+                    self.reaper.track(old_room, time.time())
+                    
+            self.client_rooms[client_id] = room_id
+            self.registry.update(room)
+            self.reaper.track(room, time.time())
+            print(f"Client {client_id} joined room {room_id} as player {paddle_id}")
+            
+        return paddle_id
+    
+    def find_match(self, client_id: str, skill: Optional[float] = None,
+                   region: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Queue a client for a match, creating a room once two clients pair up.
+        
+        Returns None while waiting, or {'room_id', 'players': {client_id: paddle_id}}.
+        """
+        self.wake_room(self.client_rooms.get(client_id))  # The room being left
+        with self.lock:
+            bucket = Matchmaker.bucket_for(skill, region)
+            opponent_id = self.matchmaker.enqueue(client_id, bucket)
+            if opponent_id is None:
+                return None
                 
-            return paddle_id
+            room_id = self._create_room()
+            players = {}
+            for player_id in (opponent_id, client_id):
+                players[player_id] = self._join_room(player_id, room_id)
+            print(f"Matched {opponent_id} and {client_id} in room {room_id} ({bucket})")
+            return {'room_id': room_id, 'bucket': bucket, 'players': players}
+    
+    def find_bot_match(self, client_id: str, difficulty=BOT_DIFFICULTY) -> Dict[str, Any]:
+        """Start a match against a server-side bot right away (a warm-up queue).
+        
+        Returns the same shape as find_match(); raises ValueError for an
+        unknown difficulty.
+        """
+        bot_settings(difficulty)  # Raises before anything is created
+        self.wake_room(self.client_rooms.get(client_id))  # The room being left
+        with self.lock:
+            self.matchmaker.cancel(client_id)
+            room_id = self._create_room()
+            paddle_id = self._join_room(client_id, room_id)
+            self._add_bot(self.rooms[room_id], difficulty)
+            print(f"Matched {client_id} with a {difficulty} bot in room {room_id}")
+            return {'room_id': room_id, 'bucket': f"bot:{difficulty}", 'players': {client_id: paddle_id},
+                    'bot': difficulty}
+    
+    def add_bot(self, room_id: str, difficulty=BOT_DIFFICULTY) -> Optional[int]:
+        """Fill a seat in a room with a bot. Returns its paddle number or None."""
+        self.wake_room(room_id)
+        with self.lock:
+            room = self._room(room_id)
+            if room is None:
+                return None
+            return self._add_bot(room, difficulty)
+    
+    def _add_bot(self, room: GameRoom, difficulty) -> Optional[int]:
+        paddle_id = room.add_bot(difficulty)
+        if paddle_id is not None:
+            self.registry.update(room)
+            self.reaper.track(room, time.time())
+        return paddle_id
+    
+    def cancel_match(self, client_id: str) -> bool:
+        with self.lock:
+            return self.matchmaker.cancel(client_id)
     
     def leave_room(self, client_id: str):
-        """Remove a client from their current room with thread safety."""
+        """Remove a client from their current room (and the matchmaking queue)."""
+        self.wake_room(self.client_rooms.get(client_id))
         with self.lock:
+            self.matchmaker.cancel(client_id)
+            self._stop_spectating(client_id)
             if client_id in self.client_rooms:
                 room_id = self.client_rooms[client_id]
-                if room_id in self.rooms:
-                    room = self.rooms[room_id]
+                room = self._room(room_id)
+                if room is not None:
                     room.remove_player(client_id)
+                    self.registry.update(room)
                     
-                    # Clean up empty rooms
-                    if len(room.players) == 0:
+                    # Clean up rooms with nobody left but bots
+                    if all(player.bot is not None for player in room.players.values()):
                         # Stop the game loop before deleting
                         room.stop_game_loop()
-                        del self.rooms[room_id]
+                        self._close_spectators(room)
+                        self.registry.remove(room_id)
+                        self.reaper.forget(room_id)
                         print(f"Deleted empty room: {room_id}")
+                    else:
+                        self.reaper.track(room, time.time())
                         
                 del self.client_rooms[client_id]
                 print(f"Client {client_id} left room {room_id}")
     
-    def update_player_input(self, client_id: str, input_data: Dict[str, bool]):
+    def run_reaper(self):
+        """Background task: close rooms whose waiting, idle or finished TTL ran out,
+        and hibernate waiting rooms when that's enabled."""
+        while True:
+            socketio.sleep(REAPER_INTERVAL)
+            try:
+                self.reap()
+            except Exception:
+                print(f"ERROR: room reaper pass failed\n{traceback.format_exc()}")
+    
+    def reap(self):
+        """One reaper pass: evict or hibernate expired rooms and write out hibernated ones."""
+        now = time.time()
+        with self.lock:
+            expired = self.reaper.expired(self.rooms, now)
+            for room_id, reason in expired:
+                try:
+                    if reason == 'hibernate':
+                        self._hibernate_room(room_id)
+                    else:
+                        self._evict_room(room_id, reason)
+                except Exception:
+                    # Retried on the next pass; the other rooms go on being reaped
+                    print(f"ERROR: failed to reap room {room_id} ({reason})\n{traceback.format_exc()}")
+                    self.reaper.wheel.schedule(room_id, now + REAPER_INTERVAL)
+        if self.hibernation is not None and self.hibernation.pending:
+            self.hibernation.flush(self.lock)
+        if expired:
+            socketio.emit('room_list', self.room_list_packet())
+    
+    def _evict_room(self, room_id: str, reason: str):
+        """Close a room: tell its players and spectators, stop it and forget it."""
+        room = self.rooms.get(room_id)
+        if room is not None:
+            player_ids = list(room.players)
+            room.stop_game_loop()
+            self._close_spectators(room)
+            self.registry.remove(room_id)
+        elif self.is_hibernated(room_id):
+            player_ids = self.registry.summaries[room_id].player_ids
+            self.hibernation.discard(room_id)
+            self.registry.remove(room_id)
+        else:
+            return
+        socketio.emit('room_closed', {'room_id': room_id, 'reason': reason}, room=room_id)
+        for client_id in player_ids:
+            if self.client_rooms.get(client_id) == room_id:
+                del self.client_rooms[client_id]
+        socketio.close_room(room_id)
+        self.reaper.forget(room_id)
+        self.reaper.record_eviction(reason)
+        print(f"Evicted room {room_id} ({reason})")
+    
+    def spectate_room(self, client_id: str, room_id: str) -> Optional[GameRoom]:
+        """Start watching a room (leaving any room watched before). Returns the room."""
+        self.wake_room(room_id)
+        with self.lock:
+            room = self._room(room_id)
+            if room is None:
+                return None
+            self._stop_spectating(client_id)
+            room.add_spectator(client_id, self.client_formats.get(client_id, 'json'))
+            self.client_spectating[client_id] = room_id
+            return room
+    
+    def stop_spectating(self, client_id: str) -> Optional[str]:
+        """Stop watching; returns the room ID that was being watched."""
+        with self.lock:
+            return self._stop_spectating(client_id)
+    
+    def _stop_spectating(self, client_id: str) -> Optional[str]:
+        room_id = self.client_spectating.pop(client_id, None)
+        room = self.rooms.get(room_id)
+        if room is not None:
+            channel = room.remove_spectator(client_id)
+            if channel is not None:
+                socketio.server.leave_room(client_id, channel, namespace='/')
+        return room_id
+    
+    def _close_spectators(self, room: GameRoom):
+        """Tell a deleted room's spectators the match is over and empty its sub-rooms."""
+        if not room.spectators:
+            return
+        for client_id in room.spectators:
+            self.client_spectating.pop(client_id, None)
+        for wire in set(room.spectators.values()):
+            channel = room.spectator_channel(wire)
+            socketio.emit('spectate_ended', {'room_id': room.room_id, 'reason': 'room_closed'},
+                          room=channel)
+            socketio.close_room(channel)
+        room.spectators.clear()
+    
+    def update_player_input(self, client_id: str, input_data: Dict[str, bool],
+                            seq: Optional[int] = None, tick: Optional[int] = None):
         """Update player input for their current room."""
         if client_id in self.client_rooms:
             room_id = self.client_rooms[client_id]
             if room_id in self.rooms:
-                self.rooms[room_id].update_player_input(client_id, input_data)
+                self.rooms[room_id].update_player_input(client_id, input_data, seq, tick)
     
     def get_room_list(self) -> Dict[str, Dict[str, Any]]:
-        """Get list of all rooms with basic info."""
+        """Get the newest LOBBY_PAGE_SIZE rooms with basic info, across every shard."""
+        rooms = {}
+        if self.directory is not None:
+            for summary in self.directory.remote_summaries():
+                rooms.update(summary['rooms'])
+        rooms.update(self.get_local_room_list())
+        return rooms
+    
+    def room_list_packet(self) -> packet_cache.EncodedPayload:
+        """get_room_list() encoded once and reused by every room_list emit.
+        
+        Rebuilt when the lobby changes, and at least every
+        LOBBY_PUBLISH_INTERVAL for scores and other shards' rooms.
+        """
+        return self.packets.get('room_list', self.registry.version, self.get_room_list,
+                                max_age=LOBBY_PUBLISH_INTERVAL, event='room_list')
+    
+    def get_local_room_list(self) -> Dict[str, Dict[str, Any]]:
+        """The newest LOBBY_PAGE_SIZE rooms owned by this shard, keyed by room ID."""
+        page = self.query_rooms(newest_first=True)
+        return {info['room_id']: info for info in page['rooms']}
+    
+    def query_rooms(self, status: str = 'all', cursor: Optional[int] = None,
+                    limit: int = LOBBY_PAGE_SIZE, newest_first: bool = False) -> Dict[str, Any]:
+        """One page of this shard's rooms, filtered by status ('all', 'open', 'running').
+        
+        Pass the returned next_cursor back as `cursor` for the following page.
+        """
+        if status not in RoomRegistry.STATUSES:
+            raise ValueError(f"Unknown room status: {status}")
+        limit = max(1, min(MAX_LOBBY_PAGE_SIZE, int(limit)))
         with self.lock:
+            rooms, next_cursor = self.registry.page(status, cursor, limit, newest_first)
             return {
-                room_id: {
-                    'room_id': room_id,
-                    'player_count': len(room.players),
-                    'max_players': room.max_players,
-                    'game_active': room.game_active,
-                    'game_running': room.game_running,
-                    'created_at': room.created_at,
-                    'paddle1_score': room.paddle1.score,
-                    'paddle2_score': room.paddle2.score
-                }
-                for room_id, room in self.rooms.items()
+                'rooms': [self._room_info(room) for room in rooms],
+                'next_cursor': next_cursor,
+                'total': self.registry.count(status),
+                'status': status,
+                'shard': self.shard_index
             }
     
+    def _room_info(self, room) -> Dict[str, Any]:
+        if isinstance(room, RoomSummary):
+            return {
+                'room_id': room.room_id,
+                'shard': self.shard_index,
+                'player_count': len(room.player_ids),
+                'max_players': room.max_players,
+                'spectator_count': 0,
+                'room_type': room.room_type,
+                'game_active': False,
+                'game_running': False,
+                'created_at': room.created_at,
+                'paddle1_score': room.paddle1_score,
+                'paddle2_score': room.paddle2_score
+            }
+        return {
+            'room_id': room.room_id,
+            'shard': self.shard_index,
+            'player_count': len(room.players),
+            'max_players': room.max_players,
+            'spectator_count': len(room.spectators),
+            'room_type': room.room_type,
+            'game_active': room.game_active,
+            'game_running': room.game_running,
+            'created_at': room.created_at,
+            'paddle1_score': room.paddle1.score,
+            'paddle2_score': room.paddle2.score
+        }
+    
     def get_room_stats(self) -> Dict[str, Any]:
-        """Get server statistics."""
+        """Get server statistics, aggregated across every shard."""
+        stats = self.get_local_room_stats()
+        if self.directory is None:
+            return stats
+            
+        shards = {self.shard_index: stats}
+        for summary in self.directory.remote_summaries():
+            shards[summary['stats']['shard']] = summary['stats']
+            
+        aggregated = dict(stats)
+        for key in ('total_rooms', 'total_players', 'active_games', 'rooms_with_players', 'open_rooms'):
+            aggregated[key] = sum(shard[key] for shard in shards.values())
+        aggregated['shard_count'] = self.shard_count
+        aggregated['shards_reporting'] = len(shards)
+        aggregated['shards'] = shards
+        return aggregated
+    
+    def get_local_room_stats(self) -> Dict[str, Any]:
+        """Get statistics for the rooms owned by this shard (O(1) from the registry)."""
         with self.lock:
-            total_players = sum(len(room.players) for room in self.rooms.values())
-            active_games = sum(1 for room in self.rooms.values() if room.game_running)
+            oldest = self.registry.oldest()
             
             return {
-                'total_rooms': len(self.rooms),
-                'total_players': total_players,
-                'active_games': active_games,
-                'rooms_with_players': len([r for r in self.rooms.values() if len(r.players) > 0]),
-                'server_uptime': time.time() - (min(room.created_at for room in self.rooms.values()) if self.rooms else time.time())
+                'shard': self.shard_index,
+                'async_mode': ASYNC_MODE,
+                'tick_workers': tick_scheduler.workers,
+                'scheduled_rooms': tick_scheduler.room_count(),
+                'total_rooms': self.registry.count('all'),
+                'total_players': self.registry.total_players,
+                'active_games': self.registry.count('running'),
+                'open_rooms': self.registry.count('open'),
+                'spectators': len(self.client_spectating),
+                'rooms_with_players': self.registry.occupied_rooms,
+                'server_uptime': time.time() - (oldest.created_at if oldest else time.time()),
+                'matchmaking': self.matchmaker.stats(),
+                'overload': overload_controller.stats(),
+                'reaper': self.reaper.stats(),
+                'hibernation': self.hibernation.stats() if self.hibernation is not None else None,
+                'locks': {
+                    'server': InstrumentedLock.summarize([self.lock]),
+                    'rooms': InstrumentedLock.summarize(room.lock for room in self.rooms.values())
+                }
             }
+    
+    def run_shard_directory(self):
+        """Background task: publish this shard's lobby summary every second."""
+        while True:
+            try:
+                self.directory.publish({
+                    'rooms': self.get_local_room_list(),
+                    'stats': self.get_local_room_stats()
+                })
+            except (OSError, EOFError) as e:
+                print(f"Failed to publish lobby summary: {e}")
+            socketio.sleep(LOBBY_PUBLISH_INTERVAL)
 
 # Create global game server instance
-game_server = GameServer()
+shard_directory = None
+if MESSAGE_QUEUE and SHARD_COUNT > 1:
+    shard_directory = ShardDirectory(connect_broker(MESSAGE_QUEUE), SHARD_INDEX, SHARD_COUNT)
+room_store = None
+if HIBERNATE_DIR:
+    room_store = RoomStore(os.path.join(HIBERNATE_DIR, f"shard{SHARD_INDEX}"))
+game_server = GameServer(SHARD_INDEX, SHARD_COUNT, shard_directory, room_store)
+if shard_directory is not None:
+    socketio.start_background_task(shard_directory.listen_forever)
+    socketio.start_background_task(game_server.run_shard_directory)
 
 # Socket.IO Event Handlers
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     client_id = request.sid
-    print(f"Client connected: {client_id}")
-    emit('connected', {'client_id': client_id})
-    emit('room_list', game_server.get_room_list())
+    
+    # Negotiate the per-tick state encoding ('json' by default)
+    requested = (auth if isinstance(auth, dict) else {}).get('wire_format') or request.args.get('wire_format')
+    client_format = 'binary' if requested == 'binary' else 'json'
+    game_server.client_formats[client_id] = client_format
+    
+    print(f"Client connected: {client_id} ({client_format})")
+    emit('connected', {'client_id': client_id, 'wire_format': client_format})
+    emit('room_list', game_server.room_list_packet())
 
 @socketio.on('disconnect')
 def handle_disconnect():
     client_id = request.sid
     print(f"Client disconnected: {client_id}")
     game_server.leave_room(client_id)
+    game_server.client_formats.pop(client_id, None)
 
 @socketio.on('create_room')
 def handle_create_room(data):
     client_id = request.sid
     room_name = data.get('room_name', None)
+    room_options = {key: data[key] for key in ('room_type', 'tick_rate', 'snapshot_rate') if data.get(key)}
+    
+    if room_name and not game_server.owns_room(room_name):
+        emit('room_created', {'success': False, 'error': 'Room belongs to another shard',
+                              'shard': game_server.room_shard(room_name)})
+        return
+    
+    if not overload_controller.accepting_rooms:
+        emit('room_created', overload_controller.refuse_room())
+        return
     
     # Create new room
-    room_id = game_server.create_room(room_name)
+    try:
+        room_id = game_server.create_room(room_name, **room_options)
+    except (TypeError, ValueError):
+        emit('room_created', {'success': False, 'error': 'Invalid room options'})
+        return
     
     # Join the creator to the room
     join_room(room_id)
@@ -460,7 +2058,7 @@ def handle_create_room(data):
             'paddle_id': paddle_id,
             'success': True
         })
-        emit('room_list', game_server.get_room_list(), broadcast=True)
+        emit('room_list', game_server.room_list_packet(), broadcast=True)
         print(f"Client {client_id} created and joined room {room_id}")
     else:
         emit('room_created', {'success': False, 'error': 'Failed to join created room'})
@@ -474,8 +2072,14 @@ def handle_join_room(data):
         emit('room_joined', {'success': False, 'error': 'Room ID required'})
         return
     
-    # Check if room exists
-    if room_id not in game_server.rooms:
+    # Rooms owned by another shard must be joined through that shard's worker
+    if not game_server.owns_room(room_id):
+        emit('room_joined', {'success': False, 'error': 'Room is on another shard',
+                             'shard': game_server.room_shard(room_id)})
+        return
+    
+    # Check if room exists (loading it back if it was hibernated)
+    if game_server.wake_room(room_id) is None:
         emit('room_joined', {'success': False, 'error': 'Room not found'})
         return
     
@@ -490,17 +2094,115 @@ def handle_join_room(data):
             'success': True
         })
         
+        # Give the new player a keyframe to apply game_delta updates against
+        game_server.rooms[room_id].send_keyframe(client_id)
+        
         # Notify other players in the room
         emit('player_joined', {
             'client_id': client_id,
             'paddle_id': paddle_id
         }, room=room_id, include_self=False)
         
-        emit('room_list', game_server.get_room_list(), broadcast=True)
+        emit('room_list', game_server.room_list_packet(), broadcast=True)
         print(f"Client {client_id} joined room {room_id} as player {paddle_id}")
     else:
         emit('room_joined', {'success': False, 'error': 'Room is full'})
 
+@socketio.on('find_match')
+def handle_find_match(data=None):
+    """Queue for a match; both players get match_found once a room is made for them.
+    
+    With `bot` (true or a difficulty) the match is made at once against a bot.
+    """
+    client_id = request.sid
+    data = data or {}
+    skill = data.get('skill')
+    region = data.get('region')
+    bot = data.get('bot')
+    
+    if skill is not None and (not isinstance(skill, (int, float)) or isinstance(skill, bool)
+                              or (isinstance(skill, float) and not math.isfinite(skill))):
+        emit('match_queued', {'success': False, 'error': 'Skill must be a finite number'})
+        return
+    if region is not None and (not isinstance(region, str) or len(region) > 32):
+        emit('match_queued', {'success': False, 'error': 'Invalid region'})
+        return
+    if client_id in game_server.client_rooms:
+        emit('match_queued', {'success': False, 'error': 'Already in a room'})
+        return
+    if not overload_controller.accepting_rooms:
+        # Matches are made in new rooms, so matchmaking is shed along with create_room
+        emit('match_queued', overload_controller.refuse_room())
+        return
+    
+    if bot is not None and bot is not False:
+        try:
+            match = game_server.find_bot_match(client_id, BOT_DIFFICULTY if bot is True else bot)
+        except ValueError as e:
+            emit('match_queued', {'success': False, 'error': str(e)})
+            return
+    else:
+        match = game_server.find_match(client_id, skill, region)
+        if match is None:
+            emit('match_queued', {'success': True, 'bucket': Matchmaker.bucket_for(skill, region)})
+            return
+    
+    room_id = match['room_id']
+    room = game_server.rooms.get(room_id)
+    if room is None:
+        return  # Both players left before the match was announced
+    for player_id, paddle_id in match['players'].items():
+        join_room(room_id, sid=player_id)
+        found = {
+            'room_id': room_id,
+            'paddle_id': paddle_id,
+            'shard': game_server.shard_index,
+            'success': True
+        }
+        if 'bot' in match:
+            found['bot'] = match['bot']
+        emit('match_found', found, to=player_id)
+        room.send_keyframe(player_id)
+
+@socketio.on('add_bot')
+def handle_add_bot(data=None):
+    """Fill the empty seat in the client's room with a server-side bot."""
+    client_id = request.sid
+    data = data or {}
+    if not isinstance(data, dict):
+        emit('bot_added', {'success': False, 'error': 'Invalid bot request'})
+        return
+    difficulty = data.get('difficulty', BOT_DIFFICULTY)
+    room_id = game_server.client_rooms.get(client_id)
+    
+    if room_id is None:
+        emit('bot_added', {'success': False, 'error': 'Not in a room'})
+        return
+    if not overload_controller.accepting_rooms:
+        # A bot starts a match, which is shed along with create_room and find_match
+        emit('bot_added', overload_controller.refuse_room())
+        return
+    try:
+        paddle_id = game_server.add_bot(room_id, difficulty)
+    except ValueError as e:
+        emit('bot_added', {'success': False, 'error': str(e)})
+        return
+    if paddle_id is None:
+        emit('bot_added', {'success': False, 'error': 'Room is full'})
+        return
+    
+    emit('bot_added', {
+        'room_id': room_id,
+        'paddle_id': paddle_id,
+        'difficulty': difficulty,
+        'success': True
+    })
+    emit('room_list', game_server.room_list_packet(), broadcast=True)
+
+@socketio.on('cancel_match')
+def handle_cancel_match():
+    emit('match_cancelled', {'success': game_server.cancel_match(request.sid)})
+
 @socketio.on('leave_room')
 def handle_leave_room():
     client_id = request.sid
@@ -512,29 +2214,140 @@ def handle_leave_room():
         
         emit('room_left', {'success': True})
         emit('player_left', {'client_id': client_id}, room=room_id)
-        emit('room_list', game_server.get_room_list(), broadcast=True)
+        emit('room_list', game_server.room_list_packet(), broadcast=True)
     else:
         emit('room_left', {'success': False, 'error': 'Not in a room'})
 
 @socketio.on('player_input')
 def handle_player_input(data):
     client_id = request.sid
-    input_data = data.get('input', {})
+    input_data = parse_player_input(data)
+    room = game_server.rooms.get(game_server.client_rooms.get(client_id))
+    if input_data is None or room is None:
+        return  # Malformed or not playing; never let it reach the tick thread
+    
+    # Optional client sequence number and intended tick for prediction/reconciliation
+    try:
+        seq, tick = parse_input_sequence(data, room.current_tick)
+    except ValueError:
+        return
+    
+    metrics.INPUT_EVENTS.inc()
+    room.update_player_input(client_id, input_data, seq, tick)
+
+@socketio.on('spectate_room')
+def handle_spectate_room(data):
+    """Watch a match without playing; any number of spectators per room."""
+    client_id = request.sid
+    room_id = (data or {}).get('room_id')
+    
+    if not room_id:
+        emit('spectating', {'success': False, 'error': 'Room ID required'})
+        return
+    if not game_server.owns_room(room_id):
+        emit('spectating', {'success': False, 'error': 'Room is on another shard',
+                            'shard': game_server.room_shard(room_id)})
+        return
+    if client_id in game_server.client_rooms:
+        emit('spectating', {'success': False, 'error': 'Already playing in a room'})
+        return
+    
+    room = game_server.spectate_room(client_id, room_id)
+    if room is None:
+        emit('spectating', {'success': False, 'error': 'Room not found'})
+        return
     
-    game_server.update_player_input(client_id, input_data)
+    join_room(room.spectator_channel(game_server.client_formats.get(client_id, 'json')))
+    emit('spectating', {
+        'room_id': room_id,
+        'snapshot_rate': room.spectator_rate,
+        'success': True
+    })
+    room.send_keyframe(client_id, spectator=True)
+    print(f"Client {client_id} is spectating room {room_id} ({len(room.spectators)} spectators)")
+
+@socketio.on('stop_spectating')
+def handle_stop_spectating():
+    room_id = game_server.stop_spectating(request.sid)
+    if room_id is None:
+        emit('spectate_ended', {'success': False, 'error': 'Not spectating'})
+        return
+    emit('spectate_ended', {'success': True, 'room_id': room_id, 'reason': 'left'})
+
+@socketio.on('request_keyframe')
+def handle_request_keyframe():
+    """Resend a full state, e.g. after a client missed a game_delta."""
+    client_id = request.sid
+    room_id = game_server.client_rooms.get(client_id)
+    
+    if room_id in game_server.rooms:
+        game_server.rooms[room_id].send_keyframe(client_id)
+        return
+    room = game_server.rooms.get(game_server.client_spectating.get(client_id))
+    if room is not None:
+        room.send_keyframe(client_id, spectator=True)
+
+def parse_room_query(params) -> Dict[str, Any]:
+    """Validate lobby page parameters (status, cursor, limit, order)."""
+    query = {
+        'status': params.get('status', 'all'),
+        'cursor': params.get('cursor'),
+        'limit': params.get('limit', LOBBY_PAGE_SIZE),
+        'newest_first': params.get('order', 'newest') == 'newest'
+    }
+    if query['cursor'] is not None:
+        query['cursor'] = int(query['cursor'])
+    query['limit'] = int(query['limit'])
+    return query
+
+def parse_player_input(data) -> Optional[Dict[str, bool]]:
+    """The paddle keys of a player_input event: only boolean up/down are kept.
+    Returns None if the event or its input isn't a dict."""
+    if not isinstance(data, dict):
+        return None
+    input_data = data.get('input', {})
+    if not isinstance(input_data, dict):
+        return None
+    return {key: input_data[key] for key in INPUT_KEYS if isinstance(input_data.get(key), bool)}
+
+def parse_input_sequence(data: Dict[str, Any], current_tick: int) -> Tuple[Optional[int], Optional[int]]:
+    """The optional seq and tick of a player_input event. Raises ValueError
+    unless each is a non-negative int, seq fits the 32-bit acks and tick is
+    within INPUT_TICK_WINDOW of the room's current tick."""
+    seq, tick = data.get('seq'), data.get('tick')
+    for name, value in (('seq', seq), ('tick', tick)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise ValueError(f"{name} must be a non-negative integer")
+    if seq is not None and seq > 0xFFFFFFFF:
+        raise ValueError("seq out of range")
+    if tick is not None and abs(tick - current_tick) > INPUT_TICK_WINDOW:
+        raise ValueError("tick too far from the room's current tick")
+    return seq, tick
 
 @socketio.on('get_room_list')
-def handle_get_room_list():
-    emit('room_list', game_server.get_room_list())
+def handle_get_room_list(data=None):
+    """Without data, emit the legacy room_list; with page parameters, emit room_page."""
+    if not data:
+        emit('room_list', game_server.room_list_packet())
+        return
+    
+    try:
+        page = game_server.query_rooms(**parse_room_query(data))
+    except (TypeError, ValueError) as e:
+        emit('room_page', {'success': False, 'error': f'Invalid room query: {e}'})
+        return
+    emit('room_page', page)
 
 @socketio.on('get_room_state')
 def handle_get_room_state():
     client_id = request.sid
     
     if client_id in game_server.client_rooms:
-        room_id = game_server.client_rooms[client_id]
-        if room_id in game_server.rooms:
-            emit('room_state', game_server.rooms[room_id].get_state())
+        room = game_server.wake_room(game_server.client_rooms[client_id])
+        if room is not None:
+            with room.lock:
+                state = room.get_state()
+            emit('room_state', state)
     else:
         emit('room_state', {'error': 'Not in a room'})
 
@@ -571,21 +2384,39 @@ def index():
     
     <h2>API Endpoints:</h2>
     <ul>
-        <li><a href="/rooms">/rooms</a> - Get room list (JSON)</li>
+        <li><a href="/rooms">/rooms</a> - Get room list (JSON; paginate with ?status=open&amp;limit=50&amp;cursor=...)</li>
         <li><a href="/stats">/stats</a> - Get server statistics (JSON)</li>
+        <li><a href="/metrics">/metrics</a> - Prometheus metrics (tick phases, scheduler lateness, emit bytes, inputs, lock waits)</li>
     </ul>
     
-    <p><em>Each room runs its own 60 FPS game loop when both players are connected.</em></p>
+    <p><em>Rooms with both players connected are stepped by a shared tick scheduler; simulation and snapshot rates are set per room type.</em></p>
     '''
 
 @app.route('/rooms')
 def get_rooms():
-    return game_server.get_room_list()
+    if not request.args:
+        return game_server.get_room_list()
+    
+    try:
+        return game_server.query_rooms(**parse_room_query(request.args))
+    except (TypeError, ValueError) as e:
+        return {'error': f'Invalid room query: {e}'}, 400
 
 @app.route('/stats')
 def get_stats():
     return game_server.get_room_stats()
 
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text format: aggregated counters/histograms plus per-room series."""
+    with game_server.lock:
+        metrics.ROOMS.set(game_server.registry.count('all'))
+        metrics.RUNNING_ROOMS.set(game_server.registry.count('running'))
+        metrics.PLAYERS.set(game_server.registry.total_players)
+        metrics.HIBERNATED_ROOMS.set(len(game_server.hibernation) if game_server.hibernation is not None else 0)
+        rooms = list(game_server.rooms.values())
+    return metrics.render(rooms), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 # Production server info endpoint
 @app.route('/health')
 def health_check():
@@ -600,7 +2431,7 @@ if __name__ == '__main__':
     print("🏓 PONG ROYALE SERVER STARTING 🏓")
     print("=" * 50)
     print(f"Server URL: http://{host}:{port}")
-    print(f"Architecture: Per-room game loops at 60 FPS")
+    print(f"Architecture: Shared tick scheduler ({tick_scheduler.workers} {ASYNC_MODE} worker(s)) at {SCHEDULER_RATE} Hz")
     print(f"Max Players per Room: 2")
     print(f"Game starts automatically when both players join")
     print(f"Environment: {'Production' if not app.config['DEBUG'] else 'Development'}")
@@ -613,6 +2444,7 @@ if __name__ == '__main__':
         # Stop all room game loops
         for room in game_server.rooms.values():
             room.stop_game_loop()
+        tick_scheduler.stop()
 else:
     # Production WSGI server (gunicorn)
     print("🏓 Pong Royale Server running in production mode")
\ No newline at end of file
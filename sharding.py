@@ -0,0 +1,230 @@
+"""
+Room sharding across worker processes
+=====================================
+
+Each worker process owns the rooms whose ID hashes to its shard index, so a
+room's game loop and its players' sockets live in one process. Everything
+that has to cross processes goes through a pub/sub message queue:
+
+- Socket.IO emits that address clients on other workers (e.g. the lobby
+  ``room_list`` broadcast), via BrokerManager as the Socket.IO client manager.
+- Lobby summaries, which each shard publishes periodically so that
+  ``get_room_list``/``get_room_stats`` can aggregate across shards.
+
+The queue is pluggable by URL: ``local://host:port`` uses the in-repo
+LocalBroker below (a stand-in for tests and single-box deployments) and
+``redis://...`` uses Redis pub/sub if the redis package is installed.
+
+Run a local broker with:  python sharding.py broker --port 6400
+"""
+
+import argparse
+import pickle
+import threading
+import time
+import zlib
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+import socketio
+
+DEFAULT_AUTHKEY = b'pong-royale-broker'
+
+# Channel used for shard lobby summaries
+LOBBY_CHANNEL = 'pong-royale-lobby'
+
+
+def shard_for(room_id: str, shard_count: int) -> int:
+    """Stable shard index for a room ID (the same in every process)."""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(room_id.encode('utf-8')) % shard_count
+
+
+class LocalBroker:
+    """Minimal in-repo pub/sub broker over multiprocessing connections.
+
+    Clients send ('subscribe', channel) or ('publish', channel, data); every
+    published message is forwarded as (channel, data) to the channel's
+    subscribers. Bind to port 0 to get an ephemeral port (see `address`).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6400, authkey: bytes = DEFAULT_AUTHKEY):
+        self.listener = Listener((host, port), authkey=authkey)
+        self.address = self.listener.address
+        self.subscribers: Dict[str, List[Any]] = {}
+        self.send_locks: Dict[Any, threading.Lock] = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> 'LocalBroker':
+        """Serve in a background thread."""
+        self.running = True
+        threading.Thread(target=self.serve_forever, name="LocalBroker", daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self.running = True
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+            self.send_locks[conn] = threading.Lock()
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self.running = False
+        self.listener.close()
+
+    def _serve_connection(self, conn):
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] == 'subscribe':
+                    with self.lock:
+                        self.subscribers.setdefault(message[1], []).append(conn)
+                elif message[0] == 'publish':
+                    _, channel, data = message
+                    with self.lock:
+                        targets = list(self.subscribers.get(channel, ()))
+                    for target in targets:
+                        self._forward(target, channel, data)
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop(conn)
+
+    def _forward(self, conn, channel: str, data: bytes):
+        lock = self.send_locks.get(conn)
+        if lock is None:
+            return
+        try:
+            with lock:
+                conn.send((channel, data))
+        except (EOFError, OSError):
+            self._drop(conn)
+
+    def _drop(self, conn):
+        with self.lock:
+            for subscribers in self.subscribers.values():
+                if conn in subscribers:
+                    subscribers.remove(conn)
+            self.send_locks.pop(conn, None)
+        conn.close()
+
+
+class LocalBrokerClient:
+    """Publisher/subscriber connection to a LocalBroker."""
+
+    def __init__(self, host: str, port: int, authkey: bytes = DEFAULT_AUTHKEY):
+        self.address = (host, port)
+        self.authkey = authkey
+        self.publisher = Client(self.address, authkey=authkey)
+        self.publish_lock = threading.Lock()
+
+    def publish(self, channel: str, data: bytes):
+        with self.publish_lock:
+            self.publisher.send(('publish', channel, data))
+
+    def listen(self, channel: str) -> Iterator[bytes]:
+        """Yield every message published on `channel` (blocking)."""
+        conn = Client(self.address, authkey=self.authkey)
+        conn.send(('subscribe', channel))
+        try:
+            while True:
+                _, data = conn.recv()
+                yield data
+        finally:
+            conn.close()
+
+
+class RedisBrokerClient:
+    """The same interface backed by Redis pub/sub (requires the redis package)."""
+
+    def __init__(self, url: str):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, data: bytes):
+        self.redis.publish(channel, data)
+
+    def listen(self, channel: str) -> Iterator[bytes]:
+        pubsub = self.redis.pubsub()
+        pubsub.subscribe(channel)
+        for message in pubsub.listen():
+            if message['type'] == 'message':
+                yield message['data']
+
+
+def connect_broker(url: str):
+    """Return a broker client for a message queue URL."""
+    parsed = urlparse(url)
+    if parsed.scheme == 'local':
+        return LocalBrokerClient(parsed.hostname or '127.0.0.1', parsed.port or 6400)
+    if parsed.scheme in ('redis', 'rediss'):
+        return RedisBrokerClient(url)
+    raise ValueError(f"Unsupported message queue URL: {url}")
+
+
+class BrokerManager(socketio.PubSubManager):
+    """Socket.IO client manager that relays emits between workers over a broker."""
+
+    name = 'broker'
+
+    def __init__(self, url: str, channel: str = 'socketio', write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.broker = connect_broker(url)
+
+    def _publish(self, data):
+        self.broker.publish(self.channel, pickle.dumps(data))
+
+    def _listen(self):
+        yield from self.broker.listen(self.channel)
+
+
+class ShardDirectory:
+    """Latest lobby summary from every other shard, received over the broker."""
+
+    def __init__(self, broker, shard_index: int, shard_count: int, ttl: float = 5.0):
+        self.broker = broker
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.ttl = ttl
+        self.remote: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+
+    def publish(self, summary: Dict[str, Any]):
+        self.broker.publish(LOBBY_CHANNEL, pickle.dumps({'shard': self.shard_index, 'summary': summary}))
+
+    def receive(self, message: Dict[str, Any]):
+        if message['shard'] != self.shard_index:
+            self.remote[message['shard']] = (time.time(), message['summary'])
+
+    def listen_forever(self):
+        for data in self.broker.listen(LOBBY_CHANNEL):
+            self.receive(pickle.loads(data))
+
+    def remote_summaries(self) -> List[Dict[str, Any]]:
+        """Summaries from other shards that are fresher than the TTL."""
+        cutoff = time.time() - self.ttl
+        return [summary for received_at, summary in list(self.remote.values()) if received_at >= cutoff]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pong Royale local message broker")
+    parser.add_argument('command', choices=['broker'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6400)
+    args = parser.parse_args()
+
+    broker = LocalBroker(args.host, args.port)
+    print(f"🏓 Pong Royale broker listening on local://{args.host}:{broker.address[1]}")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        broker.close()
+
+
+if __name__ == "__main__":
+    main()
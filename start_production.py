@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import platform
+import time
 
 def start_production_server():
     """Start the production server with the appropriate WSGI server"""
@@ -32,16 +33,30 @@ def start_production_server():
             print("ERROR: waitress not installed. Install with: pip install waitress")
             sys.exit(1)
     else:
-        # Use gunicorn on Unix/Linux (production deployment)
-        print("Using Gunicorn WSGI server (Unix/Linux)")
+        # Use gunicorn on Unix/Linux (production deployment). The worker class
+        # must match the server's ASYNC_MODE (read by server.py as well).
+        async_mode = os.environ.get('ASYNC_MODE', 'threading').lower()
+        if async_mode == 'eventlet':
+            worker_args = ['--worker-class', 'eventlet']
+        elif async_mode == 'gevent':
+            worker_args = ['--worker-class', 'gevent']
+        else:
+            worker_args = ['--worker-class', 'gthread', '--threads', os.environ.get('WORKER_THREADS', '100')]
+        
+        print(f"Using Gunicorn WSGI server (Unix/Linux), {async_mode} mode")
         cmd = [
             'gunicorn',
-            '--worker-class', 'eventlet',
+            *worker_args,
             '-w', '1',
             '--bind', f'{host}:{port}',
             'wsgi:app'
         ]
         
+        shard_count = int(os.environ.get('SHARD_COUNT', '1'))
+        if shard_count > 1:
+            start_sharded_servers(cmd, host, int(port), shard_count)
+            return
+        
         try:
             subprocess.run(cmd, check=True)
         except subprocess.CalledProcessError as e:
@@ -51,5 +66,36 @@ def start_production_server():
             print("ERROR: gunicorn not found. Install with: pip install gunicorn")
             sys.exit(1)
 
+def start_sharded_servers(cmd, host, port, shard_count):
+    """Run one single-worker gunicorn per room shard, linked by a message queue.
+    
+    Shard i listens on port + i. Unless MESSAGE_QUEUE is set, a local broker
+    (sharding.py) is started on BROKER_PORT. A front proxy must route each
+    client to the shard that owns its room (join/create replies carry 'shard').
+    """
+    processes = []
+    message_queue = os.environ.get('MESSAGE_QUEUE')
+    if not message_queue:
+        broker_port = os.environ.get('BROKER_PORT', '6400')
+        processes.append(subprocess.Popen([sys.executable, 'sharding.py', 'broker', '--port', broker_port]))
+        message_queue = f'local://127.0.0.1:{broker_port}'
+        time.sleep(1)  # Let the broker bind before the shards connect
+    
+    print(f"Starting {shard_count} shards on ports {port}-{port + shard_count - 1} via {message_queue}")
+    try:
+        for index in range(shard_count):
+            env = dict(os.environ, SHARD_INDEX=str(index), SHARD_COUNT=str(shard_count),
+                       MESSAGE_QUEUE=message_queue)
+            shard_cmd = cmd[:-2] + [f'{host}:{port + index}', 'wsgi:app']
+            processes.append(subprocess.Popen(shard_cmd, env=env))
+        for process in processes:
+            process.wait()
+    except FileNotFoundError:
+        print("ERROR: gunicorn not found. Install with: pip install gunicorn")
+        sys.exit(1)
+    finally:
+        for process in processes:
+            process.terminate()
+
 if __name__ == '__main__':
     start_production_server()
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test server-side bots: intercept prediction, batched planning and bot matches
+"""
+import random
+
+import server
+from bots import Bot, BotPlanner, bot_settings, intercept_y
+from server import GameRoom, GameServer, Player
+
+
+def test_intercept_matches_simulation():
+    """The predicted crossing point agrees with the simulated ball, wall bounces included.
+    
+    The simulation clamps the ball to a wall rather than reflecting its
+    overshoot, so each bounce may shift it by up to one step of travel.
+    """
+    room = GameRoom("bot_intercept")
+    room.game_active = True
+    room.paddle1.y = room.paddle2.y = -1000  # Out of the way
+    room.ball.x, room.ball.y, room.ball.dx, room.ball.dy = 100.0, 500.0, 350.0, -700.0
+    face = room.paddle2.x - room.ball.radius
+    predicted = intercept_y(room.ball.x, room.ball.y, room.ball.dx, room.ball.dy,
+                            face, room.ball.radius, room.height)
+
+    while room.ball.x < face:
+        room.update_game_state(room.step_dt)
+    overshoot = (room.ball.x - face) / room.ball.dx
+    bounces = 2
+    assert abs(room.ball.y - room.ball.dy * overshoot - predicted) <= bounces * 700.0 * room.step_dt
+    # Already past the line and moving on
+    assert intercept_y(room.ball.x, room.ball.y, 350.0, 0.0, face, room.ball.radius, room.height) is None
+
+
+def test_vectorized_plan_matches_scalar():
+    if not BotPlanner().vectorized:
+        return  # NumPy not installed
+    due = []
+    rng = random.Random(3)
+    for index in range(50):
+        room = GameRoom(f"bot_batch_{index}")
+        room.ball.x, room.ball.y = rng.uniform(50, 750), rng.uniform(20, 580)
+        room.ball.dx, room.ball.dy = rng.choice((-1, 1)) * rng.uniform(200, 900), rng.uniform(-900, 900)
+        player = Player(id='bot', paddle_id=1 + index % 2, bot=Bot.create(rng.random(), room.tick_rate))
+        player.bot.error = 0.0
+        due.append((room, player, room.paddle1 if player.paddle_id == 1 else room.paddle2))
+
+    for (target, move, hold), (expected_target, expected_move, expected_hold) in zip(
+            BotPlanner(vectorized=True).plan(due), BotPlanner(vectorized=False).plan_scalar(due)):
+        assert abs(target - expected_target) < 1e-6
+        assert (move, hold) == (expected_move, expected_hold)
+
+
+def test_difficulty():
+    easy, hard = bot_settings('easy'), bot_settings('hard')
+    assert hard['reaction'] < easy['reaction'] and hard['error'] < easy['error']
+    assert bot_settings(0.5) == bot_settings('medium')
+    for invalid in ('impossible', 1.5, True, None):
+        try:
+            bot_settings(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f"{invalid!r} accepted")
+
+
+def test_bot_match():
+    """A bot match starts at once, bots keep rallies going, and the room goes when the human leaves."""
+    game_server = GameServer()
+    game_server.reaper_running = True
+    game_server.client_formats['c1'] = 'json'
+    match = game_server.find_bot_match('c1', 'hard')
+    room = game_server.rooms[match['room_id']]
+    server.tick_scheduler.deregister(room)  # Ticked by hand below
+    assert match['players'] == {'c1': 1} and room.game_running and len(room.bots) == 1
+
+    # Replace the human with a second bot and play 20 simulated seconds
+    room.players['c1'].bot = Bot.create('hard', room.tick_rate)
+    room._update_player_lists()
+    original_planner = server.bot_planner
+    server.bot_planner = BotPlanner(vectorized=False)
+    server.bot_planner.rng = random.Random(0)
+    try:
+        returns, direction, now = 0, room.ball.dx > 0, room.last_update
+        for _ in range(20 * server.SCHEDULER_RATE):
+            now += 1.0 / server.SCHEDULER_RATE
+            server.TickScheduler.run_frame([room], now)
+            if (room.ball.dx > 0) != direction:
+                direction = not direction
+                returns += 1
+    finally:
+        server.bot_planner = original_planner
+    assert returns >= 5, returns
+    assert room.paddle1.score + room.paddle2.score <= 2
+
+    room.players['c1'].bot = None
+    room._update_player_lists()
+    game_server.leave_room('c1')
+    assert match['room_id'] not in game_server.rooms
+
+
+def test_add_bot_rejections():
+    """add_bot answers bad requests and overload with an error instead of raising."""
+    client = server.socketio.test_client(server.app)
+    client.emit('create_room', {'room_name': 'bot_rejections'})
+    client.get_received()
+    try:
+        client.emit('add_bot', 'hard')
+        assert client.get_received()[-1]['args'][0] == {'success': False, 'error': 'Invalid bot request'}
+        server.overload_controller.level = 2
+        client.emit('add_bot', {'difficulty': 'hard'})
+        reply = client.get_received()[-1]['args'][0]
+        assert reply['success'] is False and reply['retryable'] is True
+    finally:
+        server.overload_controller.level = 0
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    print("Testing bots...")
+    test_intercept_matches_simulation()
+    test_vectorized_plan_matches_scalar()
+    test_difficulty()
+    test_bot_match()
+    test_add_bot_rejections()
+    print("✅ Bots test PASSED")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test room hibernation: waiting rooms go to disk, come back on join and still expire
+"""
+import os
+import tempfile
+
+import hibernation
+import server
+from hibernation import RoomStore
+from server import GameRoom, GameServer, RoomReaper
+
+
+def make_server(directory):
+    game_server = GameServer(hibernation=RoomStore(directory))
+    game_server.reaper_running = True  # Reaped by hand below, not by the background task
+    return game_server
+
+
+def test_state_round_trip():
+    """A rebuilt room has the same settings, scores and players as the original."""
+    room = GameRoom("hibernate_state", room_type='competitive', seed=1234)
+    room.add_player('p1', 'binary')
+    room.paddle1.score, room.paddle2.score = 3, 5
+    room.current_tick = 900
+    room.players['p1'].last_processed_seq = 42
+
+    restored = GameRoom.from_hibernate_state(room.hibernate_state())
+    original, rebuilt = room.get_state(), restored.get_state()
+    for state in (original, rebuilt):
+        del state['timestamp']
+    assert rebuilt == original
+    assert restored.seed == 1234 and restored.created_at == room.created_at
+    assert restored.binary_sids == ['p1']
+
+
+def test_hibernate_and_wake():
+    """Waiting rooms leave memory after HIBERNATE_AFTER and return on join."""
+    with tempfile.TemporaryDirectory() as directory:
+        now = 1000.0
+        game_server = make_server(directory)
+        game_server.reaper = reaper = RoomReaper(now, hibernate_after=30)
+        room_id = game_server.create_room("hibernate_wait")
+        game_server.client_formats['c1'] = game_server.client_formats['c2'] = 'json'
+        assert game_server.join_room('c1', room_id) == 1
+        reaper.track(game_server.rooms[room_id], now)
+
+        expired = reaper.expired(game_server.rooms, now + 31)
+        assert expired == [(room_id, 'hibernate')]
+        with game_server.lock:
+            game_server._hibernate_room(room_id)
+        assert room_id not in game_server.rooms and game_server.is_hibernated(room_id)
+        # Still in the lobby and the stats, from its in-memory summary
+        stats = game_server.get_local_room_stats()
+        assert (stats['total_rooms'], stats['open_rooms'], stats['total_players']) == (1, 1, 1)
+        [info] = game_server.query_rooms()['rooms']
+        assert info['room_id'] == room_id and info['player_count'] == 1
+
+        # Written outside the lock; small enough to be worth it
+        game_server.hibernation.flush(game_server.lock)
+        files = os.listdir(directory)
+        assert files == [f"{room_id}.room"]
+        assert os.path.getsize(os.path.join(directory, files[0])) < 512
+
+        # A second player joining brings the room back and starts the match
+        assert game_server.join_room('c2', room_id) == 2
+        room = game_server.rooms[room_id]
+        assert room.game_running and set(room.players) == {'c1', 'c2'}
+        assert os.listdir(directory) == []
+        stats = game_server.get_local_room_stats()['hibernation']
+        assert stats['hibernations'] == 1 and stats['rehydrations'] == 1
+        room.stop_game_loop()
+
+
+def test_peeking_keeps_the_waiting_ttl():
+    """Waking a room to look at it doesn't restart its waiting TTL, and the
+    file is read before the server lock is taken."""
+    with tempfile.TemporaryDirectory() as directory:
+        now = 1000.0
+        game_server = make_server(directory)
+        game_server.reaper = reaper = RoomReaper(now, hibernate_after=30)
+        room_id = game_server.create_room("hibernate_peek")
+        game_server.client_formats['c1'] = 'json'
+        game_server.join_room('c1', room_id)
+        reaper.track(game_server.rooms[room_id], now)
+        with game_server.lock:
+            game_server._hibernate_room(room_id)
+        game_server.hibernation.flush(game_server.lock)
+
+        reads = []
+        original_open = open
+
+        def tracking_open(path, *args, **kwargs):
+            reads.append(game_server.lock._lock.locked())
+            return original_open(path, *args, **kwargs)
+        hibernation.open = tracking_open
+        try:
+            assert game_server.wake_room(room_id) is game_server.rooms[room_id]
+        finally:
+            del hibernation.open
+        assert reads == [False]
+        assert reaper.watched[room_id][1] == now
+
+        # Peeked again and again, it still closes ROOM_WAITING_TTL after it began waiting
+        with game_server.lock:
+            game_server._hibernate_room(room_id)
+        game_server.wake_room(room_id)
+        later = now + server.ROOM_WAITING_TTL + 1
+        assert reaper.expired(game_server.rooms, later) == [(room_id, 'waiting')]
+
+
+def test_hibernated_room_expires():
+    """A hibernated room still closes at the end of its waiting TTL."""
+    emitted = []
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda event, data=None, **kwargs: emitted.append((event, data))
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            now = 1000.0
+            game_server = make_server(directory)
+            game_server.reaper = reaper = RoomReaper(now, hibernate_after=30)
+            room_id = game_server.create_room("hibernate_expire")
+            game_server.client_formats['c1'] = 'json'
+            game_server.join_room('c1', room_id)
+            reaper.track(game_server.rooms[room_id], now)
+            with game_server.lock:
+                for expired_id, reason in reaper.expired(game_server.rooms, now + 31):
+                    game_server._hibernate_room(expired_id)
+
+            expired = reaper.expired(game_server.rooms, now + server.ROOM_WAITING_TTL + 1)
+            assert expired == [(room_id, 'waiting')]
+            with game_server.lock:
+                game_server._evict_room(room_id, 'waiting')
+            assert not game_server.is_hibernated(room_id) and 'c1' not in game_server.client_rooms
+            assert game_server.get_local_room_stats()['total_rooms'] == 0
+            assert ('room_closed', {'room_id': room_id, 'reason': 'waiting'}) in emitted
+    finally:
+        server.socketio.emit = original_emit
+
+
+if __name__ == "__main__":
+    print("Testing room hibernation...")
+    test_state_round_trip()
+    test_hibernate_and_wake()
+    test_peeking_keeps_the_waiting_ttl()
+    test_hibernated_room_expires()
+    print("✅ Hibernation test PASSED")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the lobby: the indexed room registry (status indexes, counters,
+pagination) and the matchmaking queue
+"""
+from server import GameServer, Matchmaker, MATCH_SKILL_MAX, app, socketio
+
+
+def collect_pages(server, **query):
+    """Walk every page of a lobby query and return the room IDs in order."""
+    room_ids, cursor = [], None
+    while True:
+        page = server.query_rooms(cursor=cursor, **query)
+        room_ids += [info['room_id'] for info in page['rooms']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return room_ids
+
+
+def test_pagination():
+    """Cursor pages visit every room exactly once in creation order, both directions."""
+    server = GameServer()
+    created = [server.create_room(f"lobby_{i}") for i in range(25)]
+
+    assert collect_pages(server, limit=7) == created
+    assert collect_pages(server, limit=7, newest_first=True) == created[::-1]
+    page = server.query_rooms(limit=10)
+    assert len(page['rooms']) == 10 and page['total'] == 25
+    print(f"Paged {len(created)} rooms in pages of 7")
+
+
+def test_status_indexes():
+    """Open/running indexes and player counters follow joins and leaves."""
+    server = GameServer()
+    full = server.create_room("full")
+    half = server.create_room("half")
+    server.join_room("a", full)
+    server.join_room("b", full)
+    server.join_room("c", half)
+
+    assert collect_pages(server, status='open') == [half]
+    assert collect_pages(server, status='running') == [full]
+    stats = server.get_local_room_stats()
+    assert stats['total_players'] == 3 and stats['rooms_with_players'] == 2
+    assert stats['active_games'] == 1 and stats['open_rooms'] == 1
+
+    # Moving a player out of the running room reopens it
+    server.join_room("b", half)
+    assert collect_pages(server, status='open') == [full]
+    assert collect_pages(server, status='running') == [half]
+
+    for client_id in ("a", "b", "c"):
+        server.leave_room(client_id)
+    stats = server.get_local_room_stats()
+    assert stats['total_rooms'] == 0 and stats['total_players'] == 0
+    assert server.query_rooms()['rooms'] == []
+    print("Status indexes track joins and leaves")
+
+
+def test_matchmaking():
+    """Clients pair FIFO within a skill/region bucket; rooms only exist once paired."""
+    server = GameServer()
+    assert server.find_match("a", skill=1450, region="eu") is None
+    assert server.find_match("b", skill=1450, region="us") is None
+    assert server.find_match("c", skill=1900, region="eu") is None
+    assert server.rooms == {}
+    assert server.get_local_room_stats()['matchmaking']['queue_depth'] == 3
+
+    match = server.find_match("d", skill=1420, region="eu")
+    assert match['players'] == {"a": 1, "d": 2}
+    assert server.client_rooms["a"] == server.client_rooms["d"] == match['room_id']
+    assert server.rooms[match['room_id']].game_running
+
+    # Cancelled and disconnected clients are never paired
+    assert server.cancel_match("b")
+    server.leave_room("c")
+    assert server.find_match("e", skill=1450, region="us") is None
+    assert server.find_match("f", skill=1900, region="eu") is None
+    assert server.find_match("g", skill=1400, region="us")['players'] == {"e": 1, "g": 2}
+
+    stats = server.get_local_room_stats()['matchmaking']
+    assert stats['queue_depth'] == 1 and stats['matches_made'] == 2
+    assert stats['queue_buckets'] == {Matchmaker.bucket_for(1900, "eu"): 1}
+    assert stats['wait_p99'] >= stats['wait_p50'] >= 0.0
+    print(f"Matchmaking stats: {stats}")
+
+
+def test_matchmaking_edge_cases():
+    """Cancelled clients leave no queue behind, and odd skills can't break bucketing."""
+    server = GameServer()
+    for index in range(3):
+        assert server.find_match(f"gone{index}", skill=1450, region=f"region{index}") is None
+    assert server.find_match("gone0", skill=100, region="eu") is None  # Re-queued elsewhere
+    for client_id in ("gone0", "gone1", "gone2"):
+        assert server.cancel_match(client_id)
+    assert server.matchmaker.queues == {} and server.matchmaker.waiting == {}
+
+    assert Matchmaker.bucket_for(-5) == Matchmaker.bucket_for(0)
+    assert Matchmaker.bucket_for(10 ** 400) == Matchmaker.bucket_for(MATCH_SKILL_MAX)
+    client = socketio.test_client(app)
+    try:
+        for skill in (float('nan'), float('inf'), float('-inf')):
+            client.emit('find_match', {'skill': skill})
+            reply = client.get_received()[-1]
+            assert reply['name'] == 'match_queued' and reply['args'][0]['success'] is False, skill
+    finally:
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    print("Testing lobby registry...")
+    test_pagination()
+    test_status_indexes()
+    test_matchmaking()
+    test_matchmaking_edge_cases()
+    print("✅ Lobby test PASSED")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the /metrics instrumentation: histogram rendering and per-room series
+"""
+import metrics
+import server
+from server import GameRoom, Player
+
+
+def test_histogram_rendering():
+    """Buckets are cumulative and end with +Inf, _sum and _count."""
+    registry = metrics.Registry()
+    histogram = metrics.Histogram('test_seconds', 'A test histogram', {'phase': 'update'},
+                                  buckets=(0.01, 0.1), registry=registry)
+    for value in (0.005, 0.05, 0.05, 2.0):
+        histogram.observe(value)
+    counter = metrics.Counter('test_total', 'A test counter', registry=registry)
+    counter.inc(3)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP test_seconds A test histogram', '# TYPE test_seconds histogram']
+    assert 'test_seconds_bucket{phase="update",le="0.01"} 1' in lines
+    assert 'test_seconds_bucket{phase="update",le="0.1"} 3' in lines
+    assert 'test_seconds_bucket{phase="update",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{phase="update"} 2.105' in lines
+    assert 'test_seconds_count{phase="update"} 4' in lines
+    assert 'test_total 3' in lines
+
+
+def test_room_series():
+    """Ticks and snapshots are recorded on the room and in the aggregates."""
+    emitted = []
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda event, data=None, **kwargs: emitted.append(event)
+    try:
+        room = GameRoom("metrics_test")
+        room.players = {
+            'p1': Player(id='p1', paddle_id=1),
+            'p2': Player(id='p2', paddle_id=2),
+        }
+        room.game_active = room.game_running = True
+        snapshots_before = metrics.SNAPSHOTS.value
+        updates_before = metrics.TICK_PHASE_SECONDS['update'].count
+
+        room.last_update, room.accumulator = 0.0, 0.0
+        room.tick(room.step_dt * 3.5)
+        room.broadcast_state()
+        room.broadcast_state()
+    finally:
+        server.socketio.emit = original_emit
+
+    assert emitted[0] == 'game_state' and emitted[-1] == 'game_delta'
+    assert room.metrics.ticks == room.current_tick == 3
+    assert room.metrics.snapshots == len(emitted)
+    assert metrics.SNAPSHOTS.value - snapshots_before == len(emitted)
+    assert metrics.TICK_PHASE_SECONDS['update'].count > updates_before
+
+    output = metrics.render([room])
+    assert 'pong_room_ticks_total{room="metrics_test"} 3' in output
+    assert f'pong_room_snapshots_total{{room="metrics_test"}} {len(emitted)}' in output
+    assert '# TYPE pong_tick_phase_seconds histogram' in output
+
+
+if __name__ == "__main__":
+    print("Testing metrics...")
+    test_histogram_rendering()
+    test_room_series()
+    print("✅ Metrics test PASSED")
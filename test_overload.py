@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test overload control: level changes and snapshot thinning under load
+"""
+import server
+from server import GameRoom, OverloadController, Player
+
+
+def test_levels_follow_lateness():
+    """Sustained lateness degrades then sheds; recovery steps down after the hold."""
+    controller = OverloadController(degrade_after=0.004, shed_after=0.012, hold=2.0)
+    now = 0.0
+    for _ in range(200):
+        now += 0.01
+        controller.observe(0.008, now)
+    assert controller.level == 1
+    assert controller.snapshot_divisor == 2 and controller.accepting_rooms
+
+    for _ in range(200):
+        now += 0.01
+        controller.observe(0.05, now)
+    assert controller.level == 2 and not controller.accepting_rooms
+    error = controller.refuse_room()
+    assert error['retryable'] and not error['success']
+    assert controller.stats()['refused_rooms'] == 1
+
+    # Lateness gone: held at shedding until the hold time has passed
+    shed_at = controller.changed_at
+    while controller.level == 2:
+        now += 0.01
+        controller.observe(0.0, now)
+    assert now - shed_at >= 2.0
+    while controller.level > 0:
+        now += 0.01
+        controller.observe(0.0, now)
+    assert controller.stats()['level'] == 'normal'
+
+
+def test_only_idle_rounds_are_thinned():
+    """Rooms in play keep every snapshot slot; serving rooms skip slots while degraded."""
+    original = server.overload_controller
+    server.overload_controller = controller = OverloadController()
+    controller.level = 2
+    try:
+        room = GameRoom("overload_test", snapshot_rate=60)
+        room.players = {'p1': Player(id='p1', paddle_id=1), 'p2': Player(id='p2', paddle_id=2)}
+        room.game_running = room.game_active = True
+        interval = 1.0 / room.snapshot_rate
+
+        room.serve_delay = 0.0
+        assert room.round_state == server.ROUND_PLAYING
+        sent = sum(room.snapshot_due((slot + 0.5) * interval) for slot in range(40))
+        assert sent == 40
+
+        room.serve_delay = 10.0
+        assert room.round_state == server.ROUND_SERVING
+        sent = sum(room.snapshot_due((40.5 + slot) * interval) for slot in range(40))
+        assert sent == 40 // controller.snapshot_divisor
+        assert controller.thinned_snapshots == 40 - sent
+    finally:
+        server.overload_controller = original
+
+
+if __name__ == "__main__":
+    print("Testing overload control...")
+    test_levels_follow_lateness()
+    test_only_idle_rounds_are_thinned()
+    print("✅ Overload test PASSED")
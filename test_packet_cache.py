@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test encode-once packets: spliced Socket.IO frames and the versioned packet cache
+"""
+import json
+
+import socketio
+
+import metrics
+import server
+from packet_cache import EncodedPayload, PacketCache, SocketJSON, encode
+from server import GameRoom, Player, game_server
+
+
+def test_spliced_packet_matches_regular_encoding():
+    """An EncodedPayload goes on the wire exactly as the payload itself would."""
+    payload = {'room': {'id': 'abc', 'players': [1, 2]}, 'score': 1.5, 'name': 'é'}
+    socketio.packet.Packet.json = SocketJSON
+    regular = socketio.packet.Packet(socketio.packet.EVENT, data=['room_list', payload]).encode()
+    spliced = socketio.packet.Packet(socketio.packet.EVENT, data=['room_list', encode(payload)]).encode()
+    assert spliced == regular
+    assert SocketJSON.loads(regular[1:]) == ['room_list', payload]
+
+
+def test_cache_reuses_until_version_changes():
+    cache = PacketCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'build': len(builds)}
+
+    first = cache.get('key', 1, build)
+    assert cache.get('key', 1, build) is first
+    assert json.loads(cache.get('key', 2, build).text) == {'build': 2}
+    assert len(builds) == 2
+    # Entries older than max_age are rebuilt even if the version is the same
+    assert json.loads(cache.get('key', 2, build, max_age=0.0).text) == {'build': 3}
+
+
+def test_room_list_and_keyframe_packets():
+    """room_list is re-encoded only after the lobby changes; keyframes once per snapshot on the tick."""
+    packet = game_server.room_list_packet()
+    hits = metrics.PACKET_CACHE_HITS.value
+    assert game_server.room_list_packet() is packet
+    assert metrics.PACKET_CACHE_HITS.value == hits + 1
+
+    room_id = game_server.create_room()
+    try:
+        changed = game_server.room_list_packet()
+        assert changed is not packet and room_id in json.loads(changed.text)
+    finally:
+        game_server.registry.remove(room_id)
+
+    room = GameRoom("packet_test")
+    room.players = {'p1': Player(id='p1', paddle_id=1), 'p2': Player(id='p2', paddle_id=2)}
+    emitted = []
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda event, data=None, to=None, room=None, **kwargs: emitted.append(
+        (event, data, to or room))
+    try:
+        # Outside a match the keyframe goes out at once
+        room.send_keyframe('c1')
+        assert emitted[0][0] == 'game_state' and emitted[0][2] == 'c1'
+        assert json.loads(emitted[0][1].text)['tick'] == room.current_tick
+
+        # During one, every client that asks before the next snapshot shares one
+        # encode of the delta's base, sent just ahead of the delta
+        room.game_running = room.game_active = True
+        room.broadcast_state()
+        emitted.clear()
+        room.send_keyframe('c1')
+        room.send_keyframe('c2')
+        assert not emitted
+        room.step()
+        room.broadcast_state()
+        (keyframe_event, keyframe, waiters), (delta_event, delta, _) = emitted
+        assert (keyframe_event, waiters, delta_event) == ('game_state', ['c1', 'c2'], 'game_delta')
+        assert isinstance(keyframe, EncodedPayload)
+        assert json.loads(keyframe.text)['tick'] == delta['base_tick'] == room.current_tick - 1
+        assert not room.keyframe_waiters
+    finally:
+        server.socketio.emit = original_emit
+
+def test_encode_series_are_bounded():
+    """Acks and other ad-hoc strings share one 'other' series instead of one each."""
+    for index in range(3):
+        SocketJSON.dumps([f'ack-{index}', {'success': True}])
+    SocketJSON.dumps(['room_closed', {'room_id': 'abc', 'reason': 'idle'}])
+    assert not any(event.startswith('ack-') for event in metrics.ENCODE_SECONDS)
+    assert {'other', 'room_closed'} <= set(metrics.ENCODE_SECONDS)
+    assert set(metrics.ENCODE_SECONDS) <= metrics.ENCODE_EVENTS | {'other'}
+
+
+if __name__ == "__main__":
+    print("Testing packet cache...")
+    test_spliced_packet_matches_regular_encoding()
+    test_cache_reuses_until_version_changes()
+    test_room_list_and_keyframe_packets()
+    test_encode_series_are_bounded()
+    print("✅ Packet cache test PASSED")
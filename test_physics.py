@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test that the vectorized NumPy physics backend matches the scalar GameRoom path
+"""
+import random
+import time
+
+from server import GameRoom, Player, SERVE_DELAY, TickScheduler
+from numpy_physics import VectorPhysics
+
+
+def make_room(rng, index):
+    """Build a running room with randomized ball, paddle and input state."""
+    room = GameRoom(f"physics_{index}", seed=index)
+    room.players = {
+        'p1': Player(id='p1', paddle_id=1),
+        'p2': Player(id='p2', paddle_id=2),
+    }
+    room.game_active = True
+    room.ball.x = rng.uniform(-20, room.width + 20)
+    room.ball.y = rng.uniform(0, room.height)
+    room.ball.dx = rng.choice([-1, 1]) * rng.uniform(100, 2000)
+    room.ball.dy = rng.uniform(-600, 600)
+    room.paddle1.y = rng.uniform(0, room.height - room.paddle1.height)
+    room.paddle2.y = rng.uniform(0, room.height - room.paddle2.height)
+    for player in room.players.values():
+        player.input_state = {'up': rng.random() < 0.4, 'down': rng.random() < 0.4}
+    if rng.random() < 0.1:
+        room.game_paused = True
+    return room
+
+
+def physics_snapshot(room):
+    return (
+        room.ball.x, room.ball.y, room.ball.dx, room.ball.dy,
+        room.paddle1.y, room.paddle2.y,
+        room.paddle1.score, room.paddle2.score,
+        room.serve_delay, room.serve_count,
+    )
+
+
+def test_vectorized_matches_scalar():
+    """Step the same rooms through both backends and compare every field."""
+    if not VectorPhysics.available:
+        print("NumPy not installed, skipping vectorized physics test")
+        return
+
+    engine = VectorPhysics(capacity=8)
+    scalar_rng, vector_rng = random.Random(1234), random.Random(1234)
+    scalar_rooms = [make_room(scalar_rng, i) for i in range(500)]
+    vector_rooms = [make_room(vector_rng, i) for i in range(500)]
+    dts = [scalar_rng.uniform(0.001, 0.05) for _ in scalar_rooms]
+
+    for _ in range(60):
+        for room, dt in zip(scalar_rooms, dts):
+            room.update_game_state(dt)
+        engine.step(vector_rooms, dts)
+
+        for scalar, vector in zip(scalar_rooms, vector_rooms):
+            expected = physics_snapshot(scalar)
+            actual = physics_snapshot(vector)
+            assert actual == expected, f"{scalar.room_id}: {actual} != {expected}"
+
+    print(f"Vectorized physics matched scalar physics for {len(scalar_rooms)} rooms")
+
+
+def run_scripted_match(seed, stall_at=None):
+    """Run a room through a fixed input script, optionally with one long stall."""
+    room = GameRoom("determinism", seed=seed)
+    room.players = {
+        'p1': Player(id='p1', paddle_id=1),
+        'p2': Player(id='p2', paddle_id=2),
+    }
+    room.game_active = room.game_running = True
+    room.reset_ball()
+    room.last_update = now = 0.0
+    for frame in range(3000):
+        room.players['p1'].input_state['up'] = frame % 90 < 45
+        room.players['p2'].input_state['down'] = frame % 70 < 35
+        now += 0.2 if frame == stall_at else 1 / 60
+        for _ in range(room.due_steps(now)):
+            room.step()
+    return room.current_tick, physics_snapshot(room)
+
+
+def test_fixed_step_is_deterministic():
+    """Same seed and inputs give the same match; different seeds diverge."""
+    first = run_scripted_match(seed=42)
+    assert first == run_scripted_match(seed=42)
+    assert first != run_scripted_match(seed=43)
+    assert run_scripted_match(seed=42, stall_at=500) == run_scripted_match(seed=42, stall_at=500)
+    print(f"Deterministic after {first[0]} ticks: {first[1]}")
+
+
+def make_fast_room(speed):
+    """A 20 Hz room whose ball will cross the whole left paddle in one step."""
+    room = GameRoom(f"tunnel_{speed}", tick_rate=20)
+    room.game_active = True
+    room.paddle1.y = room.height / 2 - room.paddle1.height / 2
+    room.ball.x, room.ball.y = 200, room.height / 2
+    room.ball.dx, room.ball.dy = speed, 0
+    return room
+
+
+def test_fast_ball_does_not_tunnel():
+    """A ball that passes a whole paddle in one step still bounces, in both backends."""
+    speeds = (-6000, -12000)
+    rooms = [make_fast_room(speed) for speed in speeds]
+    for room, speed in zip(rooms, speeds):
+        assert room.ball.x + speed * room.step_dt < room.paddle1.x  # discrete check would miss it
+        room.step()
+        assert room.ball.dx > 0 and room.paddle2.score == 0
+        assert room.ball.x > room.paddle1.x + room.paddle1.width + room.ball.radius
+
+    if VectorPhysics.available:
+        vector_rooms = [make_fast_room(speed) for speed in speeds]
+        VectorPhysics(capacity=2).step(vector_rooms, [room.step_dt for room in vector_rooms])
+        for scalar, vector in zip(rooms, vector_rooms):
+            assert physics_snapshot(scalar) == physics_snapshot(vector)
+    print(f"Swept collision returned a {-speeds[-1]} px/s ball at 20 Hz")
+
+
+def test_serve_countdown():
+    """After a point the room counts down in simulated time while ticks and input continue."""
+    room = GameRoom("serve", seed=7)
+    room.players = {
+        'p1': Player(id='p1', paddle_id=1),
+        'p2': Player(id='p2', paddle_id=2),
+    }
+    room.game_active = room.game_running = True
+    room.ball.x, room.ball.dx = room.width + 50, 300
+    room.step()
+    assert room.paddle1.score == 1 and room.round_state == 'serving'
+    assert room.get_state()['countdown'] == SERVE_DELAY
+
+    room.players['p1'].input_state['down'] = True
+    paddle_y, ball = room.paddle1.y, (room.ball.x, room.ball.y)
+    steps = 0
+    while room.round_state == 'serving':
+        room.step()
+        steps += 1
+    assert steps == round(SERVE_DELAY * room.tick_rate)
+    assert room.paddle1.y > paddle_y and (room.ball.x, room.ball.y) == ball
+    room.step()
+    assert room.round_state == 'playing' and room.ball.x != ball[0]
+
+    room.paddle2.score = room.max_score
+    assert room.round_state == 'finished'
+    print(f"Served after {steps} ticks of countdown")
+
+
+def test_failing_room_is_isolated():
+    """A room whose tick raises is stopped; the other rooms keep advancing,
+    exactly one step per tick."""
+    def broken(*args):
+        raise ValueError("broken room")
+
+    class BrokenEngine(VectorPhysics):
+        def simulate(self, rooms, dts):
+            if any(room.room_id.endswith('_broken') for room in rooms):
+                broken()
+            return super().simulate(rooms, dts)
+
+    class BrokenScatter(VectorPhysics):
+        # Fails after the healthy rooms of the batch were written back
+        @staticmethod
+        def scatter(room, *state):
+            if room.room_id.endswith('_broken'):
+                broken()
+            VectorPhysics.scatter(room, *state)
+
+    def run(names, engine):
+        rooms = [GameRoom(name, seed=index) for index, name in enumerate(names)]
+        for room in rooms:
+            # Not started, so no scheduler worker ticks it behind our back
+            room.players = {
+                'p1': Player(id='p1', paddle_id=1),
+                'p2': Player(id='p2', paddle_id=2),
+            }
+            room.game_active = room.game_running = True
+            room.reset_ball()
+        if engine is None:
+            rooms[1].update_game_state = broken
+
+        now = 1000.0
+        for room in rooms:
+            room.last_update = now
+        for _ in range(5):
+            now += 1.5 * rooms[0].step_dt
+            TickScheduler.run_frame(rooms, now, engine)
+        running = [room.game_running for room in rooms]
+        for room in rooms:
+            room.stop_game_loop()
+        return rooms, running
+
+    names = ("isolated_a", "isolated_broken", "isolated_b")
+    engines = [None] + ([BrokenEngine(), BrokenScatter()] if VectorPhysics.available else [])
+    for engine in engines:
+        rooms, running = run(names, engine)
+        assert running == [True, False, True] and rooms[1].current_tick == 0
+        assert [room.current_tick for room in (rooms[0], rooms[2])] == [7, 7]
+        if engine is not None:
+            # The healthy rooms end up where an unbroken engine puts them
+            expected, _ = run(names, VectorPhysics())
+            for room, other in ((rooms[0], expected[0]), (rooms[2], expected[2])):
+                assert (room.ball.x, room.ball.y) == (other.ball.x, other.ball.y)
+
+
+if __name__ == "__main__":
+    print("Testing vectorized physics backend...")
+    test_vectorized_matches_scalar()
+    test_fixed_step_is_deterministic()
+    test_fast_ball_does_not_tunnel()
+    test_serve_countdown()
+    test_failing_room_is_isolated()
+    print("✅ Vectorized physics test PASSED")
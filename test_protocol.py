@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test the game_state wire protocol: keyframes and game_delta compression
+"""
+import json
+import threading
+import time
+
+from server import (INPUT_TICK_WINDOW, GameRoom, Player, TickScheduler, diff_state,
+                    parse_input_sequence, parse_player_input)
+from test_rooms import apply_delta
+from wire_format import STATE_STRUCT, FIXED_POINT_SCALE, encode_room_state, decode_state
+
+
+def make_running_room():
+    room = GameRoom("protocol_test")
+    room.players = {
+        'p1': Player(id='p1', paddle_id=1),
+        'p2': Player(id='p2', paddle_id=2),
+    }
+    room.game_active = True
+    return room
+
+
+def test_delta_roundtrip():
+    """Applying every delta to the first keyframe reproduces the latest state."""
+    room = make_running_room()
+    room.players['p1'].input_state['up'] = True
+
+    client_state = json.loads(json.dumps(room.get_state()))
+    previous = room.get_state()
+    full_bytes = delta_bytes = 0
+
+    for _ in range(120):
+        room.step()
+        current = room.get_state()
+        delta = diff_state(previous, current)
+        apply_delta(client_state, json.loads(json.dumps(delta)))
+        assert client_state == json.loads(json.dumps(current))
+
+        full_bytes += len(json.dumps(current))
+        delta_bytes += len(json.dumps(delta))
+        previous = current
+
+    print(f"Full states: {full_bytes} bytes, deltas: {delta_bytes} bytes")
+    assert delta_bytes * 3 < full_bytes
+
+
+def test_removed_keys():
+    """Keys that disappear are sent as None and removed on the client."""
+    previous = {'players': {'a': {'id': 'a'}, 'b': {'id': 'b'}}}
+    current = {'players': {'a': {'id': 'a'}}}
+    delta = diff_state(previous, current)
+    assert delta == {'players': {'b': None}}
+    assert apply_delta(previous, delta) == current
+
+
+def test_state_buffers_are_reused():
+    """fill_state rewrites the same containers and matches get_state."""
+    room = make_running_room()
+    state = room.fill_state(room.new_state())
+    containers = [id(state[key]) for key in ('ball', 'paddle1', 'paddle2', 'players', 'acks')]
+    room.step()
+    room.fill_state(state)
+    assert containers == [id(state[key]) for key in ('ball', 'paddle1', 'paddle2', 'players', 'acks')]
+
+    expected = room.get_state()
+    expected['timestamp'] = state['timestamp']
+    assert state == expected
+
+    # Player changes rebuild the player entries in place
+    del room.players['p2']
+    room.fill_state(state)
+    assert set(state['players']) == set(state['acks']) == {'p1'}
+
+
+def test_binary_roundtrip():
+    """Binary payloads are small and decode to within the fixed-point step."""
+    room = make_running_room()
+    room.game_running = True
+    room.current_tick = 1234
+    room.ball.x, room.ball.y, room.ball.dx, room.ball.dy = 123.456, -7.3, -812.9, 44.44
+    room.paddle1.y, room.paddle1.score = 250.1, 3
+    room.paddle2.y, room.paddle2.score = 17.9, 9
+
+    room.players['p2'].last_processed_seq = 77
+
+    payload = encode_room_state(room)
+    decoded = decode_state(payload)
+    tolerance = 0.5 / FIXED_POINT_SCALE
+
+    assert len(payload) == STATE_STRUCT.size < 64
+    assert decoded['tick'] == 1234
+    assert decoded['game_running'] and decoded['game_active'] and not decoded['game_paused']
+    assert decoded['round_state'] == 'playing' and decoded['countdown'] == 0
+    assert decoded['paddle1']['score'] == 3 and decoded['paddle2']['score'] == 9
+    assert decoded['paddle1']['ack'] == 0 and decoded['paddle2']['ack'] == 77
+    for key in ('x', 'y', 'dx', 'dy'):
+        assert abs(decoded['ball'][key] - getattr(room.ball, key)) <= tolerance
+    assert abs(decoded['paddle1']['y'] - room.paddle1.y) <= tolerance
+    assert abs(decoded['paddle2']['y'] - room.paddle2.y) <= tolerance
+
+    room.serve_delay = 0.25
+    decoded = decode_state(encode_room_state(room))
+    assert decoded['round_state'] == 'serving' and decoded['countdown'] == 0.25
+    print(f"Binary state payload: {len(payload)} bytes vs {len(json.dumps(room.get_state()))} bytes of JSON")
+
+
+def test_sequenced_inputs():
+    """Buffered inputs apply at their intended tick and are acked in the state."""
+    room = make_running_room()
+    paddle_y = room.paddle1.y
+
+    room.update_player_input('p1', {'up': True}, seq=2, tick=3)
+    room.update_player_input('p1', {'up': False}, seq=3, tick=4)
+    room.update_player_input('p1', {'down': True}, seq=1, tick=1)  # out of order
+    room.update_player_input('p1', {'down': True}, seq=1, tick=1)  # duplicate
+    assert len(room.players['p1'].input_inbox) == 4  # queued without the room lock
+    room.drain_inputs()
+    assert [entry[0] for entry in room.players['p1'].input_buffer] == [1, 2, 3]
+
+    room.step()  # tick 1: seq 1 applies
+    assert room.get_state()['acks']['p1'] == 1
+    room.step()  # tick 2: nothing new
+    assert room.get_state()['acks']['p1'] == 1
+    room.step()  # tick 3: seq 2 applies, paddle moves up
+    assert room.get_state()['acks']['p1'] == 2
+    assert room.paddle1.y < paddle_y + 2 * room.paddle1.speed * room.step_dt
+
+    room.update_player_input('p1', {'up': True}, seq=2, tick=9)  # already processed
+    room.step()  # tick 4: seq 3 applies
+    assert room.get_state()['acks']['p1'] == 3
+    assert not room.players['p1'].input_buffer
+    assert room.players['p1'].input_state['up'] is False
+
+
+def test_input_ingestion_is_lock_free():
+    """Input arrives while the tick holds the room lock; contention is recorded."""
+    room = make_running_room()
+    room.lock.acquire()
+    sender = threading.Thread(target=lambda: [
+        room.update_player_input('p2', {'down': i % 2 == 0}, seq=i + 1, tick=1) for i in range(100)
+    ])
+    sender.start()
+    sender.join(timeout=2)
+    assert not sender.is_alive(), "update_player_input blocked on the room lock"
+
+    waiter = threading.Thread(target=room.step)
+    waiter.start()
+    time.sleep(0.05)
+    room.lock.release()
+    waiter.join(timeout=2)
+
+    assert room.get_state()['acks']['p2'] == 100
+    assert room.lock.contended == 1 and room.lock.max_wait >= 0.04
+    print(f"Room lock: {room.lock.acquisitions} acquisitions, max wait {room.lock.max_wait * 1000:.1f} ms")
+
+
+def test_malformed_input_is_rejected():
+    """Only boolean up/down keys of a dict reach the room; the tick keeps running."""
+    for data in ({'input': 'xyz'}, {'input': ['up']}, {'input': None}, 'xyz', None, 7):
+        assert parse_player_input(data) is None, data
+    assert parse_player_input({}) == {}
+    assert parse_player_input({'input': {'up': True, 'down': 'yes', 'x': 1e9}}) == {'up': True}
+
+    room = make_running_room()
+    room.game_running = True
+    for data in ({'input': 'xyz'}, {'input': {'up': 1, 'down': True, '__class__': 'x'}}):
+        input_data = parse_player_input(data)
+        if input_data is not None:
+            room.update_player_input('p1', input_data)
+    now = room.last_update
+    for _ in range(3):
+        now += room.step_dt
+        TickScheduler.run_frame([room], now)
+    assert room.current_tick == 3
+    assert room.players['p1'].input_state == {'up': False, 'down': True}
+
+
+def test_input_sequence_validation():
+    """seq and tick are optional, but must be sane integers near the room's tick."""
+    assert parse_input_sequence({}, 500) == (None, None)
+    assert parse_input_sequence({'seq': 0, 'tick': 500 + INPUT_TICK_WINDOW}, 500) == (0, 500 + INPUT_TICK_WINDOW)
+    for data in ({'seq': -1}, {'seq': 1 << 32}, {'seq': '7'}, {'seq': True}, {'seq': 2.5},
+                 {'tick': -1}, {'tick': 501 + INPUT_TICK_WINDOW}, {'tick': 0}, {'tick': [500]}):
+        try:
+            parse_input_sequence(data, 500)
+        except ValueError:
+            continue
+        raise AssertionError(f"{data!r} accepted")
+
+
+if __name__ == "__main__":
+    print("Testing game_state protocol...")
+    test_delta_roundtrip()
+    test_removed_keys()
+    test_state_buffers_are_reused()
+    test_binary_roundtrip()
+    test_sequenced_inputs()
+    test_input_ingestion_is_lock_free()
+    test_malformed_input_is_rejected()
+    test_input_sequence_validation()
+    print("✅ Protocol test PASSED")
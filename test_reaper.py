@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the room reaper: timer wheel expiry and TTLs for waiting, idle and finished rooms
+"""
+import random
+import time
+
+import server
+from bots import Bot, BotPlanner
+from server import GameServer, Player, RoomReaper
+from timer_wheel import TimerWheel
+
+
+def test_timer_wheel():
+    """Timers fire once their deadline passes, including beyond one turn of the wheel."""
+    wheel = TimerWheel(now=0.0, slots=8, resolution=1.0)
+    wheel.schedule('a', 3.0)
+    wheel.schedule('b', 3.5)
+    wheel.schedule('far', 20.0)  # Shares a slot with tick 4 over two more turns
+    wheel.schedule('cancelled', 2.0)
+    assert wheel.cancel('cancelled') and len(wheel) == 3
+
+    assert wheel.advance(2.9) == []
+    assert wheel.advance(3.0) == ['a']
+    assert wheel.advance(4.0) == ['b']
+    assert wheel.advance(12.0) == []
+    wheel.schedule('b', 13.0)  # Rescheduled
+    # A gap longer than the whole wheel still visits every slot once
+    assert sorted(wheel.advance(100.0)) == ['b', 'far']
+    assert len(wheel) == 0
+
+
+def make_server():
+    game_server = GameServer()
+    game_server.reaper_running = True  # Reaped by hand below, not by the background task
+    return game_server
+
+
+def test_reaper_ttls():
+    """Waiting, idle and finished rooms expire after their TTL; active rooms don't."""
+    now = 1000.0
+    game_server = make_server()
+    game_server.reaper = reaper = RoomReaper(now)
+    room_ids = [game_server.create_room(f"reaper_{name}") for name in ('waiting', 'active', 'idle', 'finished')]
+    rooms = [game_server.rooms[room_id] for room_id in room_ids]
+    for room in rooms:
+        reaper.track(room, now)
+    waiting, active, idle, finished = rooms
+    for room in (active, idle, finished):
+        room.game_running = room.game_active = True
+        reaper.track(room, now)
+    finished.paddle1.score = finished.max_score
+
+    assert reaper.expired(game_server.rooms, now + server.ROOM_IDLE_TTL - 1) == []
+    active.metrics.inputs += 1  # Input arrived in the active room only
+    # Idle room times out; the finished room's phase change is noticed and re-armed
+    assert reaper.expired(game_server.rooms, now + server.ROOM_IDLE_TTL + 1) == [(idle.room_id, 'idle')]
+
+    later = now + server.ROOM_IDLE_TTL + server.ROOM_FINISHED_TTL + 2
+    assert reaper.expired(game_server.rooms, later) == [(finished.room_id, 'finished')]
+    expired = reaper.expired(game_server.rooms, now + server.ROOM_WAITING_TTL + 1)
+    assert (waiting.room_id, 'waiting') in expired
+    assert (active.room_id, 'idle') in expired  # No input since the last check
+
+
+def test_bot_moves_are_not_activity():
+    """A human-vs-bot room whose human is AFK goes idle, however much the bot moves."""
+    now = 1000.0
+    game_server = make_server()
+    game_server.reaper = reaper = RoomReaper(now)
+    room = game_server.rooms[game_server.create_room("reaper_bot")]
+    # Not started, so no scheduler worker ticks it behind our back
+    room.players = {
+        'human': Player(id='human', paddle_id=1),
+        'bot': Player(id='bot', paddle_id=2, bot=Bot.create('hard', room.tick_rate)),
+    }
+    room._update_player_lists()
+    room.seed = 0
+    room.game_running = room.game_active = True
+    room.reset_ball()
+    reaper.track(room, now)
+
+    original_planner = server.bot_planner
+    server.bot_planner = BotPlanner(vectorized=False)
+    server.bot_planner.rng = random.Random(0)
+    try:
+        start_y, tick_now = room.paddle2.y, room.last_update
+        for _ in range(10 * server.SCHEDULER_RATE):
+            tick_now += 1.0 / server.SCHEDULER_RATE
+            server.TickScheduler.run_frame([room], tick_now)
+    finally:
+        server.bot_planner = original_planner
+
+    assert room.paddle2.y != start_y and room.metrics.inputs == 0
+    assert reaper.expired(game_server.rooms, now + server.ROOM_IDLE_TTL + 1) == [(room.room_id, 'idle')]
+
+
+def test_eviction_cleans_up():
+    """An evicted room is gone from the registry and its players can join elsewhere."""
+    emitted = []
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda event, data=None, **kwargs: emitted.append((event, data))
+    try:
+        game_server = make_server()
+        room_id = game_server.create_room("reaper_evict")
+        game_server.client_formats['c1'] = 'json'
+        assert game_server.join_room('c1', room_id) == 1
+        with game_server.lock:
+            game_server._evict_room(room_id, 'waiting')
+    finally:
+        server.socketio.emit = original_emit
+
+    assert room_id not in game_server.rooms and 'c1' not in game_server.client_rooms
+    assert ('room_closed', {'room_id': room_id, 'reason': 'waiting'}) in emitted
+    stats = game_server.get_local_room_stats()['reaper']
+    assert stats['evicted']['waiting'] == 1 and stats['tracked_rooms'] == 0
+
+
+def test_reap_survives_a_failing_room():
+    """A room that can't be evicted is retried later; the rest of the pass goes on."""
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda *args, **kwargs: None
+    try:
+        started = time.time() - server.ROOM_WAITING_TTL - 10
+        game_server = make_server()
+        game_server.reaper = reaper = RoomReaper(started)
+        room_ids = [game_server.create_room(f"reaper_fail_{index}") for index in range(3)]
+        for room_id in room_ids:
+            reaper.track(game_server.rooms[room_id], started)
+
+        def broken():
+            raise RuntimeError("broken room")
+        game_server.rooms[room_ids[1]].stop_game_loop = broken
+        game_server.reap()
+    finally:
+        server.socketio.emit = original_emit
+
+    assert list(game_server.rooms) == [room_ids[1]] and room_ids[1] in reaper.wheel
+
+
+if __name__ == "__main__":
+    print("Testing room reaper...")
+    test_timer_wheel()
+    test_reaper_ttls()
+    test_bot_moves_are_not_activity()
+    test_eviction_cleans_up()
+    test_reap_survives_a_failing_room()
+    print("✅ Reaper test PASSED")
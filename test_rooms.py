@@ -11,14 +11,31 @@ import socketio
 import time
 import threading
 
+from wire_format import decode_state
+
+def apply_delta(state, delta):
+    """Merge a game_delta payload into a client-side state dict."""
+    for key, value in delta.items():
+        if value is None:
+            state.pop(key, None)
+        elif isinstance(value, dict) and isinstance(state.get(key), dict):
+            apply_delta(state[key], value)
+        else:
+            state[key] = value
+    return state
+
 class TestClient:
-    def __init__(self, client_name, server_url="http://localhost:5000"):
+    def __init__(self, client_name, server_url="http://localhost:5000", wire_format="json"):
         self.client_name = client_name
         self.server_url = server_url
+        self.wire_format = wire_format
         self.sio = socketio.Client()
         self.connected = False
         self.room_id = None
         self.paddle_id = None
+        self.state = None
+        self.awaiting_keyframe = False
+        self.input_seq = 0
         
         self.setup_events()
     
@@ -60,21 +77,46 @@ class TestClient:
             print(f"[{self.client_name}] Player {data.get('client_id')} joined as player {data.get('paddle_id')}")
             
         @self.sio.event
-        def game_state(data):
-            # Only print game state occasionally to avoid spam
-            if hasattr(self, '_last_state_print'):
-                if time.time() - self._last_state_print < 2:  # Print every 2 seconds
-                    return
-            self._last_state_print = time.time()
+        def game_delta(data):
+            base_tick = data.pop('base_tick', None)
+            if self.state is None or self.state.get('tick') != base_tick:
+                # Missed an update, ask for a fresh keyframe (once)
+                if not self.awaiting_keyframe:
+                    self.awaiting_keyframe = True
+                    self.sio.emit('request_keyframe')
+                return
+            apply_delta(self.state, data)
+            self.print_state(self.state)
+            
+        @self.sio.event
+        def game_state_bin(data):
+            # Binary updates carry only the moving fields; merge them into
+            # the static fields from the last JSON keyframe
+            decoded = decode_state(data)
+            self.state = apply_delta(self.state or {}, decoded)
+            self.print_state(self.state)
             
-            ball = data.get('ball', {})
-            p1_score = data.get('paddle1', {}).get('score', 0)
-            p2_score = data.get('paddle2', {}).get('score', 0)
-            print(f"[{self.client_name}] Game state - Ball: ({ball.get('x', 0):.0f}, {ball.get('y', 0):.0f}), Score: {p1_score}-{p2_score}")
+        @self.sio.event
+        def game_state(data):
+            self.state = data
+            self.awaiting_keyframe = False
+            self.print_state(data)
+    
+    def print_state(self, data):
+        # Only print game state occasionally to avoid spam
+        if hasattr(self, '_last_state_print'):
+            if time.time() - self._last_state_print < 2:  # Print every 2 seconds
+                return
+        self._last_state_print = time.time()
+        
+        ball = data.get('ball', {})
+        p1_score = data.get('paddle1', {}).get('score', 0)
+        p2_score = data.get('paddle2', {}).get('score', 0)
+        print(f"[{self.client_name}] Game state - Ball: ({ball.get('x', 0):.0f}, {ball.get('y', 0):.0f}), Score: {p1_score}-{p2_score}")
     
     def connect_to_server(self):
         try:
-            self.sio.connect(self.server_url)
+            self.sio.connect(self.server_url, auth={'wire_format': self.wire_format})
             time.sleep(0.5)  # Wait for connection
             return self.connected
         except Exception as e:
@@ -91,8 +133,10 @@ class TestClient:
     
     def send_input(self, up=False, down=False):
         if self.connected and self.room_id:
+            self.input_seq += 1
             self.sio.emit('player_input', {
-                'input': {'up': up, 'down': down}
+                'input': {'up': up, 'down': down},
+                'seq': self.input_seq
             })
     
     def disconnect(self):
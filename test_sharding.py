@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test room sharding: shard assignment, the local broker and lobby aggregation
+"""
+import pickle
+import threading
+import time
+
+from server import GameServer
+from sharding import LocalBroker, LocalBrokerClient, ShardDirectory, shard_for
+
+
+def test_shard_assignment():
+    """Room IDs map to a stable shard and created rooms land on their owner."""
+    assert shard_for("room_a", 1) == 0
+    assert shard_for("room_a", 4) == shard_for("room_a", 4)
+    counts = [0] * 4
+    for i in range(4000):
+        counts[shard_for(f"room_{i}", 4)] += 1
+    assert min(counts) > 800, counts
+
+    server = GameServer(shard_index=2, shard_count=4)
+    for _ in range(20):
+        room_id = server.create_room()
+        assert shard_for(room_id, 4) == 2
+    print(f"Shard distribution over 4000 rooms: {counts}")
+
+
+def test_local_broker_pubsub():
+    """Messages published on a channel reach every subscriber of that channel."""
+    broker = LocalBroker(port=0).start()
+    host, port = broker.address
+    publisher = LocalBrokerClient(host, port)
+    received = {'a': [], 'b': []}
+
+    def subscribe(name, channel):
+        for data in LocalBrokerClient(host, port).listen(channel):
+            received[name].append(pickle.loads(data))
+
+    threading.Thread(target=subscribe, args=('a', 'lobby'), daemon=True).start()
+    threading.Thread(target=subscribe, args=('b', 'other'), daemon=True).start()
+    time.sleep(0.3)
+
+    publisher.publish('lobby', pickle.dumps({'hello': 1}))
+    publisher.publish('other', pickle.dumps({'hello': 2}))
+    deadline = time.time() + 5
+    while time.time() < deadline and not (received['a'] and received['b']):
+        time.sleep(0.05)
+    broker.close()
+
+    assert received == {'a': [{'hello': 1}], 'b': [{'hello': 2}]}
+
+
+def test_lobby_aggregation():
+    """Room lists and stats include other shards' published summaries."""
+    directory = ShardDirectory(broker=None, shard_index=0, shard_count=2)
+    local = GameServer(shard_index=0, shard_count=2, directory=directory)
+    remote = GameServer(shard_index=1, shard_count=2)
+    local_room = local.create_room()
+    remote_room = remote.create_room()
+
+    directory.receive({'shard': 1, 'summary': {
+        'rooms': remote.get_local_room_list(),
+        'stats': remote.get_local_room_stats()
+    }})
+
+    rooms = local.get_room_list()
+    assert set(rooms) == {local_room, remote_room}
+    assert rooms[remote_room]['shard'] == 1
+    stats = local.get_room_stats()
+    assert stats['total_rooms'] == 2 and stats['shards_reporting'] == 2
+
+
+if __name__ == "__main__":
+    print("Testing room sharding...")
+    test_shard_assignment()
+    test_local_broker_pubsub()
+    test_lobby_aggregation()
+    print("✅ Sharding test PASSED")
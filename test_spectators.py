@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test spectator fan-out: one emit per snapshot however many watch, at the spectator rate
+"""
+import copy
+
+import server
+from server import GameRoom, Player
+from test_rooms import apply_delta
+
+
+def make_watched_room(spectators):
+    room = GameRoom("spectator_test", snapshot_rate=60)
+    room.players = {
+        'p1': Player(id='p1', paddle_id=1),
+        'p2': Player(id='p2', paddle_id=2),
+    }
+    room.game_active = room.game_running = True
+    for index in range(spectators):
+        room.add_spectator(f"s{index}", 'binary' if index % 10 == 0 else 'json')
+    return room
+
+
+def capture_emits(run):
+    """Run `run` with socket emits recorded as (event, data, room).
+    
+    Payloads are copied, as a real emit encodes them before the buffers are reused.
+    """
+    emitted = []
+    original_emit = server.socketio.emit
+    server.socketio.emit = lambda event, data=None, room=None, **kwargs: emitted.append(
+        (event, copy.deepcopy(data), room))
+    try:
+        run()
+    finally:
+        server.socketio.emit = original_emit
+    return emitted
+
+
+def test_one_emit_per_format():
+    """1,000 spectators cost one encode and one emit per wire format per snapshot."""
+    room = make_watched_room(1000)
+    emitted = capture_emits(room.broadcast_spectators)
+    assert sorted(target for _, _, target in emitted) == [
+        room.spectator_channel('json'), room.spectator_channel('binary')
+    ]
+
+
+def test_spectator_delta_chain():
+    """Spectator deltas apply to the spectator keyframe and track the room's state."""
+    room = make_watched_room(3)
+    state = None
+
+    def watch():
+        for _ in range(30):
+            for _ in range(6):
+                room.step()
+            room.broadcast_spectators()
+
+    for event, data, target in capture_emits(watch):
+        if target != room.spectator_channel('json'):
+            continue
+        if event == 'game_state':
+            state = data
+        else:
+            assert data.pop('base_tick') == state['tick']
+            apply_delta(state, data)
+
+    expected = room.get_state()
+    expected['timestamp'] = state['timestamp']
+    assert state == expected
+    assert room.get_keyframe(spectator=True) == state
+
+
+def test_spectator_rate():
+    """Players get snapshot_rate updates, spectators the lower spectator rate."""
+    room = make_watched_room(5)
+    room.spectators = {'s1': 'json'}
+
+    def run_one_second():
+        now = 0.0
+        for _ in range(server.SCHEDULER_RATE):
+            now += 1.0 / server.SCHEDULER_RATE
+            room.send_snapshots(now)
+
+    emitted = capture_emits(run_one_second)
+    to_spectators = sum(1 for _, _, target in emitted if target == room.spectator_channel('json'))
+    to_players = sum(1 for _, _, target in emitted if target == room.room_id)
+    assert abs(to_spectators - room.spectator_rate) <= 1
+    assert abs(to_players - room.snapshot_rate) <= 1
+
+
+if __name__ == "__main__":
+    print("Testing spectators...")
+    test_one_emit_per_format()
+    test_spectator_delta_chain()
+    test_spectator_rate()
+    print("✅ Spectator test PASSED")
@@ -0,0 +1,68 @@
+"""
+Hashed Timer Wheel
+==================
+
+Timers for many keys (e.g. one expiry per room) at O(1) cost to schedule,
+reschedule or cancel. Time is divided into ticks of `resolution` seconds
+and a timer is hashed into slot `deadline_tick % slots`; advancing the
+wheel visits one slot per elapsed tick. Deadlines further away than one
+turn of the wheel share slots with nearer ones and are kept until their
+tick comes round.
+
+Not thread-safe: callers serialize access (GameServer holds its lock).
+"""
+
+import math
+from typing import Dict, Hashable, List
+
+
+class TimerWheel:
+    def __init__(self, now: float, slots: int = 512, resolution: float = 1.0):
+        self.resolution = resolution
+        self.slots: List[Dict[Hashable, int]] = [dict() for _ in range(slots)]
+        self.timers: Dict[Hashable, int] = {}  # key -> slot index
+        self.current = int(now / resolution)  # Last tick processed
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.timers
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Fire `key` once `deadline` (seconds, same clock as advance) has passed."""
+        self.cancel(key)
+        tick = max(self.current + 1, math.ceil(deadline / self.resolution))
+        index = tick % len(self.slots)
+        self.slots[index][key] = tick
+        self.timers[key] = index
+
+    def cancel(self, key: Hashable) -> bool:
+        index = self.timers.pop(key, None)
+        if index is None:
+            return False
+        del self.slots[index][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to `now` and return the keys whose deadline has passed."""
+        target = int(now / self.resolution)
+        if target <= self.current:
+            return []
+        # After a gap longer than one turn, every slot is visited once
+        ticks = range(self.current + 1, target + 1)
+        if len(ticks) > len(self.slots):
+            ticks = ticks[-len(self.slots):]
+        self.current = target
+
+        expired = []
+        for tick in ticks:
+            slot = self.slots[tick % len(self.slots)]
+            if not slot:
+                continue
+            due = [key for key, deadline in slot.items() if deadline <= target]
+            for key in due:
+                del slot[key]
+                del self.timers[key]
+            expired.extend(due)
+        return expired
@@ -0,0 +1,126 @@
+"""
+Compact binary wire format for per-tick game state
+==================================================
+
+Clients that connect with ``auth={'wire_format': 'binary'}`` receive
+``game_state_bin`` events instead of JSON ``game_state``/``game_delta``
+updates. Each payload is a fixed-size little-endian struct carrying only the
+fields that move during a match; positions and velocities are quantized to
+fixed point (1/8 pixel). Static fields (sizes, paddle x, max_score, players)
+come from the JSON ``game_state`` keyframe sent on join.
+
+Run this module directly for an encode benchmark against JSON.
+"""
+
+import struct
+import time
+from typing import Any, Dict
+
+WIRE_VERSION = 3
+
+# Fixed-point scale: 1 unit = 1/8 pixel
+FIXED_POINT_SCALE = 8
+
+# version, flags, tick, ball x/y, ball dx/dy, paddle1 y, paddle2 y,
+# paddle1 score, paddle2 score, paddle1 ack, paddle2 ack,
+# serve countdown (ms), server timestamp
+STATE_STRUCT = struct.Struct('<BBIhhiihhBBIIHd')
+
+FLAG_ACTIVE = 1
+FLAG_PAUSED = 2
+FLAG_RUNNING = 4
+FLAG_SERVING = 8
+FLAG_FINISHED = 16
+
+_INT16_MIN, _INT16_MAX = -32768, 32767
+_INT32_MIN, _INT32_MAX = -2147483648, 2147483647
+
+
+def _q16(value: float) -> int:
+    return max(_INT16_MIN, min(_INT16_MAX, round(value * FIXED_POINT_SCALE)))
+
+
+def _q32(value: float) -> int:
+    return max(_INT32_MIN, min(_INT32_MAX, round(value * FIXED_POINT_SCALE)))
+
+
+def encode_room_state(room) -> bytes:
+    """Pack a GameRoom's dynamic state. Caller should hold the room lock."""
+    round_state = room.round_state
+    flags = ((FLAG_ACTIVE if room.game_active else 0)
+             | (FLAG_PAUSED if room.game_paused else 0)
+             | (FLAG_RUNNING if room.game_running else 0)
+             | (FLAG_SERVING if round_state == 'serving' else 0)
+             | (FLAG_FINISHED if round_state == 'finished' else 0))
+    ball = room.ball
+    acks = [0, 0, 0]
+    for player in room.players.values():
+        acks[player.paddle_id] = player.last_processed_seq & 0xFFFFFFFF
+    return STATE_STRUCT.pack(
+        WIRE_VERSION,
+        flags,
+        room.current_tick & 0xFFFFFFFF,
+        _q16(ball.x), _q16(ball.y),
+        _q32(ball.dx), _q32(ball.dy),
+        _q16(room.paddle1.y), _q16(room.paddle2.y),
+        min(room.paddle1.score, 255), min(room.paddle2.score, 255),
+        acks[1], acks[2],
+        min(0xFFFF, round(room.serve_delay * 1000)),
+        time.time()
+    )
+
+
+def _round_state(flags: int) -> str:
+    if not flags & FLAG_RUNNING:
+        return 'waiting'
+    if flags & FLAG_FINISHED:
+        return 'finished'
+    return 'serving' if flags & FLAG_SERVING else 'playing'
+
+
+def decode_state(payload: bytes) -> Dict[str, Any]:
+    """Unpack a game_state_bin payload into the same shape as game_state fields."""
+    (version, flags, tick, bx, by, bdx, bdy,
+     p1y, p2y, p1_score, p2_score, p1_ack, p2_ack, countdown_ms, timestamp) = STATE_STRUCT.unpack(payload)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version}")
+    scale = FIXED_POINT_SCALE
+    return {
+        'tick': tick,
+        'ball': {'x': bx / scale, 'y': by / scale, 'dx': bdx / scale, 'dy': bdy / scale},
+        'paddle1': {'y': p1y / scale, 'score': p1_score, 'ack': p1_ack},
+        'paddle2': {'y': p2y / scale, 'score': p2_score, 'ack': p2_ack},
+        'game_active': bool(flags & FLAG_ACTIVE),
+        'game_paused': bool(flags & FLAG_PAUSED),
+        'game_running': bool(flags & FLAG_RUNNING),
+        'round_state': _round_state(flags),
+        'countdown': countdown_ms / 1000,
+        'timestamp': timestamp,
+    }
+
+
+def benchmark(iterations: int = 100000):
+    """Compare JSON and binary encoding cost and payload size for one room."""
+    import json
+    from server import GameRoom
+
+    room = GameRoom("bench")
+    room.game_active = room.game_running = True
+    state = room.get_state()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json_payload = json.dumps(state)
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        binary_payload = encode_room_state(room)
+    binary_time = time.perf_counter() - start
+
+    print(f"JSON:   {len(json_payload):4d} bytes, {json_time / iterations * 1e6:.2f} us/encode")
+    print(f"Binary: {len(binary_payload):4d} bytes, {binary_time / iterations * 1e6:.2f} us/encode")
+
+
+if __name__ == "__main__":
+    benchmark()